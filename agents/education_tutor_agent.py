@@ -5,15 +5,413 @@ Provides adaptive tutoring, explains concepts, generates practice problems
 
 import json
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 from utils.observability import AgentLogger, AgentTracer, MetricsCollector
 from utils.gemini_client import get_gemini_client
+from utils.fake_gemini import fake_backend_enabled
+from utils.token_budget import TokenBudget
+from utils.keyword_matcher import KeywordMatcher
+from utils.frozen import FrozenDict, freeze
 
 logger = AgentLogger("EducationTutorAgent")
 tracer = AgentTracer()
 metrics = MetricsCollector()
 
+# Subject taxonomy: topics taught under each subject
+SUBJECT_TAXONOMY = freeze({
+    "math": ["algebra", "geometry", "calculus", "statistics", "arithmetic"],
+    "science": ["physics", "chemistry", "biology", "earth science"],
+    "language": ["grammar", "writing", "reading comprehension", "vocabulary"],
+    "computer science": ["programming", "algorithms", "data structures"],
+    "history": ["world history", "us history", "geography"],
+    "programming": [
+        "python", "javascript", "java", "c++", "c#", "c",
+        "html", "css", "sql", "r", "php", "swift", "kotlin",
+        "typescript", "go", "rust", "ruby", "perl", "scala",
+        "react", "angular", "vue", "node.js", "django", "flask",
+        "spring boot", "asp.net", ".net", "express.js"
+    ],
+    "web development": [
+        "html", "css", "javascript", "responsive design",
+        "frontend", "backend", "full stack", "rest api",
+        "graphql", "web security", "web performance"
+    ],
+    "data science": [
+        "python for data science", "pandas", "numpy", "matplotlib",
+        "machine learning", "deep learning", "tensorflow", "pytorch",
+        "scikit-learn", "data visualization", "statistics",
+        "sql for data analysis", "jupyter notebooks"
+    ],
+    "mobile development": [
+        "android", "ios", "react native", "flutter",
+        "swift", "kotlin", "mobile ui/ux", "app development"
+    ],
+    "devops": [
+        "git", "docker", "kubernetes", "ci/cd",
+        "linux", "bash", "cloud computing", "aws", "azure"
+    ]
+})
+
+# Everyday words that signal a subject even when no taxonomy topic is named
+SUBJECT_DETECTION_KEYWORDS = {
+    "math": ["equation", "solve", "calculate", "calculation", "algebra", "geometry",
+             "derivative", "integral", "probability", "factor", "multiply",
+             "multiplication"],
+    "science": ["atom", "cell", "energy", "force", "chemical", "organism",
+                "molecule", "physics", "biology", "chemistry", "reaction"],
+    "computer science": ["code", "coding", "program", "function", "algorithm", "python",
+                         "javascript", "loop", "variable", "array", "class"],
+    "language": ["grammar", "sentence", "verb", "noun", "essay", "write", "writing",
+                 "paragraph", "punctuation", "spelling"],
+    "history": ["war", "revolution", "president", "ancient", "civilization",
+                "empire", "treaty", "constitution"]
+}
+
+# Taxonomy topics that are also common English words or letters only count a little
+AMBIGUOUS_TOPICS = {"c", "r", "go", "swift", "rust", "ruby"}
+
+# Minimum score for auto-detection, so a lone ambiguous topic is not enough
+MIN_SUBJECT_SCORE = 1.0
+
+# Tie-break order when two subjects score the same
+SUBJECT_PRIORITY = ("math", "science", "computer science", "language", "history",
+                    "programming", "web development", "data science",
+                    "mobile development", "devops")
+
+# Query types in precedence order with the phrases that signal them
+QUERY_TYPE_PHRASES = (
+    ("concept_explanation", ["what is", "explain", "define", "definition", "how does", "why"]),
+    ("problem_solving", ["solve", "calculate", "compute", "computed", "find the", "what is the answer"]),
+    ("practice_request", ["practice", "exercises", "quiz", "test me", "problems"]),
+)
+
+# Keywords that are verbs: their -ed/-ing forms match too ("solved", "calculating").
+# "compute" is not one, so "cloud computing" stays a topic.
+VERB_KEYWORDS = frozenset({"solve", "calculate", "multiply", "factor", "explain", "define", "practice"})
+
+
+def _build_subject_matcher() -> KeywordMatcher:
+    """Compile detection keywords and the full taxonomy into one matcher"""
+    matcher = KeywordMatcher()
+    for subject, keywords in SUBJECT_DETECTION_KEYWORDS.items():
+        for keyword in keywords:
+            matcher.add(keyword, subject, 1.0, verb=keyword in VERB_KEYWORDS)
+    for subject, topics in SUBJECT_TAXONOMY.items():
+        matcher.add(subject, subject)
+        for topic in topics:
+            matcher.add(topic, subject, 0.5 if topic in AMBIGUOUS_TOPICS else None)
+    return matcher
+
+
+def _build_query_type_matcher() -> KeywordMatcher:
+    """Compile query-type phrases into one matcher"""
+    matcher = KeywordMatcher()
+    for query_type, phrases in QUERY_TYPE_PHRASES:
+        for phrase in phrases:
+            matcher.add(phrase, query_type, 1.0, verb=phrase in VERB_KEYWORDS)
+    return matcher
+
+
+# Gemini content type used for each explanation section
+SECTION_CONTENT_TYPES = {
+    "quick_summary": "summary",
+    "introduction": "introduction",
+    "explanation": "explanation",
+    "examples": "examples",
+    "key_points": "key_points",
+    "common_mistakes": "common_mistakes",
+}
+
+_LIST_MARKER = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+")
+
+
+def _parse_list_items(text: str, marker: str) -> List[str]:
+    """Turn a bulleted or numbered Gemini answer into display list items"""
+    items = []
+    for line in text.splitlines():
+        if not _LIST_MARKER.match(line):
+            continue
+        item = _LIST_MARKER.sub("", line).strip()
+        if item:
+            items.append(f"{marker} {item}")
+    return items
+
+
+# Built once per process and shared by every tutor instance
+SUBJECT_MATCHER = _build_subject_matcher()
+QUERY_TYPE_MATCHER = _build_query_type_matcher()
+
+# ---------------------------------------------------------------------------
+# Knowledge tables and response templates
+#
+# These are loaded once at import time into read-only structures shared by
+# every tutor instance and Streamlit session. Text templates are compiled to
+# bound str.format methods, so a request only pays for the final string.
+# ---------------------------------------------------------------------------
+
+DIFFICULTY_LEVELS = ("elementary", "middle school", "high school", "college", "advanced")
+
+# Template explanations keyed by subject, then difficulty
+EXPLANATION_TEMPLATES = freeze({
+    "math": {
+        "elementary": "Let me explain {concept} in a simple way. {concept} is a mathematical idea that helps us understand numbers and patterns.",
+        "high school": "{concept} is an important mathematical concept. It involves understanding relationships and applying rules to solve problems.",
+        "college": "{concept} is a fundamental principle in mathematics with applications across multiple domains."
+    },
+    "science": {
+        "elementary": "{concept} is something we can observe in nature. Let me break it down into simple parts.",
+        "high school": "{concept} is a scientific principle that explains how things work in our world.",
+        "college": "{concept} represents a key scientific theory with empirical evidence and practical applications."
+    }
+})
+
+EXPLANATION_BODY_TEMPLATE = """
+{base_explanation}
+
+📚 **Core Definition:**
+The concept of '{concept}' can be understood as a foundational idea in {subject}. It builds upon prerequisite knowledge and serves as a building block for more advanced topics.
+
+🔍 **Why It Matters:**
+Understanding {concept} is important because it helps you solve real-world problems and prepares you for more advanced learning in {subject}.
+
+💡 **Think of it this way:**
+Imagine {concept} like a tool in your learning toolkit. The more you practice and understand it, the more powerful it becomes for solving challenges.
+"""
+
+# Quick summaries keyed by difficulty band
+SUMMARY_TEMPLATES = freeze({
+    "introductory": """**Quick Summary:** {title} is an important concept in {subject} that helps you understand how things work. It's a building block that you'll use in many different situations, and once you master it, learning related topics becomes much easier.""",
+    "high school": """**Quick Summary:** {title} is a fundamental concept in {subject} that connects basic principles to advanced applications. Understanding this topic will help you solve complex problems and prepares you for higher-level coursework.""",
+    "advanced": """**Quick Summary:** {title} represents a key theoretical and practical framework in {subject}. It synthesizes multiple concepts and has widespread applications across various domains, making it essential for advanced study and professional work."""
+})
+
+# Subject introductions, formatted with the topic
+INTRO_TEMPLATES = freeze({
+    "math": """
+🧮 **Introduction to {topic}**
+
+Welcome! Let's start our journey into {topic}. Mathematics might seem challenging at first, but every concept has a logical foundation. 
+
+**What you'll discover:**
+- The core idea behind {topic} and why it matters
+- How it connects to what you already know
+- Real-world situations where this is useful
+
+Think of learning math like building with blocks - each new concept adds to your foundation, making you stronger at problem-solving. Let's build your understanding step by step!
+""",
+    "science": """
+🔬 **Introduction to {topic}**
+
+Science is all about understanding the world around us, and {topic} is a fascinating piece of that puzzle!
+
+**What you'll learn:**
+- The basic principles of {topic}
+- How scientists discovered or developed this idea
+- Why this matters in our daily lives
+
+Science isn't just facts to memorize - it's a way of thinking and exploring. Let's explore {topic} together through curiosity and discovery!
+""",
+    "computer science": """
+💻 **Introduction to {topic}**
+
+Welcome to the world of {topic}! Computer science combines logical thinking with creative problem-solving.
+
+**What we'll cover:**
+- The fundamental concepts behind {topic}
+- How this is used in real applications
+- Practical skills you'll develop
+
+Don't worry if it seems complex at first - every programmer started as a beginner. Let's break it down into manageable pieces!
+""",
+    "programming": """
+👨‍💻 **Introduction to {topic}**
+
+Ready to dive into {topic}? Programming is like learning a new language - it might feel unfamiliar at first, but with practice, it becomes second nature!
+
+**What you'll master:**
+- Core syntax and programming concepts
+- Best practices and coding standards
+- Hands-on examples and real projects
+- Problem-solving with code
+
+Every expert programmer started exactly where you are. Let's write some code and bring your ideas to life! 🚀
+""",
+    "web development": """
+🌐 **Introduction to {topic}**
+
+Welcome to web development! You're about to learn how websites and web applications come to life.
+
+**What you'll build:**
+- Understanding of {topic} fundamentals
+- Practical skills for creating web content
+- Modern development techniques
+- Real-world project experience
+
+The web is your canvas, and code is your paintbrush. Let's create something amazing together!
+""",
+    "data science": """
+📊 **Introduction to {topic}**
+
+Data science is where math, statistics, and programming meet to unlock insights from data. {topic} is your gateway to this exciting field!
+
+**What you'll learn:**
+- Data analysis and visualization techniques
+- Statistical thinking and machine learning basics
+- Working with real datasets
+- Tools used by professional data scientists
+
+Data is everywhere, and you're about to learn how to make it speak. Let's turn raw data into actionable insights!
+""",
+    "mobile development": """
+📱 **Introduction to {topic}**
+
+Mobile apps are in everyone's pocket! Learn {topic} and build applications used by millions.
+
+**What you'll create:**
+- Understanding of mobile app architecture
+- UI/UX design for mobile platforms
+- Native or cross-platform development skills
+- Real app projects for your portfolio
+
+Your app ideas can change the world. Let's turn them into reality, one screen at a time!
+""",
+    "devops": """
+⚙️ **Introduction to {topic}**
+
+DevOps bridges development and operations, making software delivery faster and more reliable. {topic} is essential in modern tech!
+
+**What you'll master:**
+- Automation and deployment pipelines
+- Infrastructure management
+- Monitoring and troubleshooting
+- Industry-standard tools and practices
+
+DevOps engineers are in high demand. Let's build your skills and make deployments smooth and stress-free!
+""",
+    "language": """
+📝 **Introduction to {topic}**
+
+Language is how we express ideas, tell stories, and connect with others. {topic} is an essential tool in your communication toolkit!
+
+**What you'll explore:**
+- The basics of {topic} and why it matters
+- How to apply this in your writing and speaking
+- Tips to improve your skills
+
+Good communication is a superpower in any career. Let's develop your abilities together!
+""",
+    "history": """
+🌍 **Introduction to {topic}**
+
+History helps us understand how we got to where we are today. {topic} is a window into the past that shapes our present!
+
+**What you'll discover:**
+- Key events and people related to {topic}
+- Why this period/event was significant
+- How it influences our world today
+
+History isn't just dates and names - it's stories of real people and pivotal moments. Let's explore {topic} together!
+"""
+})
+
+DEFAULT_INTRO_TEMPLATE = """
+📚 **Introduction to {topic}**
+
+Welcome! You're about to learn something valuable about {topic} in {subject}.
+
+**What you'll discover:**
+- The fundamental concepts of {topic}
+- Why this topic is important
+- How to apply what you learn
+
+Learning is a journey, not a race. Let's take this step by step and build your confidence along the way!
+"""
+
+# Study tips keyed by learning style
+STUDY_TIPS = freeze({
+    "visual": [
+        "📊 Create colorful mind maps and diagrams",
+        "📝 Use highlighters to color-code concepts",
+        "🎨 Watch educational videos and animations",
+        "🖼️ Draw pictures to represent ideas"
+    ],
+    "auditory": [
+        "🎧 Listen to educational podcasts",
+        "💬 Explain concepts out loud to yourself",
+        "👥 Join study groups for discussions",
+        "🎵 Create mnemonics and rhymes"
+    ],
+    "kinesthetic": [
+        "✋ Use hands-on activities and experiments",
+        "🚶 Walk around while studying",
+        "🎯 Build models and demonstrations",
+        "⚡ Take frequent breaks with movement"
+    ],
+    "reading": [
+        "📖 Read textbooks and articles thoroughly",
+        "📝 Take detailed written notes",
+        "📄 Create written summaries",
+        "✍️ Write practice essays and explanations"
+    ]
+})
+
+RECOMMENDATION_TEMPLATES = (
+    "📚 Continue exploring {subject} at the {difficulty} level",
+    "🎯 Practice 3-5 problems daily on this topic",
+    "🔍 Connect this to related concepts you've learned",
+    "👥 Teach this concept to someone else to deepen understanding",
+    "📈 Track your progress and celebrate small wins"
+)
+
+# External resources, formatted with the query and its URL slug
+RESOURCE_TEMPLATES = freeze([
+    {
+        "name": "Khan Academy",
+        "url": "https://www.khanacademy.org",
+        "description": "Free video lessons and practice",
+        "type": "video"
+    },
+    {
+        "name": "Wikipedia",
+        "url": "https://en.wikipedia.org/wiki/{slug}",
+        "description": "Detailed background information",
+        "type": "reference"
+    },
+    {
+        "name": "YouTube Educational Channels",
+        "url": "https://www.youtube.com",
+        "description": "Search for '{query} tutorial'",
+        "type": "video"
+    },
+    {
+        "name": "Practice Problems",
+        "url": "https://www.wolframalpha.com",
+        "description": "Step-by-step problem solving",
+        "type": "interactive"
+    }
+])
+
+
+def _compile_templates(table):
+    """Compile every template string in a (nested) table into its str.format method"""
+    if isinstance(table, dict):
+        return FrozenDict((key, _compile_templates(value)) for key, value in table.items())
+    if isinstance(table, tuple):
+        return tuple(_compile_templates(value) for value in table)
+    return table.format
+
+
+EXPLANATION_FORMATTERS = _compile_templates(EXPLANATION_TEMPLATES)
+format_explanation_body = EXPLANATION_BODY_TEMPLATE.format
+SUMMARY_FORMATTERS = _compile_templates(SUMMARY_TEMPLATES)
+INTRO_FORMATTERS = _compile_templates(INTRO_TEMPLATES)
+format_default_intro = DEFAULT_INTRO_TEMPLATE.format
+RECOMMENDATION_FORMATTERS = _compile_templates(RECOMMENDATION_TEMPLATES)
+RESOURCE_FORMATTERS = _compile_templates(RESOURCE_TEMPLATES)
+
 
 class EducationTutorAgent:
     """
@@ -24,58 +422,38 @@ class EducationTutorAgent:
     - Learning path recommendations
     """
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self,
+                 api_key: Optional[str] = None,
+                 max_concurrent_sections: int = 4,
+                 section_deadline: float = 12.0):
         self.name = "Education Tutor"
         self.api_key = api_key
         self.gemini_client = None
         
-        # Try to initialize Gemini client
-        if api_key:
+        # Token limits for this agent's session (the Gemini client itself is shared)
+        self.token_budget = TokenBudget()
+        
+        # Concurrency cap and deadline (seconds) for Gemini section generation
+        self.max_concurrent_sections = max_concurrent_sections
+        self.section_deadline = section_deadline
+        
+        # Try to initialize Gemini client (a key isn't needed with GEMINI_BACKEND=fake)
+        if api_key or fake_backend_enabled():
             self.gemini_client = get_gemini_client(api_key)
             if self.gemini_client:
                 logger.info("Gemini API integration enabled for Education Tutor")
         
-        self.subjects = {
-            "math": ["algebra", "geometry", "calculus", "statistics", "arithmetic"],
-            "science": ["physics", "chemistry", "biology", "earth science"],
-            "language": ["grammar", "writing", "reading comprehension", "vocabulary"],
-            "computer science": ["programming", "algorithms", "data structures"],
-            "history": ["world history", "us history", "geography"],
-            "programming": [
-                "python", "javascript", "java", "c++", "c#", "c", 
-                "html", "css", "sql", "r", "php", "swift", "kotlin",
-                "typescript", "go", "rust", "ruby", "perl", "scala",
-                "react", "angular", "vue", "node.js", "django", "flask",
-                "spring boot", "asp.net", ".net", "express.js"
-            ],
-            "web development": [
-                "html", "css", "javascript", "responsive design",
-                "frontend", "backend", "full stack", "rest api",
-                "graphql", "web security", "web performance"
-            ],
-            "data science": [
-                "python for data science", "pandas", "numpy", "matplotlib",
-                "machine learning", "deep learning", "tensorflow", "pytorch",
-                "scikit-learn", "data visualization", "statistics",
-                "sql for data analysis", "jupyter notebooks"
-            ],
-            "mobile development": [
-                "android", "ios", "react native", "flutter",
-                "swift", "kotlin", "mobile ui/ux", "app development"
-            ],
-            "devops": [
-                "git", "docker", "kubernetes", "ci/cd",
-                "linux", "bash", "cloud computing", "aws", "azure"
-            ]
-        }
-        self.difficulty_levels = ["elementary", "middle school", "high school", "college", "advanced"]
+        # Shared, read-only tables (built once per process)
+        self.subjects = SUBJECT_TAXONOMY
+        self.difficulty_levels = DIFFICULTY_LEVELS
         
     def tutor(self, 
               query: str, 
               subject: Optional[str] = None,
               difficulty: str = "high school",
               learning_style: str = "visual",
-              trace_id: Optional[str] = None) -> Dict:
+              trace_id: Optional[str] = None,
+              stream: bool = False) -> Dict:
         """
         Main tutoring function - analyzes query and provides educational support
         
@@ -85,6 +463,11 @@ class EducationTutorAgent:
             difficulty: Learning level
             learning_style: visual, auditory, kinesthetic, reading/writing
             trace_id: Tracing ID for observability
+            stream: Return the Gemini explanation as an "explanation_stream"
+                iterator of text chunks instead of waiting for the full text.
+                The other concept sections are then still being generated:
+                "pending_sections" is a function that waits for them and
+                returns them by name
             
         Returns:
             Dict with explanation, examples, practice problems, resources
@@ -106,7 +489,7 @@ class EducationTutorAgent:
             
             # Generate response based on query type
             if query_type == "concept_explanation":
-                response = self._explain_concept(query, subject, difficulty, learning_style)
+                response = self._explain_concept(query, subject, difficulty, learning_style, stream)
             elif query_type == "problem_solving":
                 response = self._solve_problem(query, subject, difficulty)
             elif query_type == "practice_request":
@@ -142,124 +525,188 @@ class EducationTutorAgent:
                 "metadata": {"subject": subject, "difficulty": difficulty}
             }
     
+    def score_subjects(self, query: str) -> Dict[str, float]:
+        """
+        Score every subject the query mentions in a single pass
+
+        Returns:
+            Dict of subject -> score, highest scoring subject first
+        """
+        scores = SUBJECT_MATCHER.score(query)
+        return dict(sorted(
+            scores.items(),
+            key=lambda item: (-item[1], SUBJECT_PRIORITY.index(item[0]))
+        ))
+
     def _detect_subject(self, query: str) -> str:
         """Auto-detect subject from query keywords"""
-        query_lower = query.lower()
-        
-        # Math keywords
-        if any(word in query_lower for word in ["equation", "solve", "calculate", "algebra", "geometry", 
-                                                  "derivative", "integral", "probability", "factor", "multiply"]):
-            return "math"
-        
-        # Science keywords
-        if any(word in query_lower for word in ["atom", "cell", "energy", "force", "chemical", "organism",
-                                                  "molecule", "physics", "biology", "chemistry", "reaction"]):
-            return "science"
-        
-        # Programming keywords
-        if any(word in query_lower for word in ["code", "program", "function", "algorithm", "python", 
-                                                  "javascript", "loop", "variable", "array", "class"]):
-            return "computer science"
-        
-        # Language keywords
-        if any(word in query_lower for word in ["grammar", "sentence", "verb", "noun", "essay", "write",
-                                                  "paragraph", "punctuation", "spelling"]):
-            return "language"
-        
-        # History keywords
-        if any(word in query_lower for word in ["war", "revolution", "president", "ancient", "civilization",
-                                                  "empire", "treaty", "constitution"]):
-            return "history"
-        
+        for subject, score in self.score_subjects(query).items():
+            if score >= MIN_SUBJECT_SCORE:
+                return subject
         return "general"
-    
+
     def _analyze_query_type(self, query: str) -> str:
         """Determine what type of help the student needs"""
-        query_lower = query.lower()
-        
-        if any(phrase in query_lower for phrase in ["what is", "explain", "define", "how does", "why"]):
-            return "concept_explanation"
-        
-        if any(phrase in query_lower for phrase in ["solve", "calculate", "find the", "what is the answer"]):
-            return "problem_solving"
-        
-        if any(phrase in query_lower for phrase in ["practice", "exercises", "quiz", "test me", "problems"]):
-            return "practice_request"
-        
+        found = QUERY_TYPE_MATCHER.score(query)
+
+        for query_type, _ in QUERY_TYPE_PHRASES:
+            if query_type in found:
+                return query_type
+
         return "general_help"
     
-    def _explain_concept(self, query: str, subject: str, difficulty: str, learning_style: str) -> Dict:
+    def _explain_concept(self, query: str, subject: str, difficulty: str, learning_style: str,
+                         stream: bool = False) -> Dict:
         """Provide detailed concept explanation adapted to learning level and style"""
         
         # Extract the core concept from query
         concept = query.replace("what is", "").replace("explain", "").replace("?", "").strip()
         
-        # Generate summary and intro for concept explanations too
-        summary = self._generate_topic_summary(concept, subject, difficulty)
-        introduction = self._generate_basic_intro(concept, subject, difficulty)
+        # The explanation is the longest section, so it is the one worth streaming
+        stream_explanation = stream and self.gemini_client is not None
         
         explanation = {
             "concept": concept,
-            "quick_summary": summary,
-            "introduction": introduction,
-            "explanation": self._generate_explanation(concept, subject, difficulty),
             "visual_aids": self._suggest_visual_aids(concept, subject) if learning_style == "visual" else [],
-            "examples": self._generate_examples(concept, subject, difficulty),
-            "key_points": self._extract_key_points(concept, subject),
-            "common_mistakes": self._identify_common_mistakes(concept, subject),
         }
         
+        # Summary, intro, explanation, examples, key points and mistakes are independent
+        collect = self._start_sections(concept, subject, difficulty,
+                                       skip=("explanation",) if stream_explanation else ())
+        
+        if stream_explanation:
+            # The stream must not wait for the section batch: the sections
+            # keep generating while it is read, and are collected after
+            explanation["explanation_stream"] = self.stream_explanation(concept, subject, difficulty)
+            explanation["pending_sections"] = collect
+        else:
+            explanation.update(collect())
+        
         return explanation
     
-    def _generate_explanation(self, concept: str, subject: str, difficulty: str) -> str:
-        """Generate explanation text adapted to difficulty level"""
+    def stream_explanation(self, concept: str, subject: str, difficulty: str) -> Iterator[str]:
+        """
+        Stream the detailed explanation as text chunks
         
-        # Try using Gemini API if available
+        Uses Gemini token streaming when available; falls back to the
+        template explanation (as a single chunk) if Gemini fails up front.
+        """
         if self.gemini_client:
-            try:
-                gemini_explanation = self.gemini_client.generate_educational_content(
-                    topic=f"{concept} in {subject}",
-                    difficulty=difficulty,
-                    content_type="explanation"
-                )
-                if gemini_explanation and not gemini_explanation.startswith("Error"):
-                    logger.info(f"Generated explanation using Gemini API for: {concept}")
-                    return gemini_explanation
-            except Exception as e:
-                logger.warning(f"Gemini API failed, falling back to template: {e}")
-        
-        # Fallback to template-based approach
-        explanations = {
-            "math": {
-                "elementary": f"Let me explain {concept} in a simple way. {concept} is a mathematical idea that helps us understand numbers and patterns.",
-                "high school": f"{concept} is an important mathematical concept. It involves understanding relationships and applying rules to solve problems.",
-                "college": f"{concept} is a fundamental principle in mathematics with applications across multiple domains."
-            },
-            "science": {
-                "elementary": f"{concept} is something we can observe in nature. Let me break it down into simple parts.",
-                "high school": f"{concept} is a scientific principle that explains how things work in our world.",
-                "college": f"{concept} represents a key scientific theory with empirical evidence and practical applications."
-            }
+            chunks = self.gemini_client.stream_educational_content(
+                topic=f"{concept} in {subject}",
+                difficulty=difficulty,
+                content_type="explanation",
+                agent=self.name,
+                budget=self.token_budget
+            )
+            first = next(chunks, "")
+            if first and not first.startswith("Error"):
+                yield first
+                yield from chunks
+                return
+            logger.warning(f"Gemini streaming failed, falling back to template: {first}")
+        
+        yield self._generate_explanation(concept, subject, difficulty)
+    
+    def _generate_sections(self, concept: str, subject: str, difficulty: str,
+                           skip: Tuple[str, ...] = ()) -> Dict:
+        """Generate the independent explanation sections (see _start_sections)"""
+        return self._start_sections(concept, subject, difficulty, skip)()
+    
+    def _start_sections(self, concept: str, subject: str, difficulty: str,
+                        skip: Tuple[str, ...] = ()) -> Callable[[], Dict]:
+        """
+        Start generating the independent explanation sections; returns a
+        function that waits for them and returns them by name
+        
+        With Gemini, every section is requested at the same time (at most
+        max_concurrent_sections in flight) and the batch is given
+        section_deadline seconds from the start. Any section that fails or
+        misses the deadline is filled in from its template.
+        """
+        templates = {
+            "quick_summary": lambda: self._generate_topic_summary(concept, subject, difficulty),
+            "introduction": lambda: self._generate_basic_intro(concept, subject, difficulty),
+            "explanation": lambda: self._generate_explanation(concept, subject, difficulty),
+            "examples": lambda: self._generate_examples(concept, subject, difficulty),
+            "key_points": lambda: self._extract_key_points(concept, subject),
+            "common_mistakes": lambda: self._identify_common_mistakes(concept, subject),
+        }
+        for section in skip:
+            templates.pop(section, None)
+        
+        if not self.gemini_client:
+            sections = {section: build() for section, build in templates.items()}
+            return lambda: sections
+        
+        executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrent_sections,
+            thread_name_prefix="tutor-section"
+        )
+        futures = {
+            executor.submit(self._generate_section_with_gemini, section, concept, subject, difficulty): section
+            for section in templates
         }
+        deadline = time.monotonic() + self.section_deadline
         
-        subject_key = subject if subject in explanations else "math"
-        difficulty_key = difficulty if difficulty in explanations[subject_key] else "high school"
+        def collect() -> Dict:
+            done, pending = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+            # Don't wait for stragglers; queued sections are cancelled outright
+            executor.shutdown(wait=False, cancel_futures=True)
+            
+            sections = {}
+            for future, section in futures.items():
+                content = None
+                if future in done:
+                    try:
+                        content = future.result()
+                    except Exception as e:
+                        logger.warning(f"Gemini section '{section}' failed, falling back to template: {e}")
+                else:
+                    logger.warning(f"Gemini section '{section}' missed the {self.section_deadline}s deadline")
+                
+                sections[section] = content if content else templates[section]()
+            
+            if pending:
+                metrics.record_metric("education_tutor_section_timeouts", len(pending), {"subject": subject})
+            
+            return sections
         
-        base_explanation = explanations[subject_key][difficulty_key]
+        return collect
+    
+    def _generate_section_with_gemini(self, section: str, concept: str, subject: str, difficulty: str):
+        """Generate one explanation section with Gemini; None if generation failed"""
+        text = self.gemini_client.generate_educational_content(
+            topic=f"{concept} in {subject}",
+            difficulty=difficulty,
+            content_type=SECTION_CONTENT_TYPES[section],
+            agent=self.name,
+            budget=self.token_budget
+        )
+        if not text or text.startswith("Error"):
+            return None
+        
+        logger.info(f"Generated {section} using Gemini API for: {concept}")
+        
+        if section == "examples":
+            return [{"title": "Worked Examples", "description": text.strip()}]
+        if section == "key_points":
+            return _parse_list_items(text, "✓")
+        if section == "common_mistakes":
+            return _parse_list_items(text, "⚠️")
+        return text
+    
+    def _generate_explanation(self, concept: str, subject: str, difficulty: str) -> str:
+        """Generate explanation text adapted to difficulty level"""
+        by_difficulty = EXPLANATION_FORMATTERS.get(subject, EXPLANATION_FORMATTERS["math"])
+        base_formatter = by_difficulty.get(difficulty, by_difficulty["high school"])
         
         # Add structure
-        return f"""
-{base_explanation}
-
-📚 **Core Definition:**
-The concept of '{concept}' can be understood as a foundational idea in {subject}. It builds upon prerequisite knowledge and serves as a building block for more advanced topics.
-
-🔍 **Why It Matters:**
-Understanding {concept} is important because it helps you solve real-world problems and prepares you for more advanced learning in {subject}.
-
-💡 **Think of it this way:**
-Imagine {concept} like a tool in your learning toolkit. The more you practice and understand it, the more powerful it becomes for solving challenges.
-"""
+        return format_explanation_body(
+            base_explanation=base_formatter(concept=concept),
+            concept=concept,
+            subject=subject
+        )
     
     def _generate_examples(self, concept: str, subject: str, difficulty: str) -> List[Dict]:
         """Generate practical examples"""
@@ -407,240 +854,55 @@ Imagine {concept} like a tool in your learning toolkit. The more you practice an
     
     def _get_study_tips(self, learning_style: str) -> List[str]:
         """Personalized study tips based on learning style"""
-        tips = {
-            "visual": [
-                "📊 Create colorful mind maps and diagrams",
-                "📝 Use highlighters to color-code concepts",
-                "🎨 Watch educational videos and animations",
-                "🖼️ Draw pictures to represent ideas"
-            ],
-            "auditory": [
-                "🎧 Listen to educational podcasts",
-                "💬 Explain concepts out loud to yourself",
-                "👥 Join study groups for discussions",
-                "🎵 Create mnemonics and rhymes"
-            ],
-            "kinesthetic": [
-                "✋ Use hands-on activities and experiments",
-                "🚶 Walk around while studying",
-                "🎯 Build models and demonstrations",
-                "⚡ Take frequent breaks with movement"
-            ],
-            "reading": [
-                "📖 Read textbooks and articles thoroughly",
-                "📝 Take detailed written notes",
-                "📄 Create written summaries",
-                "✍️ Write practice essays and explanations"
-            ]
-        }
-        return tips.get(learning_style, tips["visual"])
+        return list(STUDY_TIPS.get(learning_style, STUDY_TIPS["visual"]))
     
+
     def _generate_topic_summary(self, query: str, subject: str, difficulty: str) -> str:
         """Generate a concise 2-3 sentence summary of the topic"""
         
-        # Clean up the query
-        topic = query.lower().strip()
-        
         # Generate summary based on difficulty level
-        if difficulty in ["elementary", "middle school"]:
-            return f"""**Quick Summary:** {query.title()} is an important concept in {subject} that helps you understand how things work. It's a building block that you'll use in many different situations, and once you master it, learning related topics becomes much easier."""
+        if difficulty in ("elementary", "middle school"):
+            formatter = SUMMARY_FORMATTERS["introductory"]
         elif difficulty == "high school":
-            return f"""**Quick Summary:** {query.title()} is a fundamental concept in {subject} that connects basic principles to advanced applications. Understanding this topic will help you solve complex problems and prepares you for higher-level coursework."""
+            formatter = SUMMARY_FORMATTERS["high school"]
         else:  # college/advanced
-            return f"""**Quick Summary:** {query.title()} represents a key theoretical and practical framework in {subject}. It synthesizes multiple concepts and has widespread applications across various domains, making it essential for advanced study and professional work."""
+            formatter = SUMMARY_FORMATTERS["advanced"]
+        
+        return formatter(title=query.title(), subject=subject)
     
+
     def _generate_basic_intro(self, query: str, subject: str, difficulty: str) -> str:
         """Generate a basic introduction to ease into the topic"""
         
         topic = query.strip()
-        
-        # Create engaging introductions based on subject
-        subject_intros = {
-            "math": f"""
-🧮 **Introduction to {topic}**
-
-Welcome! Let's start our journey into {topic}. Mathematics might seem challenging at first, but every concept has a logical foundation. 
-
-**What you'll discover:**
-- The core idea behind {topic} and why it matters
-- How it connects to what you already know
-- Real-world situations where this is useful
-
-Think of learning math like building with blocks - each new concept adds to your foundation, making you stronger at problem-solving. Let's build your understanding step by step!
-""",
-            "science": f"""
-🔬 **Introduction to {topic}**
-
-Science is all about understanding the world around us, and {topic} is a fascinating piece of that puzzle!
-
-**What you'll learn:**
-- The basic principles of {topic}
-- How scientists discovered or developed this idea
-- Why this matters in our daily lives
-
-Science isn't just facts to memorize - it's a way of thinking and exploring. Let's explore {topic} together through curiosity and discovery!
-""",
-            "computer science": f"""
-💻 **Introduction to {topic}**
-
-Welcome to the world of {topic}! Computer science combines logical thinking with creative problem-solving.
-
-**What we'll cover:**
-- The fundamental concepts behind {topic}
-- How this is used in real applications
-- Practical skills you'll develop
-
-Don't worry if it seems complex at first - every programmer started as a beginner. Let's break it down into manageable pieces!
-""",
-            "programming": f"""
-👨‍💻 **Introduction to {topic}**
-
-Ready to dive into {topic}? Programming is like learning a new language - it might feel unfamiliar at first, but with practice, it becomes second nature!
-
-**What you'll master:**
-- Core syntax and programming concepts
-- Best practices and coding standards
-- Hands-on examples and real projects
-- Problem-solving with code
-
-Every expert programmer started exactly where you are. Let's write some code and bring your ideas to life! 🚀
-""",
-            "web development": f"""
-🌐 **Introduction to {topic}**
-
-Welcome to web development! You're about to learn how websites and web applications come to life.
-
-**What you'll build:**
-- Understanding of {topic} fundamentals
-- Practical skills for creating web content
-- Modern development techniques
-- Real-world project experience
-
-The web is your canvas, and code is your paintbrush. Let's create something amazing together!
-""",
-            "data science": f"""
-📊 **Introduction to {topic}**
-
-Data science is where math, statistics, and programming meet to unlock insights from data. {topic} is your gateway to this exciting field!
-
-**What you'll learn:**
-- Data analysis and visualization techniques
-- Statistical thinking and machine learning basics
-- Working with real datasets
-- Tools used by professional data scientists
-
-Data is everywhere, and you're about to learn how to make it speak. Let's turn raw data into actionable insights!
-""",
-            "mobile development": f"""
-📱 **Introduction to {topic}**
-
-Mobile apps are in everyone's pocket! Learn {topic} and build applications used by millions.
-
-**What you'll create:**
-- Understanding of mobile app architecture
-- UI/UX design for mobile platforms
-- Native or cross-platform development skills
-- Real app projects for your portfolio
-
-Your app ideas can change the world. Let's turn them into reality, one screen at a time!
-""",
-            "devops": f"""
-⚙️ **Introduction to {topic}**
-
-DevOps bridges development and operations, making software delivery faster and more reliable. {topic} is essential in modern tech!
-
-**What you'll master:**
-- Automation and deployment pipelines
-- Infrastructure management
-- Monitoring and troubleshooting
-- Industry-standard tools and practices
-
-DevOps engineers are in high demand. Let's build your skills and make deployments smooth and stress-free!
-""",
-            "language": f"""
-📝 **Introduction to {topic}**
-
-Language is how we express ideas, tell stories, and connect with others. {topic} is an essential tool in your communication toolkit!
-
-**What you'll explore:**
-- The basics of {topic} and why it matters
-- How to apply this in your writing and speaking
-- Tips to improve your skills
-
-Good communication is a superpower in any career. Let's develop your abilities together!
-""",
-            "history": f"""
-🌍 **Introduction to {topic}**
-
-History helps us understand how we got to where we are today. {topic} is a window into the past that shapes our present!
-
-**What you'll discover:**
-- Key events and people related to {topic}
-- Why this period/event was significant
-- How it influences our world today
-
-History isn't just dates and names - it's stories of real people and pivotal moments. Let's explore {topic} together!
-"""
-        }
+        subject_key = subject.lower()
         
         # Get introduction for subject, with fallback
-        subject_key = subject.lower()
-        for key in subject_intros:
-            if key in subject_key:
-                return subject_intros[key]
+        formatter = INTRO_FORMATTERS.get(subject_key)
+        if formatter is None:
+            for key, candidate in INTRO_FORMATTERS.items():
+                if key in subject_key:
+                    formatter = candidate
+                    break
+        
+        if formatter is not None:
+            return formatter(topic=topic)
         
         # Default introduction
-        return f"""
-📚 **Introduction to {topic}**
-
-Welcome! You're about to learn something valuable about {topic} in {subject}.
-
-**What you'll discover:**
-- The fundamental concepts of {topic}
-- Why this topic is important
-- How to apply what you learn
-
-Learning is a journey, not a race. Let's take this step by step and build your confidence along the way!
-"""
+        return format_default_intro(topic=topic, subject=subject)
 
     
     def _generate_recommendations(self, query: str, subject: str, difficulty: str) -> List[str]:
         """Recommend next learning steps"""
-        return [
-            f"📚 Continue exploring {subject} at the {difficulty} level",
-            f"🎯 Practice 3-5 problems daily on this topic",
-            f"🔍 Connect this to related concepts you've learned",
-            f"👥 Teach this concept to someone else to deepen understanding",
-            f"📈 Track your progress and celebrate small wins"
-        ]
+        return [formatter(subject=subject, difficulty=difficulty) for formatter in RECOMMENDATION_FORMATTERS]
     
+
     def _find_resources(self, query: str, subject: str) -> List[Dict]:
         """Suggest external learning resources"""
+        fields = {"query": query, "slug": query.replace(' ', '_')}
         return [
-            {
-                "name": "Khan Academy",
-                "url": f"https://www.khanacademy.org",
-                "description": "Free video lessons and practice",
-                "type": "video"
-            },
-            {
-                "name": "Wikipedia",
-                "url": f"https://en.wikipedia.org/wiki/{query.replace(' ', '_')}",
-                "description": "Detailed background information",
-                "type": "reference"
-            },
-            {
-                "name": "YouTube Educational Channels",
-                "url": "https://www.youtube.com",
-                "description": f"Search for '{query} tutorial'",
-                "type": "video"
-            },
-            {
-                "name": "Practice Problems",
-                "url": "https://www.wolframalpha.com",
-                "description": "Step-by-step problem solving",
-                "type": "interactive"
-            }
+            {key: formatter(**fields) for key, formatter in resource.items()}
+            for resource in RESOURCE_FORMATTERS
         ]
 
 
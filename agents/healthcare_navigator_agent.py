@@ -5,16 +5,260 @@ IMPORTANT: This provides educational information only, not medical diagnosis
 """
 
 import json
+import os
 import re
+import threading
 from datetime import datetime
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
 from utils.observability import AgentLogger, AgentTracer, MetricsCollector
+from utils.observability import metrics as shared_metrics
 from utils.gemini_client import get_gemini_client
+from utils.fake_gemini import fake_backend_enabled
+from utils.token_budget import TokenBudget
+from utils.keyword_matcher import ProseMatcher, prose_words
+from utils.response_cache import LRUCache, MISSING
+from utils.frozen import FrozenDict, freeze, thaw
 
 logger = AgentLogger("HealthcareNavigatorAgent")
 tracer = AgentTracer()
 metrics = MetricsCollector()
 
+# Emergency red flags
+EMERGENCY_KEYWORDS = (
+    "chest pain", "difficulty breathing", "trouble breathing", "can't breathe",
+    "unable to breathe", "not breathing", "stopped breathing", "severe bleeding",
+    "loss of consciousness", "passed out", "unconscious", "stroke", "heart attack",
+    "severe head injury", "suicidal", "overdose", "poisoning",
+    "severe allergic reaction", "anaphylaxis", "choking", "seizure lasting",
+    "severe burn", "severe burned", "severe burning", "major trauma"
+)
+
+# Red flags phrased as verbs, also matched inflected ("overdosed", "stroking out")
+EMERGENCY_VERBS = ("overdose", "stroke out")
+
+# Urgency indicators below emergency, checked in this order
+TRIAGE_PATTERNS = (
+    ("urgent", (
+        "sudden", "suddenly", "severe", "severely", "acute", "intense", "worsening rapidly",
+        "can't eat", "can't sleep", "can't function", "high fever",
+        "spreading rapidly", "getting worse", "unbearable"
+    )),
+    ("soon", (
+        "persistent", "hasn't improved", "lasting", "won't go away",
+        "recurring", "concerning", "worried about"
+    )),
+    ("self_care", (
+        "mild", "occasional", "minor", "slight", "small",
+        "prevention", "how to avoid", "general question"
+    )),
+)
+
+# Symptoms that make a "severe" self-rating urgent
+SEVERE_SYMPTOMS = ("pain", "painful", "bleeding", "fever", "breathing")
+
+
+# Query types, checked in this order
+QUERY_TYPE_PATTERNS = (
+    ("symptom", (
+        "symptom", "feel", "feeling", "pain", "painful", "hurt", "hurts", "hurting",
+        "ache", "aching", "headache", "stomachache", "backache", "toothache", "earache",
+        "experiencing"
+    )),
+    ("condition", (
+        "what is", "disease", "condition", "disorder", "syndrome", "diagnosis", "diagnosed"
+    )),
+    ("treatment", (
+        "treatment", "cure", "medicine", "medication", "therapy", "how to treat"
+    )),
+    ("prevention", (
+        "prevent", "preventing", "preventive", "avoid", "reduce risk", "protection", "prevention"
+    )),
+)
+
+# Body systems for organization
+BODY_SYSTEMS = freeze({
+    "cardiovascular": ["heart", "blood pressure", "circulation", "chest"],
+    "respiratory": ["lungs", "breathing", "breathe", "cough", "coughing", "asthma"],
+    "digestive": ["stomach", "stomachache", "nausea", "diarrhea", "constipation", "appetite"],
+    "neurological": ["headache", "dizziness", "dizzy", "numbness", "confusion", "memory"],
+    "musculoskeletal": ["joint", "muscle", "back", "backache", "bone", "injury", "injured"],
+    "mental_health": ["anxiety", "depression", "stress", "stressed", "sleep", "sleeping", "mood"],
+    "dermatological": ["skin", "rash", "itch", "itchy", "itching", "wound"],
+    "general": ["fever", "feverish", "fatigue", "weight", "pain", "painful"]
+})
+
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "healthcare_resources.json")
+
+AGE_GROUPS = ("child", "teen", "adult", "senior")
+
+
+class ResourceCatalog:
+    """
+    Healthcare resources, urgency levels and emergency contacts, loaded once
+    from CATALOG_PATH into frozen structures shared by every agent instance.
+    
+    The resource list for each (urgency, age group) pair is precomputed at
+    load time, so a request only does a dict lookup and every response
+    shares the same read-only objects. reload() swaps in a new snapshot
+    atomically and notifies listeners (e.g. caches built on the catalog).
+    """
+    
+    def __init__(self, path: str = CATALOG_PATH):
+        self.path = path
+        self.version = 0
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._snapshot = self._load()
+    
+    @property
+    def urgency_levels(self) -> FrozenDict:
+        return self._snapshot["urgency_levels"]
+    
+    @property
+    def emergency_contacts(self) -> FrozenDict:
+        return self._snapshot["emergency_contacts"]
+    
+    def resources_for(self, urgency: str, age_group: str) -> Tuple[FrozenDict, ...]:
+        """Resources for an urgency level and age group (unknown age groups get the general list)"""
+        views = self._snapshot["views"]
+        return views.get((urgency, age_group)) or views[(urgency, None)]
+    
+    def reload(self):
+        """Re-read the catalog file and notify listeners"""
+        snapshot = self._load()
+        with self._lock:
+            self._snapshot = snapshot
+            self.version += 1
+            listeners = list(self._listeners)
+        logger.info(f"Healthcare resource catalog reloaded (version {self.version})")
+        for listener in listeners:
+            listener(self)
+    
+    def add_listener(self, callback: Callable[["ResourceCatalog"], None]):
+        """Call callback(catalog) after every reload"""
+        with self._lock:
+            self._listeners.append(callback)
+    
+    def _load(self) -> FrozenDict:
+        with open(self.path, encoding="utf-8") as f:
+            data = freeze(json.load(f))
+        
+        general = data["resources"]
+        views = {}
+        for urgency in data["urgency_levels"]:
+            base = (data["emergency_resource"],) if urgency == "emergency" else ()
+            base += general
+            views[(urgency, None)] = base
+            for age_group in AGE_GROUPS:
+                age_resource = data["age_resources"].get(age_group)
+                views[(urgency, age_group)] = base + (age_resource,) if age_resource else base
+        
+        return FrozenDict(
+            urgency_levels=data["urgency_levels"],
+            emergency_contacts=data["emergency_contacts"],
+            views=FrozenDict(views)
+        )
+
+
+# Shared by all HealthcareNavigatorAgent instances
+CATALOG = ResourceCatalog()
+
+# Template responses keyed by normalized query, age group, duration and
+# severity. Shared across sessions; emptied whenever the catalog changes.
+RESPONSE_CACHE = LRUCache(
+    max_entries=int(os.getenv("HEALTH_CACHE_MAX_ENTRIES", "512")),
+    ttl=float(os.getenv("HEALTH_CACHE_TTL_SECONDS", "3600")) or None
+)
+CATALOG.add_listener(lambda catalog: RESPONSE_CACHE.clear())
+
+# Response field that repeats the user's query, per query type
+QUERY_ECHO_FIELDS = {
+    "symptom": "symptom",
+    "condition": "condition",
+    "treatment": "treatment_topic",
+    "prevention": "prevention_topic",
+    "general": "topic"
+}
+
+
+def _build_query_matcher() -> ProseMatcher:
+    """
+    One matcher for every query signal: urgency levels (plus "severe_symptom"),
+    query types ("type:<name>") and body systems ("system:<name>")
+    """
+    matcher = ProseMatcher()
+    for keyword in EMERGENCY_KEYWORDS:
+        matcher.add(keyword, "emergency")
+    for keyword in EMERGENCY_VERBS:
+        matcher.add(keyword, "emergency", verb=True)
+    for level, patterns in TRIAGE_PATTERNS:
+        for pattern in patterns:
+            matcher.add(pattern, level)
+    for symptom in SEVERE_SYMPTOMS:
+        matcher.add(symptom, "severe_symptom")
+    for query_type, patterns in QUERY_TYPE_PATTERNS:
+        for pattern in patterns:
+            matcher.add(pattern, f"type:{query_type}")
+    for system, keywords in BODY_SYSTEMS.items():
+        for keyword in keywords:
+            matcher.add(keyword, f"system:{system}")
+    return matcher
+
+
+# Built once per process; matching is word-boundary aware and normalizes
+# case, punctuation, contractions ("cant breathe") and plurals
+QUERY_MATCHER = _build_query_matcher()
+
+_QUERY_TYPE_LABELS = tuple((query_type, f"type:{query_type}") for query_type, _ in QUERY_TYPE_PATTERNS)
+_SYSTEM_LABELS = tuple((system, f"system:{system}") for system in BODY_SYSTEMS)
+
+
+def analyze_query(query: str, severity: Optional[str] = None) -> Dict:
+    """
+    Analyze a health query in a single pass of QUERY_MATCHER
+    
+    Args:
+        query: User's health question or symptom description
+        severity: Self-rated severity (mild, moderate, severe)
+        
+    Returns:
+        Dict with urgency, query_type, body_systems, the raw matched signal
+        labels and the normalized query text, shared by every downstream helper
+    """
+    words = prose_words(query)
+    signals = QUERY_MATCHER.labels_in_words(words)
+    return {
+        "urgency": _urgency_from_signals(signals, severity),
+        "query_type": next(
+            (query_type for query_type, label in _QUERY_TYPE_LABELS if label in signals), "general"
+        ),
+        "body_systems": [system for system, label in _SYSTEM_LABELS if label in signals] or ["general"],
+        "signals": signals,
+        "normalized_query": " ".join(words)
+    }
+
+
+def assess_urgency(query: str, severity: Optional[str] = None) -> str:
+    """Triage a query into emergency, urgent, soon, self_care or routine"""
+    return _urgency_from_signals(QUERY_MATCHER.labels(query), severity)
+
+
+def _urgency_from_signals(found: Set[str], severity: Optional[str]) -> str:
+    """The most urgent level present among the matched signals wins"""
+    if "emergency" in found:
+        return "emergency"
+    
+    # Severe + certain symptoms = urgent
+    if severity == "severe" and "severe_symptom" in found:
+        return "urgent"
+    
+    for level, _ in TRIAGE_PATTERNS:
+        if level in found:
+            return level
+    
+    # Default to routine
+    return "routine"
+
 
 class HealthcareNavigatorAgent:
     """
@@ -32,8 +276,11 @@ class HealthcareNavigatorAgent:
         self.api_key = api_key
         self.gemini_client = None
         
-        # Try to initialize Gemini client
-        if api_key:
+        # Token limits for this agent's session (the Gemini client itself is shared)
+        self.token_budget = TokenBudget()
+        
+        # Try to initialize Gemini client (a key isn't needed with GEMINI_BACKEND=fake)
+        if api_key or fake_backend_enabled():
             self.gemini_client = get_gemini_client(api_key)
             if self.gemini_client:
                 logger.info("Gemini API integration enabled for Healthcare Navigator")
@@ -48,57 +295,26 @@ class HealthcareNavigatorAgent:
         emergency, call your doctor or dial 112 (Emergency) / 102/108 (Ambulance) immediately.
         """
         
-        # Urgency levels
-        self.urgency_levels = {
-            "emergency": {
-                "action": "🚨 CALL 112 (Emergency) or 102/108 (Ambulance) IMMEDIATELY",
-                "timeframe": "Now - this is life-threatening"
-            },
-            "urgent": {
-                "action": "⚡ See doctor today or go to Urgent Care within 2-4 hours",
-                "timeframe": "Within 24 hours"
-            },
-            "soon": {
-                "action": "📞 Schedule doctor appointment within next few days",
-                "timeframe": "Within 2-7 days"
-            },
-            "routine": {
-                "action": "📅 Bring up at next regular checkup or schedule appointment",
-                "timeframe": "Within 2-4 weeks"
-            },
-            "self_care": {
-                "action": "🏠 Can typically manage at home with self-care",
-                "timeframe": "Monitor and see doctor if worsens"
-            }
-        }
+        # Urgency levels and resources (shared, read-only)
+        self.catalog = CATALOG
+        self.urgency_levels = CATALOG.urgency_levels
         
-        # Emergency red flags
-        self.emergency_keywords = [
-            "chest pain", "difficulty breathing", "can't breathe", "severe bleeding",
-            "loss of consciousness", "passed out", "stroke", "heart attack",
-            "severe head injury", "suicidal", "overdose", "poisoning",
-            "severe allergic reaction", "anaphylaxis", "not breathing",
-            "choking", "seizure lasting", "severe burn", "major trauma"
-        ]
+        # Emergency red flags (shared, read-only)
+        self.emergency_keywords = EMERGENCY_KEYWORDS
         
-        # Body systems for organization
-        self.body_systems = {
-            "cardiovascular": ["heart", "blood pressure", "circulation", "chest"],
-            "respiratory": ["lungs", "breathing", "cough", "asthma"],
-            "digestive": ["stomach", "nausea", "diarrhea", "constipation", "appetite"],
-            "neurological": ["headache", "dizziness", "numbness", "confusion", "memory"],
-            "musculoskeletal": ["joint", "muscle", "back", "bone", "injury"],
-            "mental_health": ["anxiety", "depression", "stress", "sleep", "mood"],
-            "dermatological": ["skin", "rash", "itch", "wound"],
-            "general": ["fever", "fatigue", "weight", "pain"]
-        }
+        # Body systems for organization (shared, read-only)
+        self.body_systems = BODY_SYSTEMS
+        
+        # Template response cache (None disables caching)
+        self.response_cache = RESPONSE_CACHE
         
     def navigate(self,
                 query: str,
                 age_group: str = "adult",
                 duration: Optional[str] = None,
                 severity: Optional[str] = None,
-                trace_id: Optional[str] = None) -> Dict:
+                trace_id: Optional[str] = None,
+                stream: bool = False) -> Dict:
         """
         Main navigation function for healthcare information
         
@@ -108,6 +324,8 @@ class HealthcareNavigatorAgent:
             duration: How long symptoms have been present
             severity: mild, moderate, severe
             trace_id: Tracing ID for observability
+            stream: With Gemini, add an "information_stream" iterator of
+                AI-generated health information chunks to the response
             
         Returns:
             Dict with urgency assessment, information, resources, next steps
@@ -118,56 +336,55 @@ class HealthcareNavigatorAgent:
         logger.info(f"[{trace_id}] Healthcare query: {query[:50]}...")
         
         try:
-            # Check for emergency situations first
-            urgency = self._assess_urgency(query, severity)
+            # Urgency, query type and body systems from one pass over the query
+            analysis = analyze_query(query, severity)
+            urgency = analysis["urgency"]
             
+            # Check for emergency situations first
             if urgency == "emergency":
                 logger.warning(f"[{trace_id}] EMERGENCY DETECTED: {query[:100]}")
                 return self._emergency_response(query)
             
-            # Classify the query type
-            query_type = self._classify_query(query)
-            logger.info(f"[{trace_id}] Query type: {query_type}")
+            # Non-emergency template responses are deterministic, so serve repeats from cache
+            cache_key = None
+            response = None
+            from_cache = False
+            if self.response_cache is not None:
+                cache_key = (
+                    analysis["normalized_query"], age_group, (duration or "").strip().lower(),
+                    severity, self.catalog.version
+                )
+                cached = self.response_cache.get(cache_key)
+                shared_metrics.record_cache_event("healthcare_response", cached is not MISSING)
+                if cached is not MISSING:
+                    logger.info(f"[{trace_id}] Serving cached healthcare response")
+                    response = thaw(cached)
+                    self._echo_query(response, query, analysis["query_type"])
+                    from_cache = True
             
-            # Identify body system(s) involved
-            systems = self._identify_systems(query)
+            if response is None:
+                logger.info(f"[{trace_id}] Query type: {analysis['query_type']}")
+                response = self._build_response(query, analysis, age_group, duration, severity)
+                if cache_key is not None:
+                    self.response_cache.set(cache_key, freeze(response))
+                # Plain dicts and lists on both paths, never the shared catalog entries
+                response = thaw(response)
             
-            # Generate response based on query type
-            if query_type == "symptom":
-                response = self._explain_symptom(query, age_group, duration, severity, urgency)
-            elif query_type == "condition":
-                response = self._explain_condition(query, age_group)
-            elif query_type == "treatment":
-                response = self._explain_treatment(query)
-            elif query_type == "prevention":
-                response = self._prevention_guidance(query)
-            else:
-                response = self._general_health_info(query, age_group)
-            
-            # Add urgency assessment
-            response["urgency"] = {
-                "level": urgency,
-                "action": self.urgency_levels[urgency]["action"],
-                "timeframe": self.urgency_levels[urgency]["timeframe"]
-            }
-            
-            # Add resources
-            response["resources"] = self._find_resources(query, urgency, age_group)
-            
-            # Add when to seek help
-            response["when_to_see_doctor"] = self._when_to_see_doctor(query, urgency)
-            
-            # Add self-care tips if appropriate
-            if urgency in ["routine", "self_care"]:
-                response["self_care"] = self._self_care_tips(query, systems)
+            # AI-generated information, streamed to the UI as it arrives
+            if stream and self.gemini_client:
+                response["information_stream"] = self.stream_health_information(
+                    query, age_group, duration, severity
+                )
             
             # Add metadata
+            query_type = analysis["query_type"]
             duration_time = (datetime.now() - start_time).total_seconds()
             response["metadata"] = {
                 "age_group": age_group,
                 "urgency_level": urgency,
-                "body_systems": systems,
+                "body_systems": analysis["body_systems"],
                 "query_type": query_type,
+                "cached": from_cache,
                 "duration_seconds": round(duration_time, 2),
                 "timestamp": datetime.now().isoformat(),
                 "disclaimer": self.disclaimer
@@ -191,48 +408,88 @@ class HealthcareNavigatorAgent:
                 "metadata": {"disclaimer": self.disclaimer}
             }
     
-    def _assess_urgency(self, query: str, severity: Optional[str]) -> str:
-        """Assess urgency level of the situation"""
-        query_lower = query.lower()
+    def _build_response(self,
+                        query: str,
+                        analysis: Dict,
+                        age_group: str,
+                        duration: Optional[str],
+                        severity: Optional[str]) -> Dict:
+        """Template response for a non-emergency query (deterministic, cacheable)"""
+        query_type = analysis["query_type"]
+        urgency = analysis["urgency"]
+        
+        # Generate response based on query type
+        if query_type == "symptom":
+            response = self._explain_symptom(query, age_group, duration, severity, urgency)
+        elif query_type == "condition":
+            response = self._explain_condition(query, age_group)
+        elif query_type == "treatment":
+            response = self._explain_treatment(query)
+        elif query_type == "prevention":
+            response = self._prevention_guidance(query)
+        else:
+            response = self._general_health_info(query, age_group)
         
-        # Check for emergency keywords
-        for keyword in self.emergency_keywords:
-            if keyword in query_lower:
-                return "emergency"
+        # Add urgency assessment
+        level = self.catalog.urgency_levels[urgency]
+        response["urgency"] = {
+            "level": urgency,
+            "action": level["action"],
+            "timeframe": level["timeframe"]
+        }
         
-        # Check severity indicator
-        if severity == "severe":
-            # Severe + certain symptoms = urgent
-            if any(word in query_lower for word in ["pain", "bleeding", "fever", "breathing"]):
-                return "urgent"
+        # Add resources
+        response["resources"] = self._find_resources(query, analysis, age_group)
         
-        # Urgent indicators
-        urgent_patterns = [
-            "sudden", "severe", "acute", "intense", "worsening rapidly",
-            "can't eat", "can't sleep", "can't function", "high fever",
-            "spreading rapidly", "getting worse", "unbearable"
-        ]
-        if any(pattern in query_lower for pattern in urgent_patterns):
-            return "urgent"
+        # Add when to seek help
+        response["when_to_see_doctor"] = self._when_to_see_doctor(query, analysis)
         
-        # Soon indicators
-        soon_patterns = [
-            "persistent", "hasn't improved", "lasting", "won't go away",
-            "recurring", "concerning", "worried about"
-        ]
-        if any(pattern in query_lower for pattern in soon_patterns):
-            return "soon"
+        # Add self-care tips if appropriate
+        if urgency in ["routine", "self_care"]:
+            response["self_care"] = self._self_care_tips(query, analysis)
         
-        # Routine or self-care
-        minor_patterns = [
-            "mild", "occasional", "minor", "slight", "small",
-            "prevention", "how to avoid", "general question"
-        ]
-        if any(pattern in query_lower for pattern in minor_patterns):
-            return "self_care"
+        return response
+    
+    def _echo_query(self, response: Dict, query: str, query_type: str):
+        """Show this request's wording in a cached response built for an equivalent query"""
+        response[QUERY_ECHO_FIELDS[query_type]] = query
+        if query_type == "symptom":
+            response["overview"] = f"Understanding your symptom: {query}"
+    
+    def stream_health_information(self,
+                                  query: str,
+                                  age_group: str = "adult",
+                                  duration: Optional[str] = None,
+                                  severity: Optional[str] = None) -> Iterator[str]:
+        """
+        Stream Gemini-generated educational health information as text chunks
+        
+        Yields nothing if Gemini is unavailable or fails up front; the
+        template sections of the response still apply.
+        """
+        if not self.gemini_client:
+            return
         
-        # Default to routine
-        return "routine"
+        context = f"Age group: {age_group}"
+        if duration:
+            context += f", duration: {duration}"
+        if severity:
+            context += f", severity: {severity}"
+        
+        chunks = self.gemini_client.stream_health_information(
+            query, context, agent=self.name, budget=self.token_budget
+        )
+        first = next(chunks, "")
+        if not first or first.startswith("Error"):
+            logger.warning(f"Gemini health streaming failed: {first}")
+            return
+        
+        yield first
+        yield from chunks
+    
+    def _assess_urgency(self, query: str, severity: Optional[str]) -> str:
+        """Assess urgency level of the situation"""
+        return assess_urgency(query, severity)
     
     def _emergency_response(self, query: str) -> Dict:
         """Immediate response for emergency situations"""
@@ -260,36 +517,11 @@ class HealthcareNavigatorAgent:
     
     def _classify_query(self, query: str) -> str:
         """Classify the type of health query"""
-        query_lower = query.lower()
-        
-        # Symptom queries
-        if any(word in query_lower for word in ["symptom", "feel", "pain", "hurt", "ache", "experiencing"]):
-            return "symptom"
-        
-        # Condition/disease queries
-        if any(word in query_lower for word in ["what is", "disease", "condition", "disorder", "syndrome", "diagnosis"]):
-            return "condition"
-        
-        # Treatment queries
-        if any(word in query_lower for word in ["treatment", "cure", "medicine", "medication", "therapy", "how to treat"]):
-            return "treatment"
-        
-        # Prevention queries
-        if any(word in query_lower for word in ["prevent", "avoid", "reduce risk", "protection", "prevention"]):
-            return "prevention"
-        
-        return "general"
+        return analyze_query(query)["query_type"]
     
     def _identify_systems(self, query: str) -> List[str]:
         """Identify which body systems are involved"""
-        query_lower = query.lower()
-        involved_systems = []
-        
-        for system, keywords in self.body_systems.items():
-            if any(keyword in query_lower for keyword in keywords):
-                involved_systems.append(system)
-        
-        return involved_systems if involved_systems else ["general"]
+        return analyze_query(query)["body_systems"]
     
     def _explain_symptom(self, query: str, age_group: str, duration: Optional[str], 
                         severity: Optional[str], urgency: str) -> Dict:
@@ -514,7 +746,7 @@ For {age_group}s, focus on:
 """
         }
     
-    def _when_to_see_doctor(self, query: str, urgency: str) -> Dict:
+    def _when_to_see_doctor(self, query: str, analysis: Dict) -> Dict:
         """Guidance on when professional help is needed"""
         return {
             "general_guidance": "See a doctor if:",
@@ -535,7 +767,7 @@ For {age_group}s, focus on:
             ]
         }
     
-    def _self_care_tips(self, query: str, systems: List[str]) -> Dict:
+    def _self_care_tips(self, query: str, analysis: Dict) -> Dict:
         """Self-care recommendations for appropriate situations"""
         return {
             "self_care_measures": [
@@ -554,216 +786,13 @@ For {age_group}s, focus on:
             "when_to_escalate": "If symptoms don't improve in a reasonable timeframe or worsen, contact your healthcare provider."
         }
     
-    def _find_resources(self, query: str, urgency: str, age_group: str) -> List[Dict]:
-        """Find relevant healthcare resources - India specific"""
-        resources = []
-        
-        # Emergency resources
-        if urgency == "emergency":
-            resources.append({
-                "name": "🚨 Emergency Services - India",
-                "contact": "112 (All emergencies) | 102/108 (Ambulance)",
-                "description": "For life-threatening emergencies - Call immediately"
-            })
-        
-        # India-specific healthcare resources
-        resources.extend([
-            {
-                "name": "🇮🇳 Government Health Services",
-                "type": "official",
-                "resources": [
-                    "Aarogya Setu App - COVID-19 tracking & health info",
-                    "National Health Portal - https://www.nhp.gov.in",
-                    "e-Sanjeevani - Free telemedicine: https://esanjeevani.in",
-                    "Ayushman Bharat - Health insurance scheme",
-                    "Swasth Bharat - Health ministry portal"
-                ]
-            },
-            {
-                "name": "🏥 Online Doctor Consultation (India)",
-                "type": "telehealth",
-                "platforms": [
-                    "Practo - https://www.practo.com (Book doctors, online consultation)",
-                    "1mg - https://www.1mg.com (Doctors, medicines, lab tests)",
-                    "Apollo 24/7 - https://www.apollo247.com (24/7 consultation)",
-                    "Tata Health - Online consultations & pharmacy",
-                    "PharmEasy - https://pharmeasy.in (Medicines & health services)",
-                    "Lybrate - https://www.lybrate.com (Find doctors & consult online)",
-                    "DocsApp - Specialist doctor consultations",
-                    "MFine - AI-powered health assistant"
-                ]
-            },
-            {
-                "name": "🏥 Major Hospital Networks (India)",
-                "type": "hospitals",
-                "networks": [
-                    "AIIMS (All India Institute of Medical Sciences) - Delhi & across India",
-                    "Apollo Hospitals - Pan-India network",
-                    "Fortis Healthcare - Major cities",
-                    "Max Healthcare - North India",
-                    "Manipal Hospitals - Pan-India",
-                    "Medanta - Gurugram & other cities",
-                    "Narayana Health - Bangalore & multiple cities",
-                    "Lilavati Hospital - Mumbai",
-                    "Kokilaben Hospital - Mumbai",
-                    "Sir Ganga Ram Hospital - Delhi",
-                    "Christian Medical College (CMC) - Vellore",
-                    "Government Medical Colleges - Each state capital"
-                ]
-            },
-            {
-                "name": "💊 Online Pharmacies (India)",
-                "type": "pharmacy",
-                "services": [
-                    "1mg - Medicine delivery across India",
-                    "PharmEasy - Medicines & health products",
-                    "Netmeds - Online pharmacy",
-                    "Apollo Pharmacy - Trusted pharmacy chain",
-                    "Medlife - Medicines & diagnostics"
-                ]
-            },
-            {
-                "name": "🔬 Diagnostic & Lab Services (India)",
-                "type": "diagnostics",
-                "providers": [
-                    "Dr. Lal PathLabs - Pan-India lab network",
-                    "Thyrocare - Affordable diagnostic services",
-                    "SRL Diagnostics - Comprehensive testing",
-                    "Metropolis Healthcare - Advanced diagnostics",
-                    "Redcliffe Labs - Home sample collection",
-                    "Healthians - Preventive health checkups"
-                ]
-            },
-            {
-                "name": "🧠 Mental Health Support (India)",
-                "type": "mental_health",
-                "helplines": [
-                    "TISS iCall - 1800-599-0019 (Mon-Sat, 8 AM-10 PM)",
-                    "Vandrevala Foundation - +91-9820466726 (24/7)",
-                    "NIMHANS - 080-46110007 (Bangalore)",
-                    "Sumaitri - 011-23389090 (Delhi)",
-                    "Aasra - 022-27546669 (Mumbai, 24/7)",
-                    "Sneha - 044-24640050 (Chennai, 24/7)",
-                    "Connecting Trust - +91-9922001122 (Pune)",
-                    "MantraCare - https://mantracare.org - Online therapy",
-                    "BetterLYF - Online counseling platform",
-                    "InnerHour - Mental health app"
-                ]
-            },
-            {
-                "name": "📱 Health Apps & Portals (India)",
-                "type": "digital",
-                "apps": [
-                    "Aarogya Setu - Official COVID-19 & health app",
-                    "mySugr - Diabetes management",
-                    "HealthifyMe - Diet & fitness tracking",
-                    "Practo - Find doctors & book appointments",
-                    "1mg - Complete health management",
-                    "DigiLocker - Store health records digitally",
-                    "UMANG - Government services including health"
-                ]
-            },
-            {
-                "name": "📚 Trusted Health Information (India)",
-                "type": "educational",
-                "sources": [
-                    "National Health Portal - https://www.nhp.gov.in",
-                    "Ministry of Health - https://www.mohfw.gov.in",
-                    "Indian Medical Association - https://www.ima-india.org",
-                    "WHO India - https://www.who.int/india",
-                    "ICMR - https://www.icmr.gov.in (Indian Council of Medical Research)",
-                    "AIIMS - https://www.aiims.edu (Medical information)"
-                ]
-            },
-            {
-                "name": "🆘 Specialized Helplines (India)",
-                "type": "helplines",
-                "services": [
-                    "Women Helpline - 1091 / 181 (24/7)",
-                    "Child Helpline - 1098",
-                    "Senior Citizen Helpline - 1291 / 14567",
-                    "COVID-19 Helpline - 1075",
-                    "National Tobacco Quitline - 1800-112-356",
-                    "National AIDS Helpline - 1097",
-                    "Poison Information - 1066 (AIIMS)"
-                ]
-            },
-            {
-                "name": "💳 Health Insurance & Schemes (India)",
-                "type": "insurance",
-                "schemes": [
-                    "Ayushman Bharat (PMJAY) - Free health coverage up to ₹5 lakhs",
-                    "ESIC - Employee State Insurance for workers",
-                    "CGHS - Central Government Health Scheme",
-                    "Rashtriya Swasthya Bima Yojana (RSBY)",
-                    "Private Insurance - Star Health, HDFC Ergo, Care Health, etc."
-                ]
-            },
-            {
-                "name": "🚑 Ambulance Services (India)",
-                "type": "emergency",
-                "services": [
-                    "National Ambulance - 102 / 108 (Free in most states)",
-                    "Dial 4242 - Private ambulance booking",
-                    "Red Cross Ambulance - Local numbers",
-                    "State-specific ambulance numbers",
-                    "Hospital ambulances - Contact nearest hospital"
-                ]
-            }
-        ])
-        
-        # Add age-specific resources
-        if age_group == "child":
-            resources.append({
-                "name": "👶 Pediatric Care (India)",
-                "specialists": [
-                    "Rainbow Children's Hospitals",
-                    "Cloudnine Hospitals - Mother & child care",
-                    "Government pediatric wards in medical colleges",
-                    "Child Helpline - 1098 for emergencies"
-                ]
-            })
-        elif age_group == "senior":
-            resources.append({
-                "name": "👴 Senior Care (India)",
-                "services": [
-                    "Senior Citizen Helpline - 1291 / 14567",
-                    "Government hospitals with geriatric departments",
-                    "Elder care services through NGOs",
-                    "Home healthcare services via Portea, Nightingales, etc."
-                ]
-            })
-        
-        return resources
+    def _find_resources(self, query: str, analysis: Dict, age_group: str) -> Tuple[Dict, ...]:
+        """Find relevant healthcare resources - India specific (shared, read-only)"""
+        return self.catalog.resources_for(analysis["urgency"], age_group)
     
     def _get_emergency_contacts(self) -> Dict:
-        """Emergency contact information - India specific"""
-        return {
-            "🇮🇳 INDIA EMERGENCY NUMBERS": {
-                "🚨 Emergency (All Services)": "112",
-                "🚑 Ambulance": "102 / 108",
-                "🚓 Police": "100",
-                "🚒 Fire": "101",
-                "👮 Women Helpline": "1091 / 181",
-                "👶 Child Helpline": "1098",
-                "🧠 Mental Health Helpline": "1800-599-0019 (TISS iCall)",
-                "🆘 Mental Health Support": "+91-9820466726 (Vandrevala Foundation - 24/7)",
-                "☠️ Poison Control": "1066 (AIIMS)",
-                "🏥 COVID-19 Helpline": "1075",
-                "💊 Senior Citizen Helpline": "1291 / 14567",
-                "🚨 Disaster Management": "1070",
-                "📞 Railway Accidents": "1072",
-                "🚗 Road Accidents": "1073"
-            },
-            "🌐 ONLINE DOCTOR CONSULTATION": {
-                "Practo": "https://www.practo.com - Book appointments & online consultation",
-                "1mg": "https://www.1mg.com - Medicine delivery & doctor consultation",
-                "Apollo 24/7": "https://www.apollo247.com - 24/7 doctor consultation",
-                "Tata 1mg": "Online pharmacy & health services",
-                "PharmEasy": "https://pharmeasy.in - Medicine & lab tests"
-            },
-            "📍 Find Nearest Hospital": "Search 'hospitals near me' or use Google Maps"
-        }
+        """Emergency contact information - India specific (shared, read-only)"""
+        return self.catalog.emergency_contacts
     
     def _generate_doctor_questions(self, query: str) -> List[str]:
         """Generate helpful questions to ask your doctor"""
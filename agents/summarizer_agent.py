@@ -1,5 +1,9 @@
 from typing import List, Dict
 import re
+from utils.token_budget import compact_prompt
+
+# Token budget for the research findings included in an AI summary prompt
+SUMMARY_INPUT_TOKENS = 750
 
 class SummarizerAgent:
     """
@@ -51,7 +55,8 @@ class SummarizerAgent:
                 "Detailed": 500
             }.get(length, 300)
             
-            prompt = f"Summarize the following research findings:\n\n{text[:3000]}\n\nProvide a {length.lower()} summary."
+            findings = compact_prompt(text, SUMMARY_INPUT_TOKENS)
+            prompt = f"Summarize the following research findings:\n\n{findings}\n\nProvide a {length.lower()} summary."
             
             response = openai.ChatCompletion.create(
                 model="gpt-3.5-turbo",
@@ -1,7 +1,6 @@
 import streamlit as st
 import os
 from datetime import datetime
-import json
 import time
 from agents.research_agent import ResearchAgent
 from agents.summarizer_agent import SummarizerAgent
@@ -11,8 +10,11 @@ from agents.tts_agent import TextToSpeechAgent
 from agents.education_tutor_agent import EducationTutorAgent
 from agents.healthcare_navigator_agent import HealthcareNavigatorAgent
 from utils.session_manager import SessionService, MemoryBank
-from utils.observability import logger, tracer, metrics
+from utils.observability import logger, tracer, metrics, process_rss
 from utils.agent_evaluation import evaluator
+from utils.serializer import to_json
+from utils.token_budget import estimate_tokens
+from utils.research_reuse import ResearchReuse
 
 # Page configuration
 st.set_page_config(
@@ -64,6 +66,83 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+def render_text_stream(chunks) -> str:
+    """Render streamed text chunks into a placeholder as they arrive"""
+    placeholder = st.empty()
+    text = ""
+    for chunk in chunks:
+        text += chunk
+        placeholder.markdown(text + "▌")
+    placeholder.markdown(text)
+    return text
+
+
+def history_ref(research: dict, session_id: str) -> dict:
+    """
+    What a browser tab keeps of a research in its history list; the full
+    entry is loaded from the SessionService when opened, so tabs do not
+    hold duplicate payloads (or keep evicted sessions alive)
+    """
+    return {'topic': research['topic'], 'timestamp': research['timestamp'], 'session_id': session_id}
+
+
+@st.cache_resource
+def get_services():
+    """
+    The process-wide SessionService, MemoryBank and ResearchReuse. Shared by
+    every browser tab, so the session memory limits (and the reuse of
+    results) apply to the whole process rather than to each tab.
+    """
+    session_service = SessionService()
+    memory_bank = MemoryBank()
+    return session_service, memory_bank, ResearchReuse(session_service, memory_bank)
+
+
+def run_research_pipeline(topic: str, research_type: str, settings: dict, api_key: str = None) -> dict:
+    """The research pipeline without progress UI, for background refreshes of reused results"""
+    trace_id = tracer.start_trace("research_refresh", {'topic': topic, 'type': research_type})
+    try:
+        search_results = ResearchAgent(api_key=api_key).search(topic, max_results=settings['max_results'])
+        summary = SummarizerAgent(api_key=api_key).summarize(search_results, length=settings['summary_length'])
+        report = ReportGenerator().generate(
+            topic=topic,
+            search_results=search_results,
+            summary=summary,
+            include_citations=settings['generate_citations']
+        )
+        accessibility_agent = AccessibilityAgent()
+        accessible_content = accessibility_agent.make_accessible({
+            'report': report,
+            'summary': summary,
+            'search_results': search_results,
+            'topic': topic
+        })
+        audio_content = audio_navigation = None
+        if settings['audio_enabled']:
+            tts_agent = TextToSpeechAgent()
+            audio_content = tts_agent.prepare_for_speech(accessible_content['report'])
+            audio_navigation = tts_agent.generate_audio_navigation({'report': report})
+    except Exception:
+        tracer.end_trace(trace_id, "failure")
+        raise
+
+    tracer.end_trace(trace_id, "success")
+    return {
+        'topic': topic,
+        'type': research_type,
+        'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'search_results': search_results,
+        'summary': summary,
+        'report': report,
+        'accessible_content': accessible_content,
+        'accessibility_validation': accessibility_agent.validate_accessibility(accessible_content),
+        'audio_content': audio_content,
+        'audio_navigation': audio_navigation,
+        'trace_id': trace_id,
+        'settings': settings
+    }
+
+
 # Initialize session state
 if 'research_history' not in st.session_state:
     st.session_state.research_history = []
@@ -71,10 +150,8 @@ if 'current_research' not in st.session_state:
     st.session_state.current_research = None
 if 'show_results_tab' not in st.session_state:
     st.session_state.show_results_tab = False
-if 'session_service' not in st.session_state:
-    st.session_state.session_service = SessionService()
-if 'memory_bank' not in st.session_state:
-    st.session_state.memory_bank = MemoryBank()
+(st.session_state.session_service, st.session_state.memory_bank,
+ st.session_state.research_reuse) = get_services()
 if 'session_id' not in st.session_state:
     st.session_state.session_id = st.session_state.session_service.create_session()
 if 'high_contrast' not in st.session_state:
@@ -152,7 +229,13 @@ with st.sidebar:
             with st.expander(f"🔖 {research['topic'][:30]}..."):
                 st.caption(f"Time: {research['timestamp']}")
                 if st.button(f"Load #{len(st.session_state.research_history) - idx}", key=f"load_{idx}"):
-                    st.session_state.current_research = research
+                    loaded = st.session_state.session_service.get_history_entry(
+                        research['session_id'], research['topic'], research['timestamp']
+                    )
+                    if loaded:
+                        st.session_state.current_research = loaded
+                    else:
+                        st.warning("This research is no longer available")
     else:
         st.info("No research history yet")
     
@@ -161,6 +244,11 @@ with st.sidebar:
         st.session_state.current_research = None
         st.rerun()
 
+# One-shot notice from the run before a rerun: research served from an earlier result
+reuse_notice = st.session_state.pop('reuse_notice', None)
+if reuse_notice:
+    st.success(reuse_notice)
+
 # Show notification when research is complete
 if st.session_state.show_results_tab and st.session_state.current_research:
     st.success("✅ Research completed! Click on the **📄 Results** tab (next to Research) to view your research.")
@@ -224,9 +312,64 @@ with tab1:
                 try:
                     # Check memory bank for previous research
                     existing_memory = st.session_state.memory_bank.retrieve_memory(research_topic)
-                    if existing_memory:
+                    if existing_memory and existing_memory['topic'] != research_topic:
+                        st.info(f"📚 Found previous research on a similar topic: \"{existing_memory['topic']}\" (accessed {existing_memory['access_count']} times)")
+                    elif existing_memory:
                         st.info(f"📚 Found previous research on this topic (accessed {existing_memory['access_count']} times)")
                     
+                    research_settings = {
+                        'max_results': max_results,
+                        'summary_length': summary_length,
+                        'deep_analysis': deep_analysis,
+                        'generate_citations': generate_citations,
+                        'screen_reader_mode': screen_reader_mode,
+                        'high_contrast': high_contrast,
+                        'audio_enabled': enable_audio
+                    }
+                    
+                    # Reuse a fresh enough result for the same topic and settings
+                    research_reuse = st.session_state.research_reuse
+                    start_time = time.time()
+                    reused = research_reuse.find(
+                        research_topic, research_type, research_settings,
+                        session_id=st.session_state.session_id, memory=existing_memory
+                    )
+                    metrics.record_cache_event("research_reuse", reused is not None)
+                    if reused:
+                        tracer.add_span(trace_id, "ResearchReuse", "find", time.time() - start_time, "success")
+                        tracer.end_trace(trace_id, "success")
+                        logger.get_logger().info(f"Reused research from {reused['timestamp']} for: {research_topic}")
+                        
+                        st.session_state.current_research = reused
+                        st.session_state.research_history.append(history_ref(reused, reused['reused']['session_id']))
+                        st.session_state.show_results_tab = True
+                        
+                        age_minutes = reused['reused']['age_seconds'] / 60
+                        message = f"♻️ Reused research from {reused['timestamp']} ({age_minutes:.0f} min old) for the same settings"
+                        if research_reuse.needs_refresh(reused):
+                            session_service = st.session_state.session_service
+                            memory_bank = st.session_state.memory_bank
+                            session_id = st.session_state.session_id
+                            
+                            def store_refresh(research_data):
+                                session_service.add_to_history(session_id, research_data)
+                                memory_bank.store_memory(
+                                    research_data['topic'],
+                                    {'summary': research_data['summary'], 'sources': len(research_data['search_results'])},
+                                    {'type': research_data['type'], 'timestamp': research_data['timestamp'],
+                                     'session_id': session_id}
+                                )
+                            
+                            if research_reuse.refresh(
+                                research_topic,
+                                lambda: run_research_pipeline(research_topic, research_type, research_settings, api_key),
+                                store_refresh
+                            ):
+                                message += "; refreshing it in the background"
+                        # Shown after the rerun (a message rendered now would be discarded)
+                        st.session_state.reuse_notice = message
+                        st.rerun()
+                    
                     # Initialize agents
                     research_agent = ResearchAgent(api_key=api_key)
                     summarizer_agent = SummarizerAgent(api_key=api_key)
@@ -349,18 +492,11 @@ with tab1:
                         'audio_content': audio_content,
                         'audio_navigation': audio_navigation,
                         'trace_id': trace_id,
-                        'settings': {
-                            'max_results': max_results,
-                            'summary_length': summary_length,
-                            'deep_analysis': deep_analysis,
-                            'screen_reader_mode': screen_reader_mode,
-                            'high_contrast': high_contrast,
-                            'audio_enabled': enable_audio
-                        }
+                        'settings': research_settings
                     }
                     
                     st.session_state.current_research = research_data
-                    st.session_state.research_history.append(research_data)
+                    st.session_state.research_history.append(history_ref(research_data, st.session_state.session_id))
                     
                     # Store in session and memory bank
                     st.session_state.session_service.add_to_history(
@@ -371,7 +507,8 @@ with tab1:
                     st.session_state.memory_bank.store_memory(
                         research_topic,
                         {'summary': summary, 'sources': len(search_results)},
-                        {'type': research_type, 'timestamp': research_data['timestamp']}
+                        {'type': research_type, 'timestamp': research_data['timestamp'],
+                         'session_id': st.session_state.session_id}
                     )
                     
                     # End trace
@@ -460,24 +597,18 @@ with tab3:
                 try:
                     start_time = time.time()
                     
-                    # Call education tutor agent
+                    # Call education tutor agent (Gemini explanation is streamed)
                     tutor_result = st.session_state.tutor_agent.tutor(
                         query=education_query,
                         subject=None if subject == "Auto-detect" else subject.lower(),
                         difficulty=difficulty.lower(),
                         learning_style=learning_style.lower(),
-                        trace_id=trace_id
+                        trace_id=trace_id,
+                        stream=True
                     )
                     
-                    duration = time.time() - start_time
-                    metrics.record_agent_call("EducationTutorAgent", duration, True)
-                    tracer.end_trace(trace_id, "success")
-                    
-                    # Evaluate Education Agent
-                    edu_eval = evaluator.evaluate_education_agent(education_query, tutor_result, duration)
-                    
-                    # Display results
-                    st.success(f"✅ Lesson prepared! Quality: {edu_eval['rating']}")
+                    # Filled in once the streamed explanation has finished
+                    status_placeholder = st.empty()
                     
                     # Metadata
                     st.markdown(f"**Subject:** {tutor_result['metadata']['subject']} | "
@@ -486,21 +617,42 @@ with tab3:
                     
                     st.divider()
                     
-                    # Display summary first (if available)
-                    if 'quick_summary' in tutor_result:
-                        st.markdown("### ⚡ Quick Summary")
-                        st.info(tutor_result['quick_summary'])
-                    
-                    # Display introduction (if available)
-                    if 'introduction' in tutor_result:
-                        st.markdown(tutor_result['introduction'])
-                        st.divider()
+                    # Summary and introduction go above the explanation, but
+                    # may still be generating while it streams
+                    intro_container = st.container()
                     
                     # Main explanation
-                    if 'explanation' in tutor_result:
+                    if 'explanation_stream' in tutor_result:
+                        st.markdown("### 📖 Detailed Explanation")
+                        tutor_result['explanation'] = render_text_stream(tutor_result.pop('explanation_stream'))
+                    elif 'explanation' in tutor_result:
                         st.markdown("### 📖 Detailed Explanation")
                         st.markdown(tutor_result['explanation'])
                     
+                    if 'pending_sections' in tutor_result:
+                        tutor_result.update(tutor_result.pop('pending_sections')())
+                    
+                    with intro_container:
+                        # Display summary first (if available)
+                        if 'quick_summary' in tutor_result:
+                            st.markdown("### ⚡ Quick Summary")
+                            st.info(tutor_result['quick_summary'])
+                        
+                        # Display introduction (if available)
+                        if 'introduction' in tutor_result:
+                            st.markdown(tutor_result['introduction'])
+                            st.divider()
+                    
+                    duration = time.time() - start_time
+                    metrics.record_agent_call("EducationTutorAgent", duration, True)
+                    tracer.end_trace(trace_id, "success")
+                    
+                    # Evaluate Education Agent
+                    edu_eval = evaluator.evaluate_education_agent(education_query, tutor_result, duration)
+                    
+                    # Display results
+                    status_placeholder.success(f"✅ Lesson prepared! Quality: {edu_eval['rating']}")
+                    
                     # Concept-specific content
                     if 'concept' in tutor_result:
                         st.markdown(f"### 💡 Understanding: {tutor_result['concept']}")
@@ -732,9 +884,13 @@ with tab4:
                         age_group=age_group.lower(),
                         duration=None if symptom_duration == "Not applicable" else symptom_duration,
                         severity=None if symptom_severity == "Not applicable" else symptom_severity.lower(),
-                        trace_id=trace_id
+                        trace_id=trace_id,
+                        stream=True
                     )
                     
+                    # Streamed Gemini content is rendered (and timed) below
+                    information_stream = health_result.pop('information_stream', None)
+                    
                     duration = time.time() - start_time
                     metrics.record_agent_call("HealthcareNavigatorAgent", duration, True)
                     tracer.end_trace(trace_id, "success")
@@ -779,6 +935,11 @@ with tab4:
                         if 'information' in health_result:
                             st.markdown(health_result['information'])
                         
+                        # AI health information, rendered as tokens arrive
+                        if information_stream is not None:
+                            st.markdown("### 🤖 AI Health Information (Educational)")
+                            health_result['ai_information'] = render_text_stream(information_stream)
+                        
                         # Symptom-specific information
                         if 'possible_causes' in health_result:
                             with st.expander("🔍 Possible Causes (Educational)"):
@@ -1045,6 +1206,8 @@ with tab2:
             st.metric("Sources Found", len(research.get('search_results', [])))
         with col3:
             st.metric("Timestamp", research['timestamp'].split()[1])
+        if research.get('reused'):
+            st.caption(f"♻️ Reused from the research of {research['reused']['timestamp']} with the same topic and settings")
         
         st.divider()
         
@@ -1099,7 +1262,7 @@ with tab2:
         
         with col2:
             if st.button("📥 Download JSON"):
-                json_data = json.dumps(research, indent=2)
+                json_data = to_json(research)
                 st.download_button(
                     label="Download JSON",
                     data=json_data,
@@ -1257,7 +1420,7 @@ with tab5:
                 )
         
         with col3:
-            validation_json = json.dumps(validation, indent=2)
+            validation_json = to_json(validation)
             st.download_button(
                 label="📥 Validation Report",
                 data=validation_json,
@@ -1320,6 +1483,42 @@ with tab6:
     
     st.divider()
     
+    # Cache Performance
+    st.subheader("⚡ Cache Performance")
+    cache_stats = metrics_summary.get('cache_stats', {})
+    
+    if cache_stats:
+        for cache_name, stats in cache_stats.items():
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric(f"{cache_name} Hit Ratio", f"{stats['hit_ratio']:.1f}%")
+            with col2:
+                st.metric("Hits", stats['hits'])
+            with col3:
+                st.metric("Misses", stats['misses'])
+    else:
+        st.info("No cache activity yet.")
+    
+    st.divider()
+    
+    # LLM Token Usage
+    st.subheader("🪙 LLM Token Usage")
+    token_usage = metrics_summary.get('token_usage', {})
+    
+    if token_usage:
+        for agent_name, usage in token_usage.items():
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric(f"{agent_name} Requests", usage['requests'])
+            with col2:
+                st.metric("Tokens In", usage['tokens_in'])
+            with col3:
+                st.metric("Tokens Out", usage['tokens_out'])
+    else:
+        st.info("No LLM token usage yet.")
+    
+    st.divider()
+    
     # Recent Traces
     st.subheader("🔍 Recent Execution Traces")
     recent_traces = tracer.get_recent_traces(5)
@@ -1425,6 +1624,37 @@ with tab6:
         with col2:
             st.metric("Research History", len(session['research_history']))
             st.metric("Context Items", len(session['context']))
+        
+        if session['context']:
+            last_topic = session['research_history'][-1]['topic'] if session['research_history'] else ""
+            compacted = st.session_state.session_service.get_compact_context(st.session_state.session_id, last_topic)
+            with st.expander(f"🧠 Compacted Context (~{estimate_tokens(compacted)} tokens)"):
+                st.text(compacted)
+    
+    # Memory pressure of the in-memory session tier
+    st.divider()
+    st.subheader("🧮 Memory Pressure")
+    memory_stats = st.session_state.session_service.memory_stats()
+    rss = process_rss()
+    metrics.record_gauge('session_memory_pressure', memory_stats['pressure'])
+    if rss is not None:
+        metrics.record_gauge('process_rss_mb', rss / (1024 * 1024))
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Loaded Sessions", memory_stats['sessions_loaded'])
+    with col2:
+        quota = f" / {memory_stats['max_bytes'] / (1024 * 1024):.0f} MB" if memory_stats['max_bytes'] else ""
+        st.metric("Session Memory", f"{memory_stats['bytes'] / (1024 * 1024):.1f} MB{quota}")
+    with col3:
+        st.metric("Pressure", f"{memory_stats['pressure'] * 100:.1f}%")
+    with col4:
+        st.metric("Process RSS", f"{rss / (1024 * 1024):.0f} MB" if rss is not None else "n/a")
+    st.progress(min(1.0, memory_stats['pressure']))
+    if memory_stats['evictions']:
+        st.caption("Evicted sessions: " + ", ".join(
+            f"{reason.replace('_', ' ')} {count}" for reason, count in sorted(memory_stats['evictions'].items())
+        ))
     
     # Export Metrics
     st.divider()
@@ -1445,7 +1675,7 @@ with tab6:
     
     with col2:
         if st.button("📥 Export Traces"):
-            traces_data = json.dumps(tracer.get_recent_traces(10), indent=2)
+            traces_data = to_json(tracer.get_recent_traces(10))
             st.download_button(
                 label="Download Traces JSON",
                 data=traces_data,
@@ -0,0 +1,99 @@
+"""
+Benchmark: AsyncGeminiClient tail latency against a latency-injecting fake model
+
+Uses the fake Gemini backend (utils/fake_gemini.py): most calls are fast, a
+few take a long tail latency, and a fraction fail with a retryable 503. No
+network or API key is needed.
+
+Reports p50/p95/p99 latency and failures with hedging off and on.
+
+Usage:
+    python benchmarks/bench_async_gemini.py --requests 500 --users 8 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.async_gemini_client import AsyncGeminiClient, GeminiRequestError
+from utils.fake_gemini import FakeGenerativeModel
+from utils.gemini_client import GeminiClient
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run(args, hedge_after):
+    model = FakeGenerativeModel(
+        latency_ms=args.fast * 1000,
+        latency_dist='uniform',
+        tail_rate=args.slow_rate,
+        tail_ms=args.slow * 1000,
+        error_rate=args.error_rate,
+        error_codes=(503,),
+        seed=args.seed
+    )
+    sync_client = GeminiClient(model=model, enable_cache=False)
+    client = AsyncGeminiClient(
+        client=sync_client,
+        max_concurrency=args.concurrency,
+        base_delay=0.01,
+        max_delay=0.1,
+        timeout=args.deadline,
+        hedge_after=hedge_after
+    )
+
+    latencies = []
+    failures = 0
+
+    async def worker(worker_id):
+        # Closed loop: each simulated user waits for an answer before asking again
+        nonlocal failures
+        for i in range(worker_id, args.requests, args.users):
+            start = time.perf_counter()
+            try:
+                await client.generate_text(f"prompt {i}")
+                latencies.append(time.perf_counter() - start)
+            except GeminiRequestError:
+                failures += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(w) for w in range(args.users)))
+    wall = time.perf_counter() - start
+    return latencies, failures, model.calls, wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--users", type=int, default=8, help="simulated concurrent users")
+    parser.add_argument("--concurrency", type=int, default=16, help="client in-flight cap")
+    parser.add_argument("--fast", type=float, default=0.02, help="typical latency (s)")
+    parser.add_argument("--slow", type=float, default=0.5, help="tail latency (s)")
+    parser.add_argument("--slow-rate", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--hedge-after", type=float, default=0.06)
+    parser.add_argument("--deadline", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{args.requests} requests from {args.users} users, cap {args.concurrency}, "
+          f"{args.slow_rate:.0%} slow ({args.slow}s), {args.error_rate:.0%} errors\n")
+    print(f"{'mode':<16}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'failed':>8}{'calls':>8}{'wall s':>8}")
+    for label, hedge_after in (("no hedging", None), (f"hedge @{args.hedge_after}s", args.hedge_after)):
+        latencies, failures, calls, wall = asyncio.run(run(args, hedge_after))
+        print(f"{label:<16}"
+              f"{percentile(latencies, 50) * 1000:>10.1f}"
+              f"{percentile(latencies, 95) * 1000:>10.1f}"
+              f"{percentile(latencies, 99) * 1000:>10.1f}"
+              f"{failures:>8}{calls:>8}{wall:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark: research history with and without the content-addressed blob store
+
+Replays the research entries of the checked-in sessions/ corpus into
+--sessions sessions (every session researches the same topics, as happens
+when users repeat popular queries) through SessionService and reports, for
+inline history (the previous format) and for each blob compression:
+- time per add_to_history (journal append, including blob writes)
+- time per snapshot (compaction of the whole session)
+- reload time of one session
+- size on disk
+
+Runs in temporary directories.
+
+Usage:
+    python benchmarks/bench_blob_store.py --sessions 20 --researches 30
+"""
+
+import argparse
+import glob
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.blob_store import FileBlobStore
+from utils.session_manager import SessionService
+from utils.session_store import JournalSessionStore
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_corpus():
+    """Research history entries from the checked-in sessions"""
+    entries = []
+    for path in sorted(glob.glob(os.path.join(ROOT, "sessions", "*.json"))):
+        with open(path) as f:
+            entries.extend(json.load(f).get("research_history", []))
+    if not entries:
+        entries = [{"topic": "placeholder", "report": "renewable energy storage " * 2000}]
+    return entries
+
+
+def directory_bytes(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total
+
+
+def make_store(path, compression):
+    # Snapshots are timed separately, so the journal is never compacted here
+    store = JournalSessionStore(path, snapshot_every=1 << 30, fsync="never")
+    store.blobs = FileBlobStore(os.path.join(path, "blobs"), compression) if compression else None
+    return store
+
+
+def run(corpus, sessions, researches, compression):
+    with tempfile.TemporaryDirectory() as tmp:
+        service = SessionService(tmp, store=make_store(tmp, compression), max_loaded=sessions)
+        append_samples, snapshot_samples = [], []
+        session_ids = []
+        for _ in range(sessions):
+            session_id = service.create_session("bench")
+            session_ids.append(session_id)
+            for i in range(researches):
+                start = time.perf_counter()
+                service.add_to_history(session_id, dict(corpus[i % len(corpus)]))
+                append_samples.append(time.perf_counter() - start)
+
+        for session_id in session_ids:
+            start = time.perf_counter()
+            service.store.compact(service.get_session(session_id))
+            snapshot_samples.append(time.perf_counter() - start)
+
+        size = directory_bytes(tmp)
+
+        reload_samples = []
+        for session_id in session_ids[:5]:
+            start = time.perf_counter()
+            history = SessionService(tmp, store=make_store(tmp, compression)).get_session_history(session_id)
+            reload_samples.append(time.perf_counter() - start)
+            assert len(history) == researches
+
+        return {
+            "append ms": statistics.mean(append_samples) * 1000,
+            "snapshot ms": statistics.median(snapshot_samples) * 1000,
+            "reload ms": statistics.median(reload_samples) * 1000,
+            "disk KB": size / 1024,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--researches", type=int, default=30, help="history entries per session")
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    print(f"{args.sessions} sessions x {args.researches} researches, {len(corpus)} corpus entries\n")
+    print(f"{'history':<10}{'append ms':>11}{'snapshot ms':>13}{'reload ms':>11}{'disk KB':>11}")
+    for compression in (None, "none", "zlib", "lzma"):
+        result = run(corpus, args.sessions, args.researches, compression)
+        label = f"blob/{compression}" if compression else "inline"
+        print(f"{label:<10}{result['append ms']:>11.3f}{result['snapshot ms']:>13.2f}"
+              f"{result['reload ms']:>11.2f}{result['disk KB']:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark: incremental context compaction
+
+Adds --items synthetic research context items to one ContextCompactor and
+reports, at several history lengths:
+- add: time per new item (incremental summary update)
+- rebuild: time to recompact the whole history from scratch, what a
+  non-incremental compactor pays per new item
+- build: time to produce a --tokens context for a query
+and how many query-relevant items the compacted context keeps compared with
+the previous keep-the-last-10 behaviour.
+
+Usage:
+    python benchmarks/bench_context_compactor.py --items 5000 --tokens 500
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.context_compactor import ContextCompactor
+
+SUBJECTS = ["quantum computing", "solar panels", "battery chemistry", "wind farms", "gene editing",
+            "coral reefs", "grid policy", "neural networks", "vaccine trials", "urban transit"]
+QUALITIES = ["Excellent", "Good", "Fair"]
+
+
+def make_item(rng, i):
+    subject = rng.choice(SUBJECTS)
+    return (f"Searched for: {subject} study {i} (Quality: {rng.choice(QUALITIES)}). "
+            f"Key finding {i} concerns {subject} and {rng.choice(SUBJECTS)}.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--tokens", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    items = [make_item(rng, i) for i in range(args.items)]
+    query = "coral reefs"
+    checkpoints = sorted({n for n in (10, 100, 1000, args.items) if n <= args.items})
+
+    print(f"{'items':>7}{'add µs':>10}{'rebuild ms':>12}{'build µs':>10}{'relevant kept':>15}{'last-10 kept':>14}")
+    compactor = ContextCompactor()
+    added = 0
+    for checkpoint in checkpoints:
+        start = time.perf_counter()
+        compactor.extend(items[added:checkpoint])
+        add_us = (time.perf_counter() - start) / (checkpoint - added) * 1e6
+        added = checkpoint
+
+        start = time.perf_counter()
+        ContextCompactor().extend(items[:checkpoint])
+        rebuild_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        for _ in range(20):
+            context = compactor.build(query, args.tokens)
+        build_us = (time.perf_counter() - start) / 20 * 1e6
+
+        relevant = sum(1 for line in context.splitlines() if query in line)
+        last_ten = sum(1 for item in items[max(0, checkpoint - 10):checkpoint] if query in item)
+        print(f"{checkpoint:>7}{add_us:>10.1f}{rebuild_ms:>12.2f}{build_us:>10.1f}{relevant:>15}{last_ten:>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Benchmark: session startup and first-request latency, per-agent vs pooled Gemini clients
+
+Simulates N Streamlit sessions starting at once. Each session builds an
+EducationTutorAgent and a HealthcareNavigatorAgent with the same API key and
+then sends its first Gemini request. Compared modes:
+- per-agent: every agent constructs its own GeminiClient (old behaviour)
+- pooled:    agents share clients through utils.gemini_client.client_pool
+
+By default the SDK is simulated offline: creating a client's generative
+service client (its own connection settings for its key) costs
+--configure-ms, and the first request on a fresh connection costs
+--connect-ms extra. Pass --live to use the real SDK with GEMINI_API_KEY
+instead.
+
+Usage:
+    python benchmarks/bench_gemini_client_pool.py --sessions 100
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import agents.education_tutor_agent as tutor_module
+import agents.healthcare_navigator_agent as health_module
+import utils.gemini_client as gemini_module
+from agents.education_tutor_agent import EducationTutorAgent
+from agents.healthcare_navigator_agent import HealthcareNavigatorAgent
+from utils.gemini_client import GeminiClient, GeminiClientPool
+
+
+class SimulatedSDK:
+    """Offline stand-in for GenerativeModel and its per-key service clients, with realistic setup costs"""
+
+    def __init__(self, configure_ms: float, connect_ms: float, request_ms: float):
+        self.configure_cost = configure_ms / 1000
+        self.connect_cost = connect_ms / 1000
+        self.request_cost = request_ms / 1000
+        self.clients = 0
+        self.connections = 0
+        self.lock = threading.Lock()
+
+    def client_class(self):
+        sdk = self
+
+        class GenerativeServiceClient:
+            def __init__(self, client_options=None):
+                time.sleep(sdk.configure_cost)
+                with sdk.lock:
+                    sdk.clients += 1
+                self.connected = False
+
+        return GenerativeServiceClient
+
+    def model_class(self):
+        sdk = self
+
+        class Response:
+            text = "ok"
+            parts = ["ok"]
+
+        class GenerativeModel:
+            def __init__(self, model_name):
+                self.model_name = model_name
+                self._client = None
+                self._async_client = None
+
+            def generate_content(self, prompt, generation_config=None, stream=False):
+                if not self._client.connected:
+                    time.sleep(sdk.connect_cost)
+                    with sdk.lock:
+                        sdk.connections += 1
+                    self._client.connected = True
+                time.sleep(sdk.request_cost)
+                return Response()
+
+        return GenerativeModel
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run(mode: str, sessions: int, api_key: str):
+    if mode == "per-agent":
+        factory = GeminiClient
+    else:
+        gemini_module.client_pool = GeminiClientPool(batch_window=0)
+        factory = gemini_module.get_gemini_client
+    tutor_module.get_gemini_client = factory
+    health_module.get_gemini_client = factory
+
+    startup, first_request = [], []
+
+    def session(_):
+        start = time.perf_counter()
+        tutor = EducationTutorAgent(api_key=api_key)
+        health = HealthcareNavigatorAgent(api_key=api_key)
+        startup.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        tutor.gemini_client.generate_text("first question", use_cache=False)
+        health.gemini_client.generate_text("first question", use_cache=False)
+        first_request.append(time.perf_counter() - start)
+
+    with ThreadPoolExecutor(max_workers=min(32, sessions)) as pool:
+        list(pool.map(session, range(sessions)))
+    return startup, first_request
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--configure-ms", type=float, default=5.0)
+    parser.add_argument("--connect-ms", type=float, default=150.0)
+    parser.add_argument("--request-ms", type=float, default=20.0)
+    parser.add_argument("--live", action="store_true", help="use the real SDK and GEMINI_API_KEY")
+    args = parser.parse_args()
+
+    api_key = os.getenv("GEMINI_API_KEY") if args.live else "offline-benchmark-key"
+    if not api_key:
+        parser.error("--live needs GEMINI_API_KEY")
+
+    print(f"{args.sessions} sessions x 2 agents\n")
+    print(f"{'mode':<12}{'startup p50':>14}{'startup p95':>14}{'first req p50':>15}{'first req p95':>15}{'clients':>12}")
+    for mode in ("per-agent", "pooled"):
+        sdk = None
+        if not args.live:
+            sdk = SimulatedSDK(args.configure_ms, args.connect_ms, args.request_ms)
+            gemini_module.genai = SimpleNamespace(GenerativeModel=sdk.model_class(),
+                                                  types=SimpleNamespace(GenerationConfig=dict))
+            gemini_module.glm = SimpleNamespace(GenerativeServiceClient=sdk.client_class(),
+                                                GenerativeServiceAsyncClient=lambda client_options=None: None)
+
+        startup, first_request = run(mode, args.sessions, api_key)
+        configures = sdk.clients if sdk else "-"
+        print(f"{mode:<12}"
+              f"{percentile(startup, 50) * 1000:>12.1f}ms"
+              f"{percentile(startup, 95) * 1000:>12.1f}ms"
+              f"{percentile(first_request, 50) * 1000:>13.1f}ms"
+              f"{percentile(first_request, 95) * 1000:>13.1f}ms"
+              f"{configures:>12}")
+
+
+if __name__ == "__main__":
+    main()
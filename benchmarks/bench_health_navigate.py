@@ -0,0 +1,93 @@
+"""
+Benchmark: HealthcareNavigatorAgent.navigate() latency and allocations
+
+Reports, for the template (non-Gemini) path with the response cache off
+(or on, with --cache):
+- retained memory per agent instance
+- mean/p95 latency per navigate() call
+- peak bytes allocated by a single navigate() call
+
+Usage:
+    python benchmarks/bench_health_navigate.py --instances 200 --iterations 2000 [--cache]
+"""
+
+import argparse
+import gc
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.healthcare_navigator_agent import HealthcareNavigatorAgent
+
+QUERIES = [
+    ("I have a persistent headache for 3 days", "adult", "3 days", "moderate"),
+    ("How can I prevent heart disease?", "senior", None, None),
+    ("My child has a mild rash on the arm", "child", "1 day", "mild"),
+    ("What is asthma?", "teen", None, None),
+    ("What treatment options exist for back pain?", "adult", "2 weeks", "moderate"),
+]
+
+
+def measure_instances(instances: int) -> float:
+    """Bytes retained per agent instance"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    agents = [HealthcareNavigatorAgent() for _ in range(instances)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    retained = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del agents
+    return retained / instances
+
+
+def measure_latency(agent: HealthcareNavigatorAgent, iterations: int):
+    """Per-call latencies in microseconds"""
+    samples = []
+    for i in range(iterations):
+        query, age_group, duration, severity = QUERIES[i % len(QUERIES)]
+        start = time.perf_counter()
+        agent.navigate(query, age_group=age_group, duration=duration, severity=severity, trace_id="bench")
+        samples.append((time.perf_counter() - start) * 1e6)
+    return samples
+
+
+def measure_request_allocation(agent: HealthcareNavigatorAgent) -> float:
+    """Mean peak bytes allocated by one navigate() call"""
+    peaks = []
+    for query, age_group, duration, severity in QUERIES:
+        gc.collect()
+        tracemalloc.start()
+        agent.navigate(query, age_group=age_group, duration=duration, severity=severity, trace_id="bench")
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peaks.append(peak)
+    return statistics.mean(peaks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--instances", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--cache", action="store_true", help="keep the response cache enabled")
+    args = parser.parse_args()
+
+    agent = HealthcareNavigatorAgent()
+    if not args.cache:
+        agent.response_cache = None
+    measure_latency(agent, 100)  # warm up
+    samples = sorted(measure_latency(agent, args.iterations))
+
+    print(f"Retained per instance:  {measure_instances(args.instances):,.0f} bytes")
+    print(f"navigate() mean:        {statistics.mean(samples):.1f} µs")
+    print(f"navigate() p95:         {samples[int(len(samples) * 0.95)]:.1f} µs")
+    print(f"Peak per navigate():    {measure_request_allocation(agent):,.0f} bytes")
+
+
+if __name__ == "__main__":
+    main()
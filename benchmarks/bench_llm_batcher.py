@@ -0,0 +1,120 @@
+"""
+Benchmark: GeminiClient with and without micro-batching under a request quota
+
+Simulates concurrent tutor users sending prompts (a share of them repeated,
+as popular questions are) to a fake model that enforces a requests-per-second
+quota and rejects calls over it with a 429. Compares:
+- direct:  each generate_text call goes straight to the model
+- batched: calls go through MicroBatcher (coalescing + token-bucket pacing)
+
+Reports answered/rejected prompts, model calls, wall time and the queueing
+delay recorded in metrics.
+
+Usage:
+    python benchmarks/bench_llm_batcher.py --users 32 --prompts 400 --quota 50
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.gemini_client import GeminiClient
+from utils.llm_batcher import MicroBatcher
+from utils.observability import metrics
+
+
+class QuotaExceeded(Exception):
+    code = 429
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+        self.parts = [text]
+
+
+class QuotaModel:
+    """Fake model with fixed latency that rejects calls beyond `quota` per second"""
+
+    def __init__(self, quota: int, latency: float):
+        self.quota = quota
+        self.latency = latency
+        self.calls = 0
+        self._window_start = time.monotonic()
+        self._window_calls = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt, generation_config=None, stream=False):
+        with self._lock:
+            self.calls += 1
+            now = time.monotonic()
+            if now - self._window_start >= 1.0:
+                self._window_start, self._window_calls = now, 0
+            self._window_calls += 1
+            over_quota = self._window_calls > self.quota
+        time.sleep(self.latency)
+        if over_quota:
+            raise QuotaExceeded("429 quota exceeded")
+        return FakeResponse(f"answer to: {prompt}")
+
+
+def run(args, batched: bool):
+    model = QuotaModel(args.quota, args.latency)
+    client = GeminiClient(model=model, enable_cache=False)
+    if batched:
+        # Stay a little under the quota, without an initial burst, since the
+        # fake quota is counted over fixed one-second windows
+        client.batcher = MicroBatcher(client._request, window=args.window, max_workers=args.users,
+                                      requests_per_minute=args.quota * 60 * 0.95, burst=1)
+
+    rng = random.Random(args.seed)
+    popular = [f"popular question {i}" for i in range(10)]
+    prompts = [rng.choice(popular) if rng.random() < args.repeat_rate else f"question {i}"
+               for i in range(args.prompts)]
+
+    metrics.metrics['custom_metrics'] = []
+    start = time.perf_counter()
+    # Silence the per-request error prints for rejected calls
+    with ThreadPoolExecutor(max_workers=args.users) as pool, contextlib.redirect_stdout(io.StringIO()):
+        answers = list(pool.map(client.generate_text, prompts))
+    wall = time.perf_counter() - start
+
+    if client.batcher is not None:
+        client.batcher.close()
+    rejected = sum(answer.startswith("Error") for answer in answers)
+    delays = sorted(m['value'] for m in metrics.metrics['custom_metrics']
+                    if m['name'] == 'llm_batch_queue_delay')
+    p95_delay = delays[int(len(delays) * 0.95)] * 1000 if delays else 0.0
+    return len(answers) - rejected, rejected, model.calls, wall, p95_delay
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=32)
+    parser.add_argument("--prompts", type=int, default=400)
+    parser.add_argument("--quota", type=int, default=50, help="model requests per second")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--window", type=float, default=0.02)
+    parser.add_argument("--repeat-rate", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{args.prompts} prompts from {args.users} users, quota {args.quota}/s, "
+          f"{args.repeat_rate:.0%} repeated\n")
+    print(f"{'mode':<10}{'answered':>10}{'rejected':>10}{'calls':>8}{'wall s':>8}{'answers/s':>11}{'queue p95':>12}")
+    for label, batched in (("direct", False), ("batched", True)):
+        answered, rejected, calls, wall, p95_delay = run(args, batched)
+        print(f"{label:<10}{answered:>10}{rejected:>10}{calls:>8}{wall:>8.2f}"
+              f"{answered / wall:>11.1f}{p95_delay:>10.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
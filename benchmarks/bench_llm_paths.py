@@ -0,0 +1,129 @@
+"""
+Benchmark: throughput and tail latency of the Gemini-backed agent paths, offline
+
+Runs the Education Tutor (Gemini sections) and the Healthcare Navigator
+(streamed Gemini information) against the fake Gemini backend
+(GEMINI_BACKEND=fake), so no network or API key is needed. Latency
+distribution, tail and error injection are set with the flags below.
+
+Reports per path: requests/s, p50/p95/p99 latency and, for streaming, time
+to first chunk, plus the Gemini token usage recorded in metrics.
+
+Usage:
+    python benchmarks/bench_llm_paths.py --users 16 --requests 10 --latency-ms 80 --error-rate 0.05
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TUTOR_QUERIES = [
+    ("What is photosynthesis?", "high school"),
+    ("How do I solve quadratic equations?", "college"),
+    ("Explain docker containers", "advanced"),
+    ("Tell me about the french revolution", "middle school"),
+]
+
+HEALTH_QUERIES = [
+    ("I have had a headache and mild fever", "adult"),
+    ("How can I prevent the flu?", "senior"),
+    ("My child has a sore throat", "child"),
+]
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def configure_fake_backend(args):
+    """Select and configure the fake backend before any client is built"""
+    os.environ['GEMINI_BACKEND'] = 'fake'
+    os.environ['GEMINI_FAKE_LATENCY_MS'] = str(args.latency_ms)
+    os.environ['GEMINI_FAKE_LATENCY_DIST'] = args.dist
+    os.environ['GEMINI_FAKE_TAIL_RATE'] = str(args.tail_rate)
+    os.environ['GEMINI_FAKE_TAIL_MS'] = str(args.tail_ms)
+    os.environ['GEMINI_FAKE_ERROR_RATE'] = str(args.error_rate)
+    os.environ['GEMINI_FAKE_SEED'] = str(args.seed)
+    os.environ['GEMINI_REQUESTS_PER_MINUTE'] = str(args.rpm)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=10, help="requests per user per path")
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    parser.add_argument("--dist", default="lognormal", choices=("fixed", "uniform", "lognormal"))
+    parser.add_argument("--tail-rate", type=float, default=0.02)
+    parser.add_argument("--tail-ms", type=float, default=1500.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rpm", type=float, default=0, help="client request quota (0 = none)")
+    parser.add_argument("--cache", action="store_true", help="keep the response cache enabled")
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    configure_fake_backend(args)
+
+    from agents.education_tutor_agent import EducationTutorAgent
+    from agents.healthcare_navigator_agent import HealthcareNavigatorAgent
+    from utils.gemini_client import client_pool
+    from utils.observability import metrics
+
+    if not args.cache:
+        client_pool.get().cache = None
+
+    tutor_latency, health_latency, health_ttfc = [], [], []
+    fallbacks = 0
+
+    def user(user_id):
+        nonlocal fallbacks
+        tutor = EducationTutorAgent()
+        health = HealthcareNavigatorAgent()
+        for i in range(args.requests):
+            query, difficulty = TUTOR_QUERIES[(user_id + i) % len(TUTOR_QUERIES)]
+            start = time.perf_counter()
+            tutor.tutor(f"{query} (user {user_id}, #{i})", difficulty=difficulty, trace_id="bench")
+            tutor_latency.append(time.perf_counter() - start)
+
+            query, age_group = HEALTH_QUERIES[(user_id + i) % len(HEALTH_QUERIES)]
+            start = time.perf_counter()
+            response = health.navigate(f"{query} (user {user_id}, #{i})", age_group=age_group,
+                                       trace_id="bench", stream=True)
+            first_chunk = None
+            for _ in response.get("information_stream", ()):
+                if first_chunk is None:
+                    first_chunk = time.perf_counter() - start
+            if first_chunk is None:
+                fallbacks += 1
+            else:
+                health_ttfc.append(first_chunk)
+            health_latency.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.users) as pool:
+        list(pool.map(user, range(args.users)))
+    wall = time.perf_counter() - start
+
+    print(f"\n{args.users} users x {args.requests} requests per path, fake latency "
+          f"{args.dist} {args.latency_ms}ms, {args.tail_rate:.0%} tail at {args.tail_ms}ms, "
+          f"{args.error_rate:.0%} errors\n")
+    print(f"{'path':<22}{'req/s':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for label, values in (("tutor (sections)", tutor_latency),
+                          ("health (stream total)", health_latency),
+                          ("health (first chunk)", health_ttfc)):
+        print(f"{label:<22}{len(values) / wall:>8.1f}"
+              f"{percentile(values, 50) * 1000:>10.1f}"
+              f"{percentile(values, 95) * 1000:>10.1f}"
+              f"{percentile(values, 99) * 1000:>10.1f}")
+    print(f"\nhealth streams with no Gemini content (errors): {fallbacks}")
+    print(f"token usage: {metrics.get_metrics_summary()['token_usage']}")
+
+
+if __name__ == "__main__":
+    main()
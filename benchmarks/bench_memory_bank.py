@@ -0,0 +1,129 @@
+"""
+Benchmark: MemoryBank.retrieve_memory with write-through vs write-back access counts
+
+Stores --memories memories, then retrieves random topics (--reads times)
+with:
+- write-through: the previous behaviour, every retrieval saves the memory
+  (flush_every=1, flush_interval=0)
+- write-back: access counts buffered and flushed in batches (defaults)
+
+for the JSON and SQLite stores, and reports median and p99 latency per
+retrieval. Then times search_memories / get_recent_memories /
+get_popular_topics and store_memory on the JSON store with --indexed
+memories, against the previous full scan and sort. Runs in temporary
+directories.
+
+Usage:
+    python benchmarks/bench_memory_bank.py --memories 2000 --reads 5000 --indexed 20000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.memory_store import JsonMemoryStore
+from utils.session_manager import MemoryBank
+from utils.sqlite_store import SqliteDatabase, SqliteMemoryStore
+
+
+def make_store(backend, root):
+    if backend == "json":
+        return JsonMemoryStore(os.path.join(root, "memory_bank"))
+    return SqliteMemoryStore(SqliteDatabase(os.path.join(root, "omnicare.db")))
+
+
+WORDS = ["solar", "wind", "battery", "hydrogen", "nuclear", "quantum", "climate", "biology", "history",
+         "markets", "storage", "grid", "policy", "materials", "learning", "vision"]
+
+
+def scan_search(memories, query, limit):
+    """The previous search: substring scan, then sort every match"""
+    query_lower = query.lower()
+    results = [memory for memory in memories.values() if query_lower in memory['topic'].lower()]
+    results.sort(key=lambda x: (x['access_count'], x['timestamp']), reverse=True)
+    return results[:limit]
+
+
+def timed_us(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(samples)
+
+
+def run_queries(count):
+    rng = random.Random(5)
+    with tempfile.TemporaryDirectory() as root:
+        bank = MemoryBank(root, store=JsonMemoryStore(root))
+        start = time.perf_counter()
+        for i in range(count):
+            bank.store_memory(f"{rng.choice(WORDS)} {rng.choice(WORDS)} study {i}", {"summary": "insight"})
+        store_us = (time.perf_counter() - start) / count * 1e6
+        memories = bank.store.memories
+
+        queries = ["quantum grid", "solar", "study 123", "vision"]
+        rows = [
+            ("search", lambda: [scan_search(memories, q, 5) for q in queries],
+             lambda: [bank.search_memories(q, 5) for q in queries]),
+            ("recent", lambda: sorted(memories.values(), key=lambda x: x['timestamp'], reverse=True)[:10],
+             lambda: bank.get_recent_memories(10)),
+            ("popular", lambda: sorted(memories.values(), key=lambda x: x['access_count'], reverse=True)[:5],
+             lambda: bank.get_popular_topics(5)),
+        ]
+        print(f"\n{count} memories (JSON store), µs per call (search: {len(queries)} queries)")
+        print(f"{'query':<10}{'scan':>10}{'indexed':>10}")
+        for name, scan, indexed in rows:
+            print(f"{name:<10}{timed_us(scan, 20):>10.1f}{timed_us(indexed, 20):>10.1f}")
+        print(f"store_memory (file write + index update): {store_us:.1f} µs")
+
+
+def run(backend, mode, memories, reads):
+    rng = random.Random(3)
+    with tempfile.TemporaryDirectory() as root:
+        if mode == "write-through":
+            bank = MemoryBank(root, store=make_store(backend, root), flush_every=1, flush_interval=0)
+        else:
+            bank = MemoryBank(root, store=make_store(backend, root))
+        topics = [f"topic {i}" for i in range(memories)]
+        for topic in topics:
+            bank.store_memory(topic, {"summary": "insight " * 50})
+
+        samples = []
+        for _ in range(reads):
+            topic = rng.choice(topics)
+            start = time.perf_counter()
+            bank.retrieve_memory(topic)
+            samples.append((time.perf_counter() - start) * 1e6)
+        bank.close()
+
+        samples.sort()
+        return statistics.median(samples), samples[int(len(samples) * 0.99)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--memories", type=int, default=2000)
+    parser.add_argument("--reads", type=int, default=5000)
+    parser.add_argument("--indexed", type=int, default=20000, help="memories for the query test")
+    args = parser.parse_args()
+
+    print(f"{args.memories} memories, {args.reads} retrievals\n")
+    print(f"{'store':<8}{'mode':<15}{'median µs':>11}{'p99 µs':>10}")
+    for backend in ("json", "sqlite"):
+        for mode in ("write-through", "write-back"):
+            median, p99 = run(backend, mode, args.memories, args.reads)
+            print(f"{backend:<8}{mode:<15}{median:>11.1f}{p99:>10.1f}")
+
+    run_queries(args.indexed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark: serving a repeated research from ResearchReuse
+
+Replays the research entries of the checked-in sessions/ corpus into
+--sessions sessions of --researches entries each (timestamped now, with the
+app's default settings), then times ResearchReuse.find() for:
+- same-session: the topic was researched earlier in the current session
+- cross-session: found through the topic's MemoryBank memory in another
+  session, whose history is loaded from disk (a fresh SessionService)
+- miss: no earlier research with these settings
+
+A miss costs the lookup on top of the full agent pipeline (seconds, mostly
+web search and LLM calls), which a hit skips. Runs in temporary directories.
+
+Usage:
+    python benchmarks/bench_research_reuse.py --sessions 20 --researches 30 --lookups 200
+"""
+
+import argparse
+import glob
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.memory_store import JsonMemoryStore
+from utils.research_reuse import ResearchReuse
+from utils.session_manager import MemoryBank, SessionService
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SETTINGS = {
+    'max_results': 5,
+    'summary_length': 'Medium',
+    'deep_analysis': True,
+    'generate_citations': True,
+    'screen_reader_mode': False,
+    'high_contrast': False,
+    'audio_enabled': True
+}
+
+
+def load_corpus():
+    """Research history entries from the checked-in sessions"""
+    entries = []
+    for path in sorted(glob.glob(os.path.join(ROOT, "sessions", "*.json"))):
+        with open(path) as f:
+            entries.extend(json.load(f).get("research_history", []))
+    if not entries:
+        entries = [{"topic": "placeholder", "type": "General", "search_results": [], "summary": "",
+                    "report": "renewable energy storage " * 2000}]
+    return entries
+
+
+def timed_us(lookups, find):
+    samples = []
+    for topic, session_id in lookups:
+        start = time.perf_counter()
+        found = find(topic, session_id)
+        samples.append((time.perf_counter() - start) * 1e6)
+        assert found is not None
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--researches", type=int, default=30)
+    parser.add_argument("--lookups", type=int, default=200)
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as root:
+        sessions_path = os.path.join(root, "sessions")
+        service = SessionService(sessions_path)
+        bank = MemoryBank(root, store=JsonMemoryStore(os.path.join(root, "memory_bank")))
+        owners = {}
+        for s in range(args.sessions):
+            session_id = service.create_session()
+            for r in range(args.researches):
+                entry = dict(rng.choice(corpus), settings=SETTINGS,
+                             timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+                entry["topic"] = f"{entry.get('topic', 'research')} #{s}-{r}"
+                service.add_to_history(session_id, entry)
+                bank.store_memory(entry["topic"], {"summary": entry.get("summary", "")},
+                                  {"type": entry.get("type"), "session_id": session_id})
+                owners[entry["topic"]] = (session_id, entry.get("type"))
+        bank.flush()
+
+        topics = list(owners)
+        lookups = [rng.choice(topics) for _ in range(args.lookups)]
+        reuse = ResearchReuse(service, bank)
+
+        def same_session(topic, _):
+            session_id, research_type = owners[topic]
+            return reuse.find(topic, research_type, SETTINGS, session_id=session_id)
+
+        # Nothing loaded: every other session's history comes from disk
+        cold = ResearchReuse(SessionService(sessions_path, max_loaded=1), bank)
+        other = service.create_session()
+
+        def cross_session(topic, _):
+            return cold.find(topic, owners[topic][1], SETTINGS, session_id=other)
+
+        def miss(topic, _):
+            found = reuse.find(topic, owners[topic][1], dict(SETTINGS, max_results=10), session_id=other)
+            return found is None or None
+
+        print(f"{args.sessions} sessions x {args.researches} researches, {args.lookups} lookups\n")
+        print(f"{'lookup':<16}{'median µs':>11}{'p99 µs':>10}")
+        for label, find in (("same-session", same_session), ("cross-session", cross_session), ("miss", miss)):
+            median, p99 = timed_us([(topic, None) for topic in lookups], find)
+            print(f"{label:<16}{median:>11.1f}{p99:>10.1f}")
+        bank.close()
+
+
+if __name__ == "__main__":
+    main()
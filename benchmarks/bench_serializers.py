@@ -0,0 +1,99 @@
+"""
+Benchmark: serialization formats over the sessions/ corpus
+
+Writes and reads every checked-in session file with each STORAGE_FORMAT
+and reports per-session write and read time and total size:
+- indent2: the previous json.dump(..., indent=2) / json.load
+- json: compact JSON, with the stdlib encoder and with orjson (if installed)
+- zlib / gzip: compact JSON, compressed
+
+Sessions are serialized whole, as written before the blob store moved
+history payloads out of snapshots; memories and traces behave alike.
+
+Usage:
+    python benchmarks/bench_serializers.py --repeat 20
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import serializer
+from utils.serializer import Serializer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_corpus():
+    sessions = []
+    for path in sorted(glob.glob(os.path.join(ROOT, "sessions", "*.json"))):
+        with open(path) as f:
+            sessions.append(json.load(f))
+    return sessions
+
+
+def legacy_dump(value, path):
+    with open(path, "w") as f:
+        json.dump(value, f, indent=2)
+
+
+def legacy_load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def run(corpus, repeat, dump, load):
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [os.path.join(tmp, f"{i}.json") for i in range(len(corpus))]
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for session, path in zip(corpus, paths):
+                dump(session, path)
+        write_ms = (time.perf_counter() - start) / (repeat * len(corpus)) * 1000
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for path in paths:
+                load(path)
+        read_ms = (time.perf_counter() - start) / (repeat * len(corpus)) * 1000
+
+        for session, path in zip(corpus, paths):
+            assert load(path) == session
+        size = sum(os.path.getsize(path) for path in paths)
+    return write_ms, read_ms, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    print(f"{len(corpus)} sessions, {args.repeat} rounds, orjson {'installed' if serializer.orjson else 'not installed'}\n")
+    print(f"{'format':<14}{'write ms':>10}{'read ms':>10}{'size KB':>10}")
+
+    rows = [("indent2", legacy_dump, legacy_load, False)]
+    fast = serializer.orjson is not None
+    rows.append(("json/stdlib", Serializer("json").dump, serializer.load, True))
+    if fast:
+        rows.append(("json/orjson", Serializer("json").dump, serializer.load, False))
+    for fmt in ("zlib", "gzip"):
+        rows.append((fmt, Serializer(fmt).dump, serializer.load, False))
+
+    orjson = serializer.orjson
+    for label, dump, load, stdlib in rows:
+        serializer.orjson = None if stdlib else orjson
+        write_ms, read_ms, size = run(corpus, args.repeat, dump, load)
+        print(f"{label:<14}{write_ms:>10.3f}{read_ms:>10.3f}{size / 1024:>10.0f}")
+    serializer.orjson = orjson
+
+
+if __name__ == "__main__":
+    main()
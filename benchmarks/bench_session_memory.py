@@ -0,0 +1,103 @@
+"""
+Benchmark: memory of a long-running SessionService
+
+Simulates --users users, each creating sessions and running --researches
+researches per session (research entries from the checked-in sessions/
+corpus, made unique per research) until --sessions sessions exist, with
+earlier sessions revisited at random. Reports loaded sessions, their
+approximate size and the process RSS at checkpoints for:
+- unbounded: no count, idle or byte limit (every session stays loaded)
+- bounded: the default SESSION_CACHE_SIZE / SESSION_MEMORY_MB /
+  SESSION_USER_MEMORY_MB limits, scaled by --memory-mb
+
+Each mode runs in its own process so RSS readings do not mix. Runs in
+temporary directories; needs Linux for RSS.
+
+Usage:
+    python benchmarks/bench_session_memory.py --sessions 400 --researches 5 --memory-mb 32
+"""
+
+import argparse
+import glob
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MB = 1024 * 1024
+
+
+def load_corpus():
+    """Research history entries from the checked-in sessions"""
+    entries = []
+    for path in sorted(glob.glob(os.path.join(ROOT, "sessions", "*.json"))):
+        with open(path) as f:
+            entries.extend(json.load(f).get("research_history", []))
+    if not entries:
+        entries = [{"topic": "placeholder", "report": "renewable energy storage " * 2000}]
+    return entries
+
+
+def run(mode, sessions, researches, users, memory_mb):
+    from utils.observability import process_rss
+    from utils.session_manager import SessionService
+
+    corpus = load_corpus()
+    rng = random.Random(13)
+    with tempfile.TemporaryDirectory() as root:
+        if mode == "unbounded":
+            service = SessionService(root, max_loaded=1 << 30, idle_ttl=0, max_bytes=0, user_max_bytes=0)
+        else:
+            service = SessionService(root, idle_ttl=0, max_bytes=memory_mb * MB,
+                                     user_max_bytes=memory_mb * MB // 4)
+        created = []
+        start = time.perf_counter()
+        for s in range(sessions):
+            session_id = service.create_session(user_id=f"user{s % users}")
+            created.append(session_id)
+            for r in range(researches):
+                entry = dict(rng.choice(corpus), topic=f"topic {s}-{r}")
+                # Unique payloads, as distinct researches would have
+                entry["report"] = f"{entry.get('report', '')} [{s}-{r}]"
+                service.add_to_history(session_id, entry)
+                service.add_context(session_id, f"Researched: topic {s}-{r}")
+            # Revisit an earlier session now and then
+            service.get_session_history(rng.choice(created))
+
+            if (s + 1) % max(1, sessions // 4) == 0:
+                stats = service.memory_stats()
+                rss = process_rss()
+                print(f"{mode:<11}{s + 1:>9}{stats['sessions_loaded']:>8}{stats['bytes'] / MB:>12.1f}"
+                      f"{rss / MB if rss else float('nan'):>10.1f}{sum(stats['evictions'].values()):>11}")
+        elapsed = time.perf_counter() - start
+    print(f"{mode:<11}{'':>9}{elapsed / (sessions * researches) * 1e3:>8.2f} ms per research")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=400)
+    parser.add_argument("--researches", type=int, default=5)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--memory-mb", type=int, default=32)
+    parser.add_argument("--mode", choices=["unbounded", "bounded"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run(args.mode, args.sessions, args.researches, args.users, args.memory_mb)
+        return
+
+    print(f"{'mode':<11}{'sessions':>9}{'loaded':>8}{'session MB':>12}{'RSS MB':>10}{'evictions':>11}")
+    for mode in ("unbounded", "bounded"):
+        subprocess.run([sys.executable, os.path.abspath(__file__), "--mode", mode,
+                        "--sessions", str(args.sessions), "--researches", str(args.researches),
+                        "--users", str(args.users), "--memory-mb", str(args.memory_mb)], check=True)
+
+
+if __name__ == "__main__":
+    main()
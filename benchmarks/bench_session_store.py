@@ -0,0 +1,151 @@
+"""
+Benchmark: cost of SessionService mutations as a session grows
+
+Replays a research session (add_context + add_to_history per research, with
+research entries sampled from the sessions/ corpus) against:
+- rewrite: the previous behaviour, re-serializing the whole session with
+  indent=2 on every mutation
+- journal: SessionService's append-only journal with snapshot compaction
+
+and reports time per mutation early and late in the session, size on disk
+and reload time. Then measures SessionService startup and first access
+with --stored sessions on disk, against eagerly loading them all (the
+previous startup behaviour). Runs in temporary directories.
+
+Usage:
+    python benchmarks/bench_session_store.py --researches 100 --fsync snapshot --stored 2000
+"""
+
+import argparse
+import glob
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.session_manager import SessionService
+from utils.session_store import JournalSessionStore
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_corpus():
+    """Research history entries from the checked-in sessions"""
+    entries = []
+    for path in glob.glob(os.path.join(ROOT, "sessions", "*.json")):
+        with open(path) as f:
+            entries.extend(json.load(f).get("research_history", []))
+    if not entries:
+        entries = [{"topic": "placeholder", "report": "x" * 40000}]
+    return entries
+
+
+def directory_bytes(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def rewrite_save(path, session):
+    """The previous _save_session: whole session, indent=2, every mutation"""
+    with open(os.path.join(path, f"{session['id']}.json"), "w") as f:
+        json.dump(session, f, indent=2)
+
+
+def run(mode, corpus, researches, fsync, snapshot_every):
+    with tempfile.TemporaryDirectory() as tmp:
+        if mode == "journal":
+            service = SessionService(tmp, store=JournalSessionStore(tmp, snapshot_every, fsync))
+        else:
+            service = SessionService(tmp)
+            service.store = None
+        session_id = service.create_session("bench")
+        session = service.get_session(session_id)
+
+        samples = []
+        for i in range(researches):
+            entry = dict(corpus[i % len(corpus)], topic=f"topic {i}")
+            start = time.perf_counter()
+            service.add_context(session_id, f"Researched: topic {i}")
+            if mode == "rewrite":
+                rewrite_save(tmp, session)
+            service.add_to_history(session_id, entry)
+            if mode == "rewrite":
+                rewrite_save(tmp, session)
+            samples.append((time.perf_counter() - start) / 2 * 1000)
+
+        size = directory_bytes(tmp)
+
+        start = time.perf_counter()
+        if mode == "journal":
+            reloaded = SessionService(tmp, store=JournalSessionStore(tmp, snapshot_every, fsync))
+        else:
+            reloaded = SessionService(tmp)
+        history = reloaded.get_session_history(session_id)
+        reload_ms = (time.perf_counter() - start) * 1000
+        assert len(history) == researches
+
+        tenth = max(1, researches // 10)
+        return {
+            "first": statistics.mean(samples[:tenth]),
+            "last": statistics.mean(samples[-tenth:]),
+            "total": sum(samples) * 2,
+            "size": size,
+            "reload": reload_ms,
+        }
+
+
+def run_startup(corpus, stored):
+    """Startup and first-access times with `stored` sessions on disk"""
+    with tempfile.TemporaryDirectory() as tmp:
+        service = SessionService(tmp)
+        session_ids = [service.create_session(f"user{i % 50}") for i in range(stored)]
+        for i, session_id in enumerate(session_ids):
+            service.add_to_history(session_id, dict(corpus[i % len(corpus)], topic=f"topic {i}"))
+
+        start = time.perf_counter()
+        eager = JournalSessionStore(tmp).load_all()
+        eager_ms = (time.perf_counter() - start) * 1000
+        assert len(eager) == stored
+        del eager
+
+        start = time.perf_counter()
+        lazy = SessionService(tmp)
+        startup_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        assert lazy.get_session(session_ids[stored // 2]) is not None
+        first_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        listed = lazy.list_sessions("user7")
+        list_ms = (time.perf_counter() - start) * 1000
+
+    print(f"\nStartup with {stored} stored sessions:")
+    print(f"  eager load of every session: {eager_ms:10.1f} ms")
+    print(f"  lazy SessionService():       {startup_ms:10.3f} ms")
+    print(f"  first get_session():         {first_ms:10.3f} ms")
+    print(f"  list_sessions(user) ({len(listed):>3}):   {list_ms:10.3f} ms (first call reads the index)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--researches", type=int, default=100)
+    parser.add_argument("--fsync", default="snapshot", choices=("always", "snapshot", "never"))
+    parser.add_argument("--snapshot-every", type=int, default=64)
+    parser.add_argument("--stored", type=int, default=2000, help="stored sessions for the startup test")
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    print(f"{args.researches} researches, {len(corpus)} corpus entries, fsync={args.fsync}\n")
+    print(f"{'mode':<10}{'first 10% ms':>14}{'last 10% ms':>13}{'total ms':>11}{'on disk KB':>12}{'reload ms':>11}")
+    for mode in ("rewrite", "journal"):
+        result = run(mode, corpus, args.researches, args.fsync, args.snapshot_every)
+        print(f"{mode:<10}{result['first']:>14.2f}{result['last']:>13.2f}{result['total']:>11.0f}"
+              f"{result['size'] / 1024:>12.0f}{result['reload']:>11.1f}")
+
+    run_startup(corpus, args.stored)
+
+
+if __name__ == "__main__":
+    main()
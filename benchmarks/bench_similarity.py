@@ -0,0 +1,94 @@
+"""
+Benchmark: similar-topic recall with BruteForceIndex vs LSHIndex
+
+Indexes --topics synthetic research topics (word combinations), then
+queries near-duplicates of indexed topics (case, spacing, plural and
+word-order variants) and unrelated topics, reporting per index:
+- build time per topic and query latency (median, µs)
+- recall: share of near-duplicate queries whose best brute-force match
+  at >= --threshold is also found
+
+Uses NumPy when installed.
+
+Usage:
+    python benchmarks/bench_similarity.py --topics 20000 --queries 500 --threshold 0.9
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import embeddings
+from utils.embeddings import BruteForceIndex, LSHIndex, embed
+
+WORDS = ["solar", "wind", "battery", "hydrogen", "nuclear", "quantum", "climate", "biology", "history",
+         "markets", "storage", "grid", "policy", "materials", "learning", "vision", "ocean", "carbon",
+         "neural", "protein", "vaccine", "economics", "robotics", "language", "genome", "urban"]
+SUFFIXES = ["", " systems", " research", " trends", " basics", " in 2025", " for beginners", " impact"]
+
+
+def make_topics(rng, count):
+    topics = set()
+    while len(topics) < count:
+        topics.add(" ".join(rng.sample(WORDS, rng.choice((1, 2, 3)))) + rng.choice(SUFFIXES))
+    return sorted(topics)
+
+
+def variant(rng, topic):
+    """A near-duplicate spelling of topic"""
+    words = topic.split()
+    change = rng.randrange(4)
+    if change == 0:
+        return topic.upper()
+    if change == 1:
+        return "".join(words)
+    if change == 2:
+        return topic + "s"
+    words[0], words[-1] = words[-1], words[0]
+    return " ".join(words)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topics", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--threshold", type=float, default=0.9)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    topics = make_topics(rng, args.topics)
+    vectors = [embed(topic) for topic in topics]
+    queries = [embed(variant(rng, rng.choice(topics))) for _ in range(args.queries)]
+    unrelated = [embed(f"{rng.choice(WORDS)}{rng.randrange(10 ** 6)} zebra") for _ in range(args.queries // 5)]
+    print(f"{len(topics)} topics, {len(queries)} near-duplicate + {len(unrelated)} unrelated queries, "
+          f"threshold {args.threshold}, numpy {'installed' if embeddings.np is not None else 'not installed'}\n")
+
+    indexes = {"brute": BruteForceIndex(), "lsh": LSHIndex()}
+    results = {}
+    print(f"{'index':<8}{'build µs':>10}{'query µs':>10}{'recall':>9}")
+    for name, index in indexes.items():
+        start = time.perf_counter()
+        for i, vector in enumerate(vectors):
+            index.add(i, vector)
+        build_us = (time.perf_counter() - start) / len(vectors) * 1e6
+
+        samples, found = [], []
+        for query in queries + unrelated:
+            start = time.perf_counter()
+            found.append(index.search(query, 1, args.threshold))
+            samples.append((time.perf_counter() - start) * 1e6)
+        results[name] = found[:len(queries)]
+
+        expected = [hits for hits in results["brute"] if hits]
+        recall = sum(1 for hits, truth in zip(results[name], results["brute"])
+                     if truth and hits and hits[0][1] >= truth[0][1] - 1e-6) / max(1, len(expected))
+        print(f"{name:<8}{build_us:>10.1f}{statistics.median(samples):>10.1f}{recall:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
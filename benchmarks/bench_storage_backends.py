@@ -0,0 +1,130 @@
+"""
+Benchmark: JSON-directory vs SQLite storage for SessionService and MemoryBank
+
+Populates each backend with --sessions sessions (one small research entry
+and one context item each, spread over 1,000 users) and --memories
+memories, then reports:
+- populate time per session
+- startup time and random get_session() latency
+- list_sessions(user_id) latency
+- MemoryBank startup, search (a common and a rare topic)/recent/popular latency
+- size on disk
+
+Runs in a temporary directory.
+
+Usage:
+    python benchmarks/bench_storage_backends.py --sessions 100000 --memories 20000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.memory_store import JsonMemoryStore
+from utils.session_manager import MemoryBank, SessionService
+from utils.session_store import JournalSessionStore
+from utils.sqlite_store import SqliteDatabase, SqliteMemoryStore, SqliteSessionStore
+
+RESEARCH = {
+    "topic": "renewable energy storage",
+    "type": "research",
+    "timestamp": "2025-11-16T13:57:36",
+    "summary": "Grid-scale batteries, pumped hydro and hydrogen compared. " * 8,
+}
+
+TOPICS = ["solar", "wind", "battery", "hydrogen", "nuclear", "quantum", "climate", "biology", "history", "markets"]
+
+
+def directory_bytes(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total
+
+
+def timed(fn, repeat=1):
+    """Median milliseconds per call"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def make_stores(backend, root):
+    if backend == "json":
+        return (lambda: JournalSessionStore(os.path.join(root, "sessions")),
+                lambda: JsonMemoryStore(os.path.join(root, "memory_bank")))
+    database = SqliteDatabase(os.path.join(root, "omnicare.db"), batch_size=256)
+    return lambda: SqliteSessionStore(database), lambda: SqliteMemoryStore(database)
+
+
+def run(backend, sessions, memories):
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as root:
+        session_store, memory_store = make_stores(backend, root)
+        results = {}
+
+        service = SessionService(os.path.join(root, "sessions"), store=session_store())
+        start = time.perf_counter()
+        session_ids = []
+        for i in range(sessions):
+            session_id = service.create_session(f"user{i % 1000}")
+            service.add_to_history(session_id, RESEARCH)
+            service.add_context(session_id, f"Researched: topic {i}")
+            session_ids.append(session_id)
+        service.store.close()
+        results["populate µs/session"] = (time.perf_counter() - start) / sessions * 1e6
+
+        bank = MemoryBank(os.path.join(root, "memory_bank"), store=memory_store())
+        start = time.perf_counter()
+        for i in range(memories):
+            bank.store_memory(f"{TOPICS[i % len(TOPICS)]} study {i}", {"summary": "insight " * 20})
+        bank.store.close()
+        results["populate µs/memory"] = (time.perf_counter() - start) / max(1, memories) * 1e6
+
+        results["session startup ms"] = timed(
+            lambda: SessionService(os.path.join(root, "sessions"), store=session_store()))
+        service = SessionService(os.path.join(root, "sessions"), store=session_store(), max_loaded=16)
+        sample = rng.sample(session_ids, min(1000, sessions))
+        results["get_session ms"] = statistics.median(
+            timed(lambda sid=sid: service.get_session(sid)) for sid in sample)
+        service.list_sessions("user1")  # the JSON store reads its index once
+        results["list_sessions ms"] = timed(lambda: service.list_sessions(f"user{rng.randrange(1000)}"), 20)
+
+        results["memory startup ms"] = timed(
+            lambda: MemoryBank(os.path.join(root, "memory_bank"), store=memory_store()))
+        bank = MemoryBank(os.path.join(root, "memory_bank"), store=memory_store())
+        results["search ms"] = timed(lambda: bank.search_memories("quantum"), 20)
+        results["search rare ms"] = timed(lambda: bank.search_memories(f"study {memories // 2}"), 20)
+        results["recent ms"] = timed(lambda: bank.get_recent_memories(10), 20)
+        results["popular ms"] = timed(lambda: bank.get_popular_topics(5), 20)
+
+        results["disk MB"] = directory_bytes(root) / 1e6
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=100000)
+    parser.add_argument("--memories", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{args.sessions} sessions, {args.memories} memories\n")
+    json_results = run("json", args.sessions, args.memories)
+    sqlite_results = run("sqlite", args.sessions, args.memories)
+
+    print(f"{'':<22}{'json':>12}{'sqlite':>12}")
+    for name in json_results:
+        print(f"{name:<22}{json_results[name]:>12.3f}{sqlite_results[name]:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark: emergency-triage classification latency (SLO: < 100µs per query)
+
+Times assess_urgency() on short and long (multi-paragraph) health queries,
+including worst cases where the only red flag is at the very end, and exits
+with status 1 if the median latency of any case exceeds the SLO, if a
+query the original substring scan flagged as an emergency is no longer one,
+or if an innocent use of an emergency word ("stroking my cat") is flagged.
+
+Usage:
+    python benchmarks/bench_triage.py --iterations 5000 --slo-us 100
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.healthcare_navigator_agent import QUERY_MATCHER, assess_urgency
+
+FILLER = (
+    "I have been feeling a bit tired lately and my knee hurts when I walk up the stairs. "
+    "My stomach is upset after meals and I wonder whether I should change my diet, "
+    "drink more water, or take some time off work to rest properly. "
+)
+
+CASES = {
+    "short, no flags": ("My knee hurts when I walk", "routine"),
+    "short, emergency": ("I can't breathe and have chest pain", "emergency"),
+    "long (~2KB), no flags": (FILLER * 10, "routine"),
+    "long (~2KB), flag at end": (FILLER * 10 + "Now my father is not breathing!", "emergency"),
+    "long (~2KB), contraction": (FILLER * 10 + "My cough WONT go away.", "soon"),
+}
+
+# Red-flag phrasings, including inflected forms the substring scan caught
+EMERGENCY_QUERIES = (
+    "my son overdosed on pills",
+    "I think my grandfather stroked out",
+    "she is overdosing",
+    "severe burned hand from the stove",
+    "severe burning on my arm after the accident",
+    "he has severe burns on his legs",
+    "my baby is choking",
+    "I passed out twice today",
+    "Can't breathe after running",
+    "chest pains since this morning",
+    "seizure lasting five minutes",
+    "had a stroke last year and now my arm is numb",
+    "possible food poisoning",
+)
+
+# Innocent uses of emergency nouns: never an emergency, whatever the baseline said
+NON_EMERGENCY_QUERIES = (
+    "I like stroking my cat",
+    "he stroked the dog and now his hand itches",
+    "she stroked my hair until I fell asleep",
+)
+
+# The emergency keywords and scan assess_urgency replaced
+BASELINE_EMERGENCY_KEYWORDS = (
+    "chest pain", "difficulty breathing", "can't breathe", "severe bleeding",
+    "loss of consciousness", "passed out", "stroke", "heart attack",
+    "severe head injury", "suicidal", "overdose", "poisoning",
+    "severe allergic reaction", "anaphylaxis", "not breathing",
+    "choking", "seizure lasting", "severe burn", "major trauma",
+)
+
+
+def baseline_is_emergency(query: str) -> bool:
+    query_lower = query.lower()
+    return any(keyword in query_lower for keyword in BASELINE_EMERGENCY_KEYWORDS)
+
+
+def check_baseline_emergencies() -> bool:
+    """Every query the baseline flagged as an emergency must still be one, and no innocent one"""
+    queries = list(EMERGENCY_QUERIES) + [query for query, _ in CASES.values()]
+    flagged = [query for query in queries if baseline_is_emergency(query)]
+    missed = [query for query in flagged if assess_urgency(query) != "emergency"]
+    for query in missed:
+        print(f"regression: baseline emergency now {assess_urgency(query)}: {query[-60:]!r}")
+    print(f"Baseline emergencies still flagged: {len(flagged) - len(missed)}/{len(flagged)}")
+
+    false_alarms = [query for query in NON_EMERGENCY_QUERIES if assess_urgency(query) == "emergency"]
+    for query in false_alarms:
+        print(f"false emergency: {query!r}")
+    print(f"Non-emergencies not flagged: {len(NON_EMERGENCY_QUERIES) - len(false_alarms)}/{len(NON_EMERGENCY_QUERIES)}\n")
+    return not missed and not false_alarms
+
+
+def time_case(query: str, iterations: int):
+    """Per-call latencies in microseconds"""
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        assess_urgency(query)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--slo-us", type=float, default=100.0)
+    args = parser.parse_args()
+
+    print(f"Query matcher: {len(QUERY_MATCHER)} patterns, SLO {args.slo_us:.0f}µs (median)\n")
+    failed = not check_baseline_emergencies()
+    print(f"{'case':<28}{'chars':>7}{'median µs':>11}{'p99 µs':>9}  result")
+    for name, (query, expected) in CASES.items():
+        result = assess_urgency(query)
+        if result != expected:
+            print(f"{name}: expected {expected}, got {result}")
+            failed = True
+
+        time_case(query, 200)  # warm up
+        samples = sorted(time_case(query, args.iterations))
+        median = statistics.median(samples)
+        p99 = samples[int(len(samples) * 0.99)]
+        ok = median < args.slo_us
+        failed = failed or not ok
+        print(f"{name:<28}{len(query):>7}{median:>11.1f}{p99:>9.1f}  {result}{'' if ok else '  SLO MISSED'}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark: memory footprint of concurrent Education Tutor sessions
+
+Simulates N Streamlit sessions, each holding its own EducationTutorAgent
+and answering a few questions concurrently, and reports:
+- retained memory per tutor instance
+- peak memory per session with all sessions active at once
+- peak bytes allocated by a single tutor() request
+
+Usage:
+    python benchmarks/bench_tutor_memory.py --sessions 200 --requests 5
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.education_tutor_agent import EducationTutorAgent
+
+QUERIES = [
+    ("What is photosynthesis?", "high school", "visual"),
+    ("How do I solve quadratic equations?", "college", "auditory"),
+    ("Practice python loops", "elementary", "kinesthetic"),
+    ("Tell me about the french revolution", "middle school", "reading"),
+    ("Explain docker containers", "advanced", "visual"),
+]
+
+
+def measure_instances(sessions: int) -> float:
+    """Bytes retained per tutor instance"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tutors = [EducationTutorAgent() for _ in range(sessions)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    retained = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del tutors
+    return retained / sessions
+
+
+def measure_concurrent_sessions(sessions: int, requests: int) -> float:
+    """Peak bytes per session while all sessions answer questions concurrently"""
+    gc.collect()
+    tracemalloc.start()
+    tutors = [EducationTutorAgent() for _ in range(sessions)]
+
+    def run_session(tutor):
+        for i in range(requests):
+            query, difficulty, style = QUERIES[i % len(QUERIES)]
+            tutor.tutor(query, difficulty=difficulty, learning_style=style, trace_id="bench")
+
+    with ThreadPoolExecutor(max_workers=min(32, sessions)) as pool:
+        list(pool.map(run_session, tutors))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return peak / sessions
+
+
+def measure_request_allocation(rounds: int) -> float:
+    """Peak bytes allocated by a single tutor() call"""
+    tutor = EducationTutorAgent()
+    total = 0
+
+    tracemalloc.start()
+    for i in range(rounds):
+        query, difficulty, style = QUERIES[i % len(QUERIES)]
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        tutor.tutor(query, difficulty=difficulty, learning_style=style, trace_id="bench")
+        _, peak = tracemalloc.get_traced_memory()
+        total += peak - baseline
+    tracemalloc.stop()
+
+    return total / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=5)
+    args = parser.parse_args()
+
+    # Keep agent logging out of the measurement
+    import logging
+    logging.getLogger("ResearchAssistant").setLevel(logging.WARNING)
+
+    per_instance = measure_instances(args.sessions)
+    per_session = measure_concurrent_sessions(args.sessions, args.requests)
+    per_request = measure_request_allocation(args.sessions)
+
+    print(f"Sessions:              {args.sessions}")
+    print(f"Requests per session:  {args.requests}")
+    print(f"Retained per instance: {per_instance:,.0f} bytes")
+    print(f"Peak per session:      {per_session:,.0f} bytes (all sessions concurrent)")
+    print(f"Peak per request:      {per_request:,.0f} bytes")
+
+
+if __name__ == "__main__":
+    main()
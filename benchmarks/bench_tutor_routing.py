@@ -0,0 +1,72 @@
+"""
+Benchmark: Education Tutor query routing (subject and query type detection)
+
+Checks _detect_subject() and _analyze_query_type() against expected labels,
+including inflected verbs the original substring checks caught ("solved
+equations", "calculated risk"), times both per query, and exits with
+status 1 on any misrouted query.
+
+Usage:
+    python benchmarks/bench_tutor_routing.py --iterations 5000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.education_tutor_agent import EducationTutorAgent
+
+# (query, expected subject, expected query type)
+CASES = [
+    ("How do I solve quadratic equations?", "math", "problem_solving"),
+    ("solved equations", "math", "problem_solving"),
+    ("calculated risk", "math", "problem_solving"),
+    ("calculating the area of a circle", "math", "problem_solving"),
+    ("I computed the mean but it looks wrong", "general", "problem_solving"),
+    ("solving for x", "math", "problem_solving"),
+    ("factoring polynomials", "math", "general_help"),
+    ("What is photosynthesis?", "general", "concept_explanation"),
+    ("explained in simple words, what is a cell", "science", "concept_explanation"),
+    ("Practice python loops", "computer science", "practice_request"),
+    ("practicing essay writing", "language", "practice_request"),
+    ("learn cloud computing", "devops", "general_help"),
+    ("Tell me about the french revolution", "history", "general_help"),
+]
+
+
+def time_call(fn, query: str, iterations: int) -> float:
+    """Median latency in microseconds"""
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn(query)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    tutor = EducationTutorAgent()
+    failed = False
+    print(f"{'query':<44}{'subject':>18}{'type':>21}{'µs':>7}")
+    for query, subject, query_type in CASES:
+        found = (tutor._detect_subject(query), tutor._analyze_query_type(query))
+        ok = found == (subject, query_type)
+        failed = failed or not ok
+        latency = (time_call(tutor._detect_subject, query, args.iterations)
+                   + time_call(tutor._analyze_query_type, query, args.iterations))
+        print(f"{query[:43]:<44}{found[0]:>18}{found[1]:>21}{latency:>7.1f}"
+              f"{'' if ok else f'  expected {subject}/{query_type}'}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
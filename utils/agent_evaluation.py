@@ -3,10 +3,10 @@ Agent Evaluation Framework
 Evaluates agent performance, quality, and effectiveness
 """
 
-import json
 from datetime import datetime
 from typing import Dict, List, Optional
 from utils.observability import AgentLogger, metrics
+from utils.serializer import serializer_for_path
 
 logger = AgentLogger("AgentEvaluation")
 
@@ -492,12 +492,11 @@ class AgentEvaluator:
         }
     
     def export_evaluations(self, filepath: str):
-        """Export evaluation history to JSON"""
-        with open(filepath, 'w') as f:
-            json.dump({
-                "evaluations": self.evaluation_history,
-                "summary": self.get_evaluation_summary()
-            }, f, indent=2)
+        """Export evaluation history to JSON (compressed for .gz/.zz paths)"""
+        serializer_for_path(filepath).dump({
+            "evaluations": self.evaluation_history,
+            "summary": self.get_evaluation_summary()
+        }, filepath)
         
         logger.info(f"Exported {len(self.evaluation_history)} evaluations to {filepath}")
 
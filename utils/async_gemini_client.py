@@ -0,0 +1,242 @@
+"""
+Async Google Gemini API Client
+Bounded-concurrency asyncio client with deadlines, retries and hedged requests.
+"""
+
+import asyncio
+import random
+import time
+from typing import Any, List, Optional, Tuple
+
+from utils.gemini_client import GeminiClient, client_pool
+from utils.observability import metrics
+from utils.response_cache import MISSING
+
+# HTTP status codes worth retrying (rate limits and transient server errors)
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+# google.api_core exception class names for the same conditions
+RETRYABLE_ERROR_NAMES = {
+    'ResourceExhausted', 'TooManyRequests', 'ServiceUnavailable',
+    'InternalServerError', 'DeadlineExceeded', 'GatewayTimeout', 'Aborted'
+}
+
+
+class GeminiRequestError(Exception):
+    """A Gemini request failed after all retries"""
+
+
+class GeminiTimeoutError(GeminiRequestError):
+    """A Gemini request missed its deadline"""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether an error is transient and the request may be retried"""
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    if type(error).__name__ in RETRYABLE_ERROR_NAMES:
+        return True
+    code = getattr(error, 'code', None)
+    return isinstance(code, int) and code in RETRYABLE_STATUS_CODES
+
+
+class AsyncGeminiClient:
+    """
+    Asyncio front end for Gemini text generation.
+
+    - At most max_concurrency requests are in flight at once (semaphore)
+    - Retryable errors are retried with exponential backoff and full jitter
+    - Every call has a deadline covering all attempts
+    - Optionally, a duplicate "hedged" request is sent if the first has not
+      answered after hedge_after seconds; the first success wins
+    - Every request (attempts and hedges included) takes a token from the
+      client's MicroBatcher rate limit, shared with synchronous calls
+
+    Shares model setup and the response cache with a GeminiClient, so a fake
+    model (see GeminiClient's model argument) makes it testable offline.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        client: Optional[GeminiClient] = None,
+        max_concurrency: int = 8,
+        max_retries: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        timeout: float = 30.0,
+        hedge_after: Optional[float] = None
+    ):
+        """
+        Args:
+            api_key: Gemini API key for the shared pooled client (ignored when client is given)
+            client: Configured GeminiClient to share model and cache with
+            max_concurrency: Maximum in-flight requests
+            max_retries: Retries after the first attempt for retryable errors
+            base_delay: First backoff delay in seconds (doubles each retry)
+            max_delay: Upper bound on a single backoff delay
+            timeout: Default per-call deadline in seconds
+            hedge_after: Send a hedged duplicate after this many seconds
+                (None disables hedging)
+        """
+        self.client = client or client_pool.get(api_key)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.hedge_after = hedge_after
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def generate_text(
+        self,
+        prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        deadline: Optional[float] = None,
+        hedge_after: Optional[float] = None,
+        use_cache: bool = True,
+        agent: str = "gemini"
+    ) -> str:
+        """
+        Generate text using Gemini Pro model.
+
+        Args:
+            prompt: Input prompt for generation
+            temperature: Controls randomness (0.0-1.0)
+            max_tokens: Maximum tokens to generate
+            deadline: Seconds allowed for all attempts (defaults to timeout)
+            hedge_after: Per-call override of the hedging delay
+            use_cache: Set False to bypass the response cache
+            agent: Name the token usage is recorded under
+
+        Returns:
+            Generated text string
+
+        Raises:
+            GeminiTimeoutError: The deadline passed before a response arrived
+            GeminiRequestError: A non-retryable error, or retries exhausted
+        """
+        prompt, prompt_tokens = self.client._fit_prompt(prompt)
+        cache_key = self.client._cache_key(prompt, temperature, max_tokens) if use_cache else None
+        cached = self.client._cache_lookup(cache_key)
+        if cached is not MISSING:
+            return cached
+
+        deadline = self.timeout if deadline is None else deadline
+        hedge_after = self.hedge_after if hedge_after is None else hedge_after
+        config = self.client._generation_config(temperature, max_tokens)
+        start_time = time.time()
+
+        try:
+            text, usage = await asyncio.wait_for(
+                self._generate_with_retries(prompt, config, hedge_after),
+                timeout=deadline
+            )
+        except asyncio.TimeoutError:
+            metrics.record_metric("gemini_async_timeout", deadline, {"model": self.client.model_name})
+            raise GeminiTimeoutError(f"Gemini request exceeded {deadline}s deadline")
+
+        metrics.record_metric("gemini_async_latency", time.time() - start_time,
+                              {"model": self.client.model_name})
+        self.client._record_usage(agent, None, usage, prompt_tokens, text)
+        if text is None:
+            # Not cached, like GeminiClient.generate_text
+            return "No response generated."
+        self.client._cache_store(cache_key, text)
+        return text
+
+    async def generate_many(self, prompts: List[str], **kwargs) -> List[Any]:
+        """
+        Generate text for many prompts concurrently (bounded by max_concurrency).
+
+        Returns:
+            One entry per prompt: the generated text, or the exception raised
+        """
+        return await asyncio.gather(
+            *(self.generate_text(prompt, **kwargs) for prompt in prompts),
+            return_exceptions=True
+        )
+
+    async def generate_educational_content(
+        self,
+        topic: str,
+        difficulty: str = "intermediate",
+        content_type: str = "explanation",
+        **kwargs
+    ) -> str:
+        """Async variant of GeminiClient.generate_educational_content"""
+        prompt = self.client._educational_prompt(topic, difficulty, content_type)
+        return await self.generate_text(prompt, temperature=0.7, max_tokens=2048, **kwargs)
+
+    async def generate_health_information(self, symptoms: str, context: str = "", **kwargs) -> str:
+        """Async variant of GeminiClient.generate_health_information"""
+        prompt = self.client._health_prompt(symptoms, context)
+        return await self.generate_text(prompt, temperature=0.5, max_tokens=1500, **kwargs)
+
+    async def _generate_with_retries(self, prompt: str, config: Any,
+                                     hedge_after: Optional[float]) -> Tuple[Optional[str], Any]:
+        """Attempt the request, backing off between retryable failures"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await self._hedged_call(prompt, config, hedge_after)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if not is_retryable(e) or attempt == self.max_retries:
+                    raise GeminiRequestError(f"Gemini request failed: {e}") from e
+
+                # Exponential backoff with full jitter
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+                metrics.record_metric("gemini_async_retry", delay, {
+                    "attempt": attempt + 1,
+                    "error": type(e).__name__
+                })
+                await asyncio.sleep(delay)
+
+    async def _hedged_call(self, prompt: str, config: Any,
+                           hedge_after: Optional[float]) -> Tuple[Optional[str], Any]:
+        """Single attempt, plus a duplicate request if the first is slow"""
+        if not hedge_after:
+            return await self._call(prompt, config)
+
+        tasks = {asyncio.ensure_future(self._call(prompt, config))}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+            if not done:
+                metrics.record_metric("gemini_async_hedge", hedge_after, {"model": self.client.model_name})
+                tasks.add(asyncio.ensure_future(self._call(prompt, config)))
+
+            error = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _call(self, prompt: str, config: Any) -> Tuple[Optional[str], Any]:
+        """
+        One request to the model, holding a concurrency slot; returns
+        (text, usage_metadata), text None if the response has no parts
+        """
+        model = self.client.model
+        bucket = self.client.batcher.bucket if self.client.batcher is not None else None
+        if bucket is not None:
+            waited = await bucket.acquire_async()
+            if waited:
+                metrics.record_metric("llm_batch_rate_limit_wait", waited, {"path": "async"})
+        async with self._semaphore:
+            if hasattr(model, 'generate_content_async'):
+                response = await model.generate_content_async(prompt, generation_config=config)
+            else:
+                response = await asyncio.to_thread(model.generate_content, prompt, generation_config=config)
+
+        usage = getattr(response, 'usage_metadata', None)
+        if response.parts:
+            return response.text, usage
+        return None, usage
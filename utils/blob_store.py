@@ -0,0 +1,234 @@
+"""
+Blob Storage
+Content-addressed, compressed storage for the large payloads of research
+history entries (search results, report, accessible and audio versions)
+"""
+
+import hashlib
+import json
+import lzma
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+# Key referencing a blob in a packed history entry
+BLOB_KEY = '$blob'
+
+# History entry fields kept inline, so packed entries can still be listed
+INLINE_FIELDS = ('topic', 'type', 'timestamp', 'trace_id')
+
+# Recently packed/unpacked entries remembered per BlobStore, so snapshots
+# don't re-encode history that is already stored
+PACKED_MEMO_SIZE = 4096
+
+# Codec name -> header byte stored in front of each blob
+CODECS = {'none': b'j', 'zlib': b'z', 'lzma': b'x'}
+
+
+def _encode(value) -> bytes:
+    """Canonical JSON, so equal payloads hash equally"""
+    return json.dumps(value, separators=(',', ':'), sort_keys=True).encode('utf-8')
+
+
+def compress(data: bytes, codec: str) -> bytes:
+    """data with its codec header"""
+    if codec == 'zlib':
+        data = zlib.compress(data, 6)
+    elif codec == 'lzma':
+        data = lzma.compress(data)
+    elif codec != 'none':
+        raise ValueError(f"Unknown blob compression: {codec}")
+    return CODECS[codec] + data
+
+
+def decompress(blob: bytes) -> bytes:
+    """Inverse of compress(), whichever codec wrote the blob"""
+    header, data = blob[:1], blob[1:]
+    if header == CODECS['zlib']:
+        return zlib.decompress(data)
+    if header == CODECS['lzma']:
+        return lzma.decompress(data)
+    if header == CODECS['none']:
+        return data
+    raise ValueError("Unknown blob header")
+
+
+class BlobStore:
+    """
+    Storage interface for content-addressed blobs.
+
+    A blob's key is the sha256 of its canonical JSON, so storing the same
+    payload twice (from any session) keeps one copy. Blobs are immutable;
+    readers accept any codec, so the compression setting can change at
+    any time.
+
+    pack()/unpack() convert research history entries: fields other than
+    INLINE_FIELDS are moved into one blob when they serialize to at least
+    min_size bytes. They are compressed together because the accessible
+    and audio versions repeat the report and search results. History
+    entries are treated as immutable once added: an entry packed or
+    unpacked before packs to the remembered reference.
+    """
+
+    def __init__(self, compression: Optional[str] = None, min_size: Optional[int] = None):
+        if compression is None:
+            compression = os.getenv('SESSION_BLOB_COMPRESSION', 'zlib').lower()
+        if min_size is None:
+            min_size = int(os.getenv('SESSION_BLOB_MIN_BYTES', '1024'))
+        if compression not in CODECS:
+            raise ValueError(f"compression must be one of {tuple(CODECS)}")
+
+        self.compression = compression
+        self.min_size = min_size
+        # id(entry) -> (entry, packed entry)
+        self._packed = OrderedDict()
+        self._packed_lock = threading.Lock()
+
+    def has(self, key: str) -> bool:
+        """Whether a blob is stored"""
+        raise NotImplementedError
+
+    def _read(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def _write(self, key: str, blob: bytes) -> bool:
+        """Store a blob; False if it could not be written"""
+        raise NotImplementedError
+
+    def put(self, value) -> Optional[str]:
+        """Store a JSON value; returns its key, or None if it could not be written"""
+        return self._put(_encode(value))
+
+    def get(self, key: str):
+        """A stored JSON value, or None if missing or unreadable"""
+        try:
+            blob = self._read(key)
+            return json.loads(decompress(blob)) if blob is not None else None
+        except (OSError, ValueError, lzma.LZMAError, zlib.error) as e:
+            print(f"Warning: Could not read blob {key}: {e}")
+            return None
+
+    def pack(self, entry):
+        """A history entry with its large fields replaced by a blob reference"""
+        if not isinstance(entry, dict) or BLOB_KEY in entry:
+            return entry
+        remembered = self._packed.get(id(entry))
+        if remembered is not None and remembered[0] is entry:
+            return remembered[1]
+
+        payload = {key: value for key, value in entry.items() if key not in INLINE_FIELDS}
+        data = _encode(payload)
+        if not payload or len(data) < self.min_size:
+            return entry
+
+        key = self._put(data)
+        if key is None:
+            # Never reference a blob that was not written
+            return entry
+        packed = {field: entry[field] for field in INLINE_FIELDS if field in entry}
+        packed[BLOB_KEY] = key
+        self._remember(entry, packed)
+        return packed
+
+    def unpack(self, entry):
+        """Inverse of pack(); entries without a reference are returned as-is"""
+        if not isinstance(entry, dict) or BLOB_KEY not in entry:
+            return entry
+        payload = self.get(entry[BLOB_KEY])
+        if payload is None:
+            # Keep the inline fields and the reference so nothing is lost on re-save
+            return entry
+        unpacked = {key: value for key, value in entry.items() if key != BLOB_KEY}
+        unpacked.update(payload)
+        self._remember(unpacked, entry)
+        return unpacked
+
+    def forget(self, entries: Iterable):
+        """Drop remembered packings of entries (e.g. of a session evicted from memory)"""
+        with self._packed_lock:
+            for entry in entries:
+                remembered = self._packed.get(id(entry))
+                if remembered is not None and remembered[0] is entry:
+                    del self._packed[id(entry)]
+
+    def _remember(self, entry: Dict, packed: Dict):
+        with self._packed_lock:
+            self._packed[id(entry)] = (entry, packed)
+            self._packed.move_to_end(id(entry))
+            while len(self._packed) > PACKED_MEMO_SIZE:
+                self._packed.popitem(last=False)
+
+    def _put(self, data: bytes) -> Optional[str]:
+        key = hashlib.sha256(data).hexdigest()
+        if self.has(key) or self._write(key, compress(data, self.compression)):
+            return key
+        return None
+
+
+class FileBlobStore(BlobStore):
+    """
+    One file per blob under path/<first two hex digits>/<key>, written to a
+    temp file and renamed into place so a blob is either complete or absent.
+    With fsync, blobs are synced before they are referenced.
+    """
+
+    def __init__(self, path: str = os.path.join("sessions", "blobs"),
+                 compression: Optional[str] = None, min_size: Optional[int] = None,
+                 fsync: bool = False):
+        super().__init__(compression, min_size)
+        self.path = path
+        self.fsync = fsync
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.path, key[:2], key)
+
+    def has(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def _read(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _write(self, key: str, blob: bytes) -> bool:
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(blob)
+                if self.fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+            return True
+        except OSError as e:
+            print(f"Warning: Could not save blob {key}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return False
+
+
+def blobs_enabled() -> bool:
+    """Whether history payloads go to a blob store (SESSION_BLOB_MIN_BYTES > 0)"""
+    return int(os.getenv('SESSION_BLOB_MIN_BYTES', '1024')) > 0
+
+
+def pack_history(blobs: Optional[BlobStore], session: Dict) -> Dict:
+    """A shallow copy of session with its history entries packed"""
+    if blobs is None:
+        return session
+    return dict(session, research_history=[blobs.pack(item) for item in session.get('research_history', [])])
+
+
+def unpack_history(blobs: Optional[BlobStore], session: Dict) -> Dict:
+    """Resolve the blob references in a loaded session's history, in place"""
+    if blobs is not None and session.get('research_history'):
+        session['research_history'] = [blobs.unpack(item) for item in session['research_history']]
+    return session
@@ -0,0 +1,160 @@
+"""
+Context Compactor
+Incremental, token-budgeted session context: recent items verbatim plus a
+rolling extractive summary of older ones, ranked by relevance to a query
+"""
+
+import heapq
+import math
+import os
+import re
+import threading
+from collections import Counter, deque
+from typing import Callable, List, Optional, Tuple
+
+from utils.token_budget import compact_prompt, estimate_tokens
+
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n+")
+_WORDS = re.compile(r"[^\W\d_]{3,}|\d+")
+
+STOPWORDS = frozenset("""
+    the and for are but not you all any can had her was one our out has his how its may new now
+    see who did get use with from this that have were they been will your what when which their
+    there than then them into more some such only also about after before over under other these
+    those very just most each while where would could should being does doing
+""".split())
+
+# Weight of position (recent items) and salience (summary sentences) next to query relevance
+RECENCY_WEIGHT = 0.5
+SALIENCE_WEIGHT = 0.25
+
+# Smallest budget remainder worth filling with a shortened item
+MIN_PARTIAL_TOKENS = 16
+
+
+def terms(text: str) -> List[str]:
+    """Lowercase content words (3+ letters, no stopwords) and numbers"""
+    return [word for word in _WORDS.findall(text.lower()) if word not in STOPWORDS]
+
+
+class ContextCompactor:
+    """
+    Context of one session, compacted to a token budget on demand.
+
+    The last recent_items items (CONTEXT_RECENT_ITEMS) are kept verbatim.
+    Older items are split into sentences that enter a summary pool of at
+    most max_sentences (CONTEXT_SUMMARY_SENTENCES): each sentence gets a
+    salience, the mean log frequency of its terms across all items seen so
+    far, so sentences about recurring subjects outlive one-offs, and the
+    least salient sentence is dropped when the pool is full. Duplicate
+    sentences are kept once.
+
+    add() costs O(item) (plus O(log max_sentences) per summarized
+    sentence) and never revisits earlier items; build() only looks at the
+    bounded recent window and summary pool.
+    """
+
+    def __init__(self, recent_items: Optional[int] = None, max_sentences: Optional[int] = None,
+                 count: Callable[[str], int] = estimate_tokens):
+        if recent_items is None:
+            recent_items = int(os.getenv('CONTEXT_RECENT_ITEMS', '10'))
+        if max_sentences is None:
+            max_sentences = int(os.getenv('CONTEXT_SUMMARY_SENTENCES', '48'))
+        self.recent_items = max(1, recent_items)
+        self.max_sentences = max_sentences
+        self.count = count
+
+        self._recent = deque()
+        # Summary pool: min-heap of (salience, item sequence, sentence index, sentence, terms)
+        self._summary = []
+        self._summarized = set()
+        # Items seen, and the number of items each term appeared in
+        self._items = 0
+        self._frequency = Counter()
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    def add(self, content: str):
+        """Add the newest context item"""
+        item_terms = terms(content)
+        with self._lock:
+            self._items += 1
+            self._frequency.update(set(item_terms))
+            self._sequence += 1
+            self._recent.append((self._sequence, content, item_terms))
+            if len(self._recent) > self.recent_items:
+                sequence, oldest, _ = self._recent.popleft()
+                self._summarize(sequence, oldest)
+
+    def extend(self, contents: List[str]):
+        for content in contents:
+            self.add(content)
+
+    def build(self, query: str = "", max_tokens: int = 500) -> str:
+        """
+        The context within max_tokens: recent items and summary sentences by
+        descending relevance to query (then recency/salience), shown in the
+        order they were added, one per line
+        """
+        query_terms = set(terms(query))
+        with self._lock:
+            query_weights = {term: self._idf(term) for term in query_terms}
+            candidates = []
+            for position, (sequence, content, item_terms) in enumerate(self._recent):
+                recency = (position + 1) / len(self._recent)
+                score = self._relevance(query_weights, item_terms) + RECENCY_WEIGHT * recency
+                candidates.append((score, (sequence, 0), content))
+            top_salience = max((entry[0] for entry in self._summary), default=0.0) or 1.0
+            for salience, sequence, index, sentence, sentence_terms in self._summary:
+                score = self._relevance(query_weights, sentence_terms) + SALIENCE_WEIGHT * salience / top_salience
+                candidates.append((score, (sequence, index), sentence))
+
+        chosen: List[Tuple[Tuple[int, int], str]] = []
+        remaining = max_tokens
+        for score, position, text in sorted(candidates, key=lambda c: (c[0], c[1]), reverse=True):
+            # One token for the line break
+            cost = self.count(text) + 1
+            if cost <= remaining:
+                chosen.append((position, text))
+                remaining -= cost
+            elif remaining >= MIN_PARTIAL_TOKENS:
+                shortened = compact_prompt(text, remaining - 1, self.count)
+                if shortened:
+                    chosen.append((position, shortened))
+                    remaining -= self.count(shortened) + 1
+        chosen.sort()
+        return "\n".join(text for _, text in chosen)
+
+    def __len__(self) -> int:
+        return len(self._recent) + len(self._summary)
+
+    def _summarize(self, sequence: int, content: str):
+        """Move an item's sentences into the summary pool (lock held)"""
+        if self.max_sentences <= 0:
+            return
+        for index, sentence in enumerate(_SENTENCE_BOUNDARY.split(content)):
+            sentence = sentence.strip()
+            key = ' '.join(sentence.lower().split())
+            if not key or key in self._summarized:
+                continue
+            sentence_terms = terms(sentence)
+            distinct = set(sentence_terms)
+            salience = (sum(math.log1p(self._frequency[term]) for term in distinct) / len(distinct)
+                        if distinct else 0.0)
+            self._summarized.add(key)
+            heapq.heappush(self._summary, (salience, sequence, index, sentence, sentence_terms))
+            if len(self._summary) > self.max_sentences:
+                dropped = heapq.heappop(self._summary)
+                self._summarized.discard(' '.join(dropped[3].lower().split()))
+
+    def _idf(self, term: str) -> float:
+        return math.log((1 + self._items) / (1 + self._frequency[term])) + 1.0
+
+    @staticmethod
+    def _relevance(query_weights: dict, item_terms: List[str]) -> float:
+        """Share of the query's idf weight whose terms occur in the item (0..1)"""
+        if not query_weights:
+            return 0.0
+        present = set(item_terms)
+        total = sum(query_weights.values())
+        return sum(weight for term, weight in query_weights.items() if term in present) / total
@@ -0,0 +1,271 @@
+"""
+Text Embeddings
+Local, network-free embeddings of short texts (research topics) as hashed
+character n-gram vectors, and nearest-neighbour indexes over them
+"""
+
+import math
+import os
+import random
+import re
+import threading
+import zlib
+from collections import Counter
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # optional: vectorized indexes
+    np = None
+
+# Vector dimensions n-grams are hashed into
+DIMENSIONS = 512
+
+# Character n-gram sizes
+NGRAM_SIZES = (2, 3)
+
+# Sparse vector: dimension -> weight, L2-normalized
+Vector = Dict[int, float]
+
+
+# Whitespace and separator punctuation, dropped by normalize(); other symbols
+# carry meaning ("c++" vs "c#") and are kept
+_SEPARATORS = re.compile(r"[\s\-_.,:;!?'\"()\[\]/]+")
+
+_NUMBERS = re.compile(r"\d+(?:\.\d+)*")
+
+
+def normalize(text: str) -> str:
+    """Lowercase without separators, so "Chat GPT" and "chatgpt" embed alike"""
+    return _SEPARATORS.sub('', text.lower())
+
+
+def numbers(text: str) -> Tuple[str, ...]:
+    """
+    The number tokens of text, sorted. Similar topics must have the same
+    ones: n-grams barely tell "python 2" from "python 3".
+    """
+    return tuple(sorted(_NUMBERS.findall(text)))
+
+
+def embed(text: str) -> Vector:
+    """
+    Character n-gram counts of the normalized text, feature-hashed into
+    DIMENSIONS and L2-normalized.
+
+    Each n-gram adds +-count by a hash bit (signed feature hashing): colliding
+    n-grams cancel instead of inflating similarity, and vectors are not
+    confined to the positive orthant, which random-hyperplane LSH needs.
+    """
+    compact = normalize(text)
+    grams = Counter(
+        compact[i:i + n] for n in NGRAM_SIZES for i in range(len(compact) - n + 1)
+    ) or Counter([compact])
+
+    vector = {}
+    for gram, count in grams.items():
+        # crc32 rather than hash(), which differs between processes
+        hashed = zlib.crc32(gram.encode('utf-8'))
+        dimension = hashed % DIMENSIONS
+        sign = 1.0 if hashed & 0x80000000 else -1.0
+        vector[dimension] = vector.get(dimension, 0.0) + sign * count
+    norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+    return {dimension: weight / norm for dimension, weight in vector.items()}
+
+
+def cosine(a: Vector, b: Vector) -> float:
+    """Cosine similarity of two embed() vectors"""
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(weight * b.get(dimension, 0.0) for dimension, weight in a.items())
+
+
+def _dense(vector: Vector):
+    row = np.zeros(DIMENSIONS, dtype=np.float32)
+    for dimension, weight in vector.items():
+        row[dimension] = weight
+    return row
+
+
+class VectorIndex:
+    """
+    Nearest-neighbour index from keys to embed() vectors.
+
+    search() returns (key, cosine similarity) pairs, most similar first.
+    """
+
+    def add(self, key: Hashable, vector: Vector):
+        """Insert or replace the vector of key"""
+        raise NotImplementedError
+
+    def remove(self, key: Hashable):
+        """Remove key, if present"""
+        raise NotImplementedError
+
+    def search(self, vector: Vector, limit: int = 5, min_score: float = 0.0) -> List[Tuple[Hashable, float]]:
+        """Up to limit keys with similarity >= min_score"""
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+
+class BruteForceIndex(VectorIndex):
+    """
+    Exact search: scores every vector. With NumPy the vectors are rows of
+    one float32 matrix and a search is a single matrix-vector product.
+    """
+
+    def __init__(self):
+        self._vectors = {}
+        self._lock = threading.Lock()
+        # NumPy only: row of each key, key of each row, and the matrix
+        self._rows = {}
+        self._keys = []
+        self._matrix = np.zeros((64, DIMENSIONS), dtype=np.float32) if np is not None else None
+
+    def add(self, key: Hashable, vector: Vector):
+        with self._lock:
+            self._vectors[key] = vector
+            if self._matrix is None:
+                return
+            row = self._rows.get(key)
+            if row is None:
+                row = self._rows[key] = len(self._keys)
+                self._keys.append(key)
+                if row == len(self._matrix):
+                    self._matrix = np.concatenate([self._matrix, np.zeros_like(self._matrix)])
+            self._matrix[row] = _dense(vector)
+
+    def remove(self, key: Hashable):
+        with self._lock:
+            if self._vectors.pop(key, None) is None or self._matrix is None:
+                return
+            # Move the last row into the freed one
+            row, last = self._rows.pop(key), len(self._keys) - 1
+            if row != last:
+                self._matrix[row] = self._matrix[last]
+                self._keys[row] = self._keys[last]
+                self._rows[self._keys[row]] = row
+            self._matrix[last] = 0
+            self._keys.pop()
+
+    def search(self, vector: Vector, limit: int = 5, min_score: float = 0.0) -> List[Tuple[Hashable, float]]:
+        with self._lock:
+            if limit <= 0 or not self._vectors:
+                return []
+            if self._matrix is None:
+                scored = [(key, cosine(vector, candidate)) for key, candidate in self._vectors.items()]
+            else:
+                scores = self._matrix[:len(self._keys)] @ _dense(vector)
+                if limit < len(scores):
+                    top = np.argpartition(-scores, limit - 1)[:limit]
+                else:
+                    top = np.arange(len(scores))
+                scored = [(self._keys[row], float(scores[row])) for row in top]
+
+        scored = [(key, score) for key, score in scored if score >= min_score]
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored[:limit]
+
+    def score(self, keys: Iterable[Hashable], vector: Vector) -> List[Tuple[Hashable, float]]:
+        """Similarity of vector to each of the (indexed) keys"""
+        with self._lock:
+            if self._matrix is None:
+                return [(key, cosine(vector, self._vectors[key])) for key in keys]
+            keys = list(keys)
+            scores = self._matrix[[self._rows[key] for key in keys]] @ _dense(vector)
+            return list(zip(keys, scores.tolist()))
+
+    def __len__(self) -> int:
+        return len(self._vectors)
+
+
+class LSHIndex(VectorIndex):
+    """
+    Approximate search with random-hyperplane locality-sensitive hashing:
+    each of `tables` hash tables buckets vectors by the signs of `bits`
+    random projections, and a search scores only the keys sharing a bucket
+    with the query in some table. Similar vectors share a bucket with high
+    probability; more tables raise recall, more bits shrink buckets.
+    Candidates are scored exactly, by a BruteForceIndex holding the vectors.
+    """
+
+    def __init__(self, tables: int = 20, bits: int = 12, seed: int = 0):
+        self.tables = tables
+        self.bits = bits
+        rng = random.Random(seed)
+        # One hyperplane per (table, bit), as DIMENSIONS Gaussian components
+        planes = [[rng.gauss(0.0, 1.0) for _ in range(DIMENSIONS)] for _ in range(tables * bits)]
+        self._planes = np.array(planes, dtype=np.float32) if np is not None else planes
+        self._buckets = [{} for _ in range(tables)]
+        self._signatures = {}
+        self._vectors = BruteForceIndex()
+        self._lock = threading.Lock()
+
+    def _signature(self, vector: Vector) -> Tuple[int, ...]:
+        """One bucket id per table"""
+        if np is not None:
+            signs = (self._planes @ _dense(vector)) > 0
+        else:
+            signs = [sum(plane[dimension] * weight for dimension, weight in vector.items()) > 0
+                     for plane in self._planes]
+        signature = []
+        for table in range(self.tables):
+            bucket = 0
+            for positive in signs[table * self.bits:(table + 1) * self.bits]:
+                bucket = (bucket << 1) | bool(positive)
+            signature.append(bucket)
+        return tuple(signature)
+
+    def add(self, key: Hashable, vector: Vector):
+        signature = self._signature(vector)
+        with self._lock:
+            self._remove(key)
+            self._vectors.add(key, vector)
+            self._signatures[key] = signature
+            for buckets, bucket in zip(self._buckets, signature):
+                buckets.setdefault(bucket, set()).add(key)
+
+    def remove(self, key: Hashable):
+        with self._lock:
+            self._remove(key)
+
+    def _remove(self, key: Hashable):
+        """Remove key (lock held)"""
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return
+        self._vectors.remove(key)
+        for buckets, bucket in zip(self._buckets, signature):
+            members = buckets[bucket]
+            members.discard(key)
+            if not members:
+                del buckets[bucket]
+
+    def search(self, vector: Vector, limit: int = 5, min_score: float = 0.0) -> List[Tuple[Hashable, float]]:
+        if limit <= 0:
+            return []
+        signature = self._signature(vector)
+        with self._lock:
+            candidates = set()
+            for buckets, bucket in zip(self._buckets, signature):
+                candidates.update(buckets.get(bucket, ()))
+            scored = self._vectors.score(candidates, vector)
+
+        scored = [(key, score) for key, score in scored if score >= min_score]
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored[:limit]
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+
+def index_from_env(kind: Optional[str] = None) -> VectorIndex:
+    """The VectorIndex selected by kind or MEMORY_SIMILARITY_INDEX (brute or lsh)"""
+    kind = (kind or os.getenv('MEMORY_SIMILARITY_INDEX', 'brute')).lower()
+    if kind == 'lsh':
+        return LSHIndex()
+    if kind == 'brute':
+        return BruteForceIndex()
+    raise ValueError("MEMORY_SIMILARITY_INDEX must be brute or lsh")
@@ -0,0 +1,258 @@
+"""
+Fake Gemini Backend
+Offline stand-in for google.generativeai.GenerativeModel for integration and
+load testing: deterministic responses, configurable latency, streaming and
+error injection. Selected with GEMINI_BACKEND=fake (see GeminiClient).
+"""
+
+import asyncio
+import hashlib
+import math
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, Callable, Iterator, List, Optional, Sequence
+
+from utils.token_budget import estimate_tokens
+
+LATENCY_DISTRIBUTIONS = ('fixed', 'uniform', 'lognormal')
+
+
+def fake_backend_enabled() -> bool:
+    """Whether GEMINI_BACKEND selects the fake backend"""
+    return os.getenv('GEMINI_BACKEND', 'gemini').lower() == 'fake'
+
+
+class FakeAPIError(Exception):
+    """Base for injected errors; `code` is the HTTP status, as in google.api_core"""
+    code = 500
+
+
+class ResourceExhausted(FakeAPIError):
+    code = 429
+
+
+class InternalServerError(FakeAPIError):
+    code = 500
+
+
+class ServiceUnavailable(FakeAPIError):
+    code = 503
+
+
+class DeadlineExceeded(FakeAPIError):
+    code = 504
+
+
+ERRORS_BY_CODE = {
+    429: ResourceExhausted,
+    500: InternalServerError,
+    503: ServiceUnavailable,
+    504: DeadlineExceeded,
+}
+
+
+class FakeUsage:
+    """Mirrors the SDK's usage_metadata"""
+
+    def __init__(self, prompt_token_count: int, candidates_token_count: int):
+        self.prompt_token_count = prompt_token_count
+        self.candidates_token_count = candidates_token_count
+        self.total_token_count = prompt_token_count + candidates_token_count
+
+
+class FakeResponse:
+    """Mirrors GenerateContentResponse (.text, .parts, .usage_metadata)"""
+
+    def __init__(self, text: str, usage: Optional[FakeUsage] = None):
+        self.text = text
+        self.parts = [text] if text else []
+        self.usage_metadata = usage
+
+
+class FakeStreamResponse:
+    """Iterable of chunk responses; usage_metadata is set once fully consumed"""
+
+    def __init__(self, chunks: Iterator[FakeResponse], usage: FakeUsage):
+        self._chunks = chunks
+        self._usage = usage
+        self.usage_metadata = None
+
+    def __iter__(self):
+        yield from self._chunks
+        self.usage_metadata = self._usage
+
+
+class FakeCountTokensResponse:
+    def __init__(self, total_tokens: int):
+        self.total_tokens = total_tokens
+
+
+class FakeGenerativeModel:
+    """
+    Drop-in for genai.GenerativeModel that never touches the network.
+
+    Response text depends only on the prompt and max_output_tokens, so runs
+    are reproducible. Latency and injected errors are drawn from a seeded RNG:
+    - latency_dist: 'fixed', 'uniform' (latency_ms * (1 ± jitter)) or
+      'lognormal' (median latency_ms, spread jitter)
+    - tail_rate/tail_ms: a fraction of calls take tail_ms instead
+    - error_rate/error_codes: a fraction of calls fail with a retryable-looking
+      error (429/500/503/504) after their latency
+    Streaming yields chunk_words words per chunk, chunk_delay_ms apart, with
+    the first chunk arriving after the sampled latency.
+    """
+
+    def __init__(
+        self,
+        model_name: str = 'gemini-pro',
+        latency_ms: float = 50.0,
+        latency_dist: str = 'lognormal',
+        jitter: float = 0.5,
+        tail_rate: float = 0.0,
+        tail_ms: float = 1000.0,
+        error_rate: float = 0.0,
+        error_codes: Sequence[int] = (429, 503),
+        chunk_words: int = 8,
+        chunk_delay_ms: float = 10.0,
+        seed: Optional[int] = None,
+        responder: Optional[Callable[[str], str]] = None
+    ):
+        if latency_dist not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"latency_dist must be one of {LATENCY_DISTRIBUTIONS}")
+        self.model_name = model_name
+        self.latency_ms = latency_ms
+        self.latency_dist = latency_dist
+        self.jitter = jitter
+        self.tail_rate = tail_rate
+        self.tail_ms = tail_ms
+        self.error_rate = error_rate
+        self.error_codes = tuple(error_codes)
+        self.chunk_words = chunk_words
+        self.chunk_delay_ms = chunk_delay_ms
+        self.responder = responder or fake_response_text
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    @classmethod
+    def from_env(cls) -> "FakeGenerativeModel":
+        """Build from GEMINI_FAKE_* environment variables"""
+        seed = os.getenv('GEMINI_FAKE_SEED')
+        codes = os.getenv('GEMINI_FAKE_ERROR_CODES', '429,503')
+        return cls(
+            latency_ms=float(os.getenv('GEMINI_FAKE_LATENCY_MS', '50')),
+            latency_dist=os.getenv('GEMINI_FAKE_LATENCY_DIST', 'lognormal'),
+            jitter=float(os.getenv('GEMINI_FAKE_JITTER', '0.5')),
+            tail_rate=float(os.getenv('GEMINI_FAKE_TAIL_RATE', '0')),
+            tail_ms=float(os.getenv('GEMINI_FAKE_TAIL_MS', '1000')),
+            error_rate=float(os.getenv('GEMINI_FAKE_ERROR_RATE', '0')),
+            error_codes=[int(code) for code in codes.split(',') if code.strip()],
+            chunk_words=int(os.getenv('GEMINI_FAKE_CHUNK_WORDS', '8')),
+            chunk_delay_ms=float(os.getenv('GEMINI_FAKE_CHUNK_DELAY_MS', '10')),
+            seed=int(seed) if seed else None,
+        )
+
+    def generate_content(self, prompt: Any, generation_config: Any = None, stream: bool = False):
+        """Blocking generation, optionally streamed"""
+        latency, error = self._sample()
+        if not stream:
+            time.sleep(latency)
+            if error:
+                raise error
+            return self._response(prompt, generation_config)
+
+        def chunks():
+            time.sleep(latency)
+            if error:
+                raise error
+            for i, chunk in enumerate(self._chunks(prompt, generation_config)):
+                if i:
+                    time.sleep(self.chunk_delay_ms / 1000)
+                yield FakeResponse(chunk)
+
+        prompt_text = str(prompt)
+        text = self._text(prompt_text, generation_config)
+        return FakeStreamResponse(chunks(), FakeUsage(estimate_tokens(prompt_text), estimate_tokens(text)))
+
+    async def generate_content_async(self, prompt: Any, generation_config: Any = None):
+        """Non-blocking generation (as used by AsyncGeminiClient)"""
+        latency, error = self._sample()
+        await asyncio.sleep(latency)
+        if error:
+            raise error
+        return self._response(prompt, generation_config)
+
+    def count_tokens(self, prompt: Any) -> FakeCountTokensResponse:
+        """Token count (local estimate, no latency)"""
+        return FakeCountTokensResponse(estimate_tokens(str(prompt)))
+
+    def _sample(self):
+        """Latency in seconds and the error to raise (or None) for one call"""
+        with self._lock:
+            self.calls += 1
+            rng = self._rng
+            if self.tail_rate and rng.random() < self.tail_rate:
+                latency_ms = self.tail_ms
+            elif self.latency_dist == 'uniform':
+                latency_ms = self.latency_ms * rng.uniform(1 - self.jitter, 1 + self.jitter)
+            elif self.latency_dist == 'lognormal':
+                latency_ms = self.latency_ms * math.exp(rng.gauss(0, self.jitter))
+            else:
+                latency_ms = self.latency_ms
+
+            error = None
+            if self.error_rate and self.error_codes and rng.random() < self.error_rate:
+                code = rng.choice(self.error_codes)
+                error = ERRORS_BY_CODE.get(code, FakeAPIError)(f"{code} injected by fake Gemini backend")
+        return max(0.0, latency_ms) / 1000, error
+
+    def _text(self, prompt: str, generation_config: Any) -> str:
+        """Deterministic response text, clipped to max_output_tokens"""
+        text = self.responder(prompt)
+        max_tokens = _config_value(generation_config, 'max_output_tokens')
+        if max_tokens:
+            words = text.split(' ')
+            while len(words) > 1 and estimate_tokens(' '.join(words)) > max_tokens:
+                words = words[:max(1, int(len(words) * 0.9))]
+            text = ' '.join(words)
+        return text
+
+    def _response(self, prompt: Any, generation_config: Any) -> FakeResponse:
+        prompt_text = str(prompt)
+        text = self._text(prompt_text, generation_config)
+        return FakeResponse(text, FakeUsage(estimate_tokens(prompt_text), estimate_tokens(text)))
+
+    def _chunks(self, prompt: Any, generation_config: Any) -> List[str]:
+        words = self._text(str(prompt), generation_config).split(' ')
+        step = max(1, self.chunk_words)
+        return [' '.join(words[i:i + step]) + (' ' if i + step < len(words) else '')
+                for i in range(0, len(words), step)]
+
+
+def _config_value(generation_config: Any, name: str) -> Any:
+    """Read a setting from a GenerationConfig object or a plain dict"""
+    if generation_config is None:
+        return None
+    if isinstance(generation_config, dict):
+        return generation_config.get(name)
+    return getattr(generation_config, name, None)
+
+
+def fake_response_text(prompt: str) -> str:
+    """
+    Deterministic placeholder answer for a prompt.
+
+    The first non-empty prompt line is echoed, and the body is a bulleted
+    list so list-parsing callers (key points, common mistakes) get items.
+    """
+    lines = [line.strip() for line in prompt.strip().splitlines() if line.strip()]
+    subject = re.sub(r'\s+', ' ', lines[0]) if lines else 'the request'
+    digest = hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:8]
+    points = [
+        f"- Point {i + 1} about {subject.rstrip('.:')} (ref {digest}-{i + 1})."
+        for i in range(4)
+    ]
+    return f"Fake Gemini response to: {subject}\n\n" + "\n".join(points)
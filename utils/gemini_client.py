@@ -4,9 +4,24 @@ Provides text generation using Gemini Pro model.
 """
 
 import os
-import google.generativeai as genai
-from typing import Optional, Dict, Any
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Optional, Dict, Any, Iterator, Tuple
 from dotenv import load_dotenv
+from utils.observability import metrics
+from utils.fake_gemini import FakeGenerativeModel, fake_backend_enabled
+from utils.llm_batcher import MicroBatcher
+from utils.response_cache import ResponseCache, MISSING, make_cache_key
+from utils.token_budget import TokenBudget, TokenCounter, compact_prompt, estimate_tokens
+
+try:
+    import google.generativeai as genai
+    from google.ai import generativelanguage as glm
+except ImportError:
+    # Only needed for the real backend (GEMINI_BACKEND=fake works without it)
+    genai = None
+    glm = None
 
 # Load environment variables
 load_dotenv()
@@ -15,22 +30,64 @@ load_dotenv()
 class GeminiClient:
     """Client for Google Gemini API integration."""
     
-    def __init__(self, api_key: Optional[str] = None):
-        """Initialize Gemini client with API key from environment or parameter."""
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: Optional[Any] = None,
+        cache: Optional[ResponseCache] = None,
+        enable_cache: bool = True,
+        batcher: Optional[MicroBatcher] = None,
+        max_prompt_tokens: int = 30720,
+        exact_token_counts: bool = False,
+        request_timeout: Optional[float] = None
+    ):
+        """
+        Initialize Gemini client with API key from environment or parameter.
+        
+        Args:
+            api_key: Gemini API key (defaults to GEMINI_API_KEY)
+            model: Pre-built model object exposing generate_content(), e.g. a
+                FakeGenerativeModel for offline testing. Skips API configuration.
+                With GEMINI_BACKEND=fake, a FakeGenerativeModel configured
+                from GEMINI_FAKE_* variables is used and no API key is needed.
+            cache: Response cache to use (defaults to a memory + disk cache
+                for the real backend, memory only for fake or custom models)
+            enable_cache: Set False to disable response caching entirely
+            batcher: Micro-batching scheduler for generate_text requests
+                (see enable_batching)
+            max_prompt_tokens: Model input limit; larger prompts are compacted
+            exact_token_counts: Count prompt tokens with the SDK's
+                count_tokens() (an extra API call) instead of estimating
+            request_timeout: Seconds generate_text waits for a batched
+                request, including rate-limit waits (defaults to
+                GEMINI_REQUEST_TIMEOUT_SECONDS; 0 waits forever)
+        """
         # Use provided key or get from environment
         self.api_key = api_key or os.getenv('GEMINI_API_KEY')
+        self.model_name = 'gemini-pro'
         
-        if not self.api_key:
-            raise ValueError(
-                "GEMINI_API_KEY not found. "
-                "Please provide API key or set GEMINI_API_KEY environment variable."
-            )
-        
-        # Configure Gemini API
-        genai.configure(api_key=self.api_key)
-        
-        # Initialize model
-        self.model = genai.GenerativeModel('gemini-pro')
+        # Part of every cache key, so responses of one backend are never served by another
+        if model is not None:
+            self.model = model
+            self.backend = f"custom:{type(model).__name__}"
+        elif fake_backend_enabled():
+            self.model = FakeGenerativeModel.from_env()
+            self.backend = 'fake'
+        else:
+            self.backend = 'gemini'
+            if genai is None:
+                raise ValueError(
+                    "google-generativeai is not installed. "
+                    "Install it or set GEMINI_BACKEND=fake for offline use."
+                )
+            if not self.api_key:
+                raise ValueError(
+                    "GEMINI_API_KEY not found. "
+                    "Please provide API key or set GEMINI_API_KEY environment variable."
+                )
+            
+            # Initialize model, bound to this client's key
+            self.model = _model_for_key(self.model_name, self.api_key)
         
         # Default generation config
         self.default_config = {
@@ -39,13 +96,57 @@ class GeminiClient:
             'top_k': 40,
             'max_output_tokens': 2048,
         }
+        
+        # Identical prompts with identical generation settings are served from cache
+        if cache is not None:
+            self.cache = cache
+        elif enable_cache:
+            # Only real responses are worth keeping on disk (llm_cache/)
+            self.cache = ResponseCache() if self.backend == 'gemini' else ResponseCache(cache_dir=None)
+        else:
+            self.cache = None
+        
+        self.batcher = batcher
+        if request_timeout is None:
+            request_timeout = float(os.getenv('GEMINI_REQUEST_TIMEOUT_SECONDS', '60'))
+        self.request_timeout = request_timeout or None
+        
+        self.max_prompt_tokens = max_prompt_tokens
+        self.token_counter = TokenCounter(self.model, exact=exact_token_counts)
+    
+    def enable_batching(
+        self,
+        window: float = 0.02,
+        requests_per_minute: Optional[float] = 60,
+        max_workers: int = 8
+    ) -> MicroBatcher:
+        """
+        Route generate_text through a micro-batcher, so concurrent prompts are
+        coalesced and sent as a rate-limited burst (streaming is not batched).
+        
+        Args:
+            window: Seconds to collect concurrent prompts before sending
+            requests_per_minute: API quota to stay within (None for no limit)
+            max_workers: Requests in flight at once
+        """
+        if self.batcher is None:
+            self.batcher = MicroBatcher(
+                self._request,
+                window=window,
+                requests_per_minute=requests_per_minute,
+                max_workers=max_workers
+            )
+        return self.batcher
     
     def generate_text(
         self,
         prompt: str,
         temperature: float = 0.7,
         max_tokens: int = 2048,
-        stop_sequences: Optional[list] = None
+        stop_sequences: Optional[list] = None,
+        use_cache: bool = True,
+        agent: str = "gemini",
+        budget: Optional[TokenBudget] = None
     ) -> str:
         """
         Generate text using Gemini Pro model.
@@ -55,40 +156,228 @@ class GeminiClient:
             temperature: Controls randomness (0.0-1.0)
             max_tokens: Maximum tokens to generate
             stop_sequences: Optional sequences to stop generation
+            use_cache: Set False to bypass the response cache, e.g. when a
+                fresh, non-deterministic answer is wanted
+            agent: Name the token usage is recorded under
+            budget: Session token budget to compact against and charge
         
         Returns:
             Generated text string
         """
         try:
-            # Configure generation parameters
-            generation_config = genai.types.GenerationConfig(
-                temperature=temperature,
-                max_output_tokens=max_tokens,
-                top_p=self.default_config['top_p'],
-                top_k=self.default_config['top_k'],
-            )
+            prompt, prompt_tokens = self._fit_prompt(prompt, budget)
             
-            # Generate content
-            response = self.model.generate_content(
-                prompt,
-                generation_config=generation_config,
-            )
+            cache_key = self._cache_key(prompt, temperature, max_tokens) if use_cache else None
+            cached = self._cache_lookup(cache_key)
+            if cached is not MISSING:
+                return cached
+            
+            if budget is not None:
+                budget.check(prompt_tokens)
             
-            # Extract text from response
-            if response.parts:
-                return response.text
+            # A client dropped from the pool has its batcher closed; holders send directly
+            if self.batcher is not None and not self.batcher.closed:
+                future = self.batcher.submit(prompt, temperature, max_tokens)
+                try:
+                    text, usage = future.result(timeout=self.request_timeout)
+                except FutureTimeoutError:
+                    # Throttled or stalled dispatcher: drop the request if it is still queued
+                    future.cancel()
+                    metrics.record_metric("gemini_batch_timeout", self.request_timeout)
+                    raise TimeoutError(f"no response within {self.request_timeout:g}s")
             else:
+                text, usage = self._request(prompt, temperature, max_tokens)
+            
+            self._record_usage(agent, budget, usage, prompt_tokens, text)
+            if text is None:
                 return "No response generated."
+            self._cache_store(cache_key, text)
+            return text
                 
         except Exception as e:
             print(f"Gemini generation error: {e}")
             return f"Error generating content: {str(e)}"
     
+    def _request(self, prompt: str, temperature: float, max_tokens: int) -> Tuple[Optional[str], Any]:
+        """
+        Send one generation request
+        
+        Returns:
+            (text, usage_metadata); text is None if the response has no parts
+        """
+        response = self.model.generate_content(
+            prompt,
+            generation_config=self._generation_config(temperature, max_tokens),
+        )
+        usage = getattr(response, 'usage_metadata', None)
+        
+        # Extract text from response
+        if response.parts:
+            return response.text, usage
+        return None, usage
+    
+    def _fit_prompt(self, prompt: str, budget: Optional[TokenBudget] = None) -> Tuple[str, int]:
+        """
+        Compact the prompt to the model limit (and the budget's per-request
+        limit, if lower) and count its tokens
+        """
+        limit = self.max_prompt_tokens
+        if budget is not None and budget.max_prompt_tokens:
+            limit = min(limit, budget.max_prompt_tokens)
+        
+        prompt_tokens = self.token_counter.count(prompt)
+        if prompt_tokens > limit:
+            prompt = compact_prompt(prompt, limit, self.token_counter.count)
+            metrics.record_metric("gemini_prompt_compacted", prompt_tokens, {"limit": limit})
+            prompt_tokens = self.token_counter.count(prompt)
+        return prompt, prompt_tokens
+    
+    def _record_usage(self, agent: str, budget: Optional[TokenBudget], usage: Any,
+                      prompt_tokens: int, text: Optional[str]):
+        """Record tokens in/out, exact from usage metadata when the SDK provides it"""
+        tokens_in = getattr(usage, 'prompt_token_count', None) or prompt_tokens
+        tokens_out = getattr(usage, 'candidates_token_count', None)
+        if tokens_out is None:
+            tokens_out = estimate_tokens(text or "")
+        
+        metrics.record_token_usage(agent, tokens_in, tokens_out)
+        if budget is not None:
+            budget.charge(tokens_in + tokens_out)
+    
+    def generate_text_stream(
+        self,
+        prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        use_cache: bool = True,
+        agent: str = "gemini",
+        budget: Optional[TokenBudget] = None
+    ) -> Iterator[str]:
+        """
+        Generate text with Gemini Pro, yielding chunks as they arrive.
+        
+        Time-to-first-token and total stream time are recorded as metrics.
+        On failure an "Error generating content" chunk is yielded, matching
+        generate_text.
+        
+        Args:
+            prompt: Input prompt for generation
+            temperature: Controls randomness (0.0-1.0)
+            max_tokens: Maximum tokens to generate
+            use_cache: Set False to bypass the response cache
+            agent: Name the token usage is recorded under
+            budget: Session token budget to compact against and charge
+        
+        Yields:
+            Text chunks in generation order
+        """
+        prompt, prompt_tokens = self._fit_prompt(prompt, budget)
+        
+        cache_key = self._cache_key(prompt, temperature, max_tokens) if use_cache else None
+        cached = self._cache_lookup(cache_key)
+        if cached is not MISSING:
+            # A cached response arrives all at once
+            yield cached
+            return
+        
+        start_time = time.time()
+        first_token_time = None
+        chunks = []
+        
+        try:
+            if budget is not None:
+                budget.check(prompt_tokens)
+            
+            response = self.model.generate_content(
+                prompt,
+                generation_config=self._generation_config(temperature, max_tokens),
+                stream=True,
+            )
+            
+            for chunk in response:
+                if not chunk.parts:
+                    continue
+                text = chunk.text
+                if not text:
+                    continue
+                
+                if first_token_time is None:
+                    first_token_time = time.time() - start_time
+                    metrics.record_metric("gemini_time_to_first_token", first_token_time,
+                                          {"model": self.model_name})
+                chunks.append(text)
+                yield text
+            
+            text = "".join(chunks)
+            self._record_usage(agent, budget, getattr(response, 'usage_metadata', None),
+                               prompt_tokens, text)
+            if first_token_time is None:
+                yield "No response generated."
+            else:
+                self._cache_store(cache_key, text)
+        
+        except Exception as e:
+            print(f"Gemini streaming error: {e}")
+            yield f"Error generating content: {str(e)}"
+        
+        finally:
+            metrics.record_metric("gemini_stream_duration", time.time() - start_time,
+                                  {"model": self.model_name})
+    
+    def cache_stats(self) -> Dict:
+        """Response cache hit/miss statistics (empty if caching is disabled)"""
+        return self.cache.stats() if self.cache else {}
+    
+    def _cache_key(self, prompt: str, temperature: float, max_tokens: int) -> Optional[str]:
+        """Cache key over the backend, model, prompt and every generation setting"""
+        if not self.cache:
+            return None
+        return make_cache_key(
+            self.backend,
+            self.model_name,
+            prompt,
+            temperature,
+            max_tokens,
+            self.default_config['top_p'],
+            self.default_config['top_k'],
+        )
+    
+    def _cache_lookup(self, cache_key: Optional[str]) -> Any:
+        """Cached response text for the key, or MISSING"""
+        if cache_key is None:
+            return MISSING
+        cached = self.cache.get(cache_key)
+        metrics.record_cache_event("gemini_response", cached is not MISSING)
+        return cached
+    
+    def _cache_store(self, cache_key: Optional[str], text: str):
+        """Cache a successful response"""
+        if cache_key is not None and text:
+            self.cache.set(cache_key, text)
+    
+    def _generation_config(self, temperature: float, max_tokens: int) -> Any:
+        """Build the generation config for a request"""
+        if genai is None:
+            return {
+                'temperature': temperature,
+                'max_output_tokens': max_tokens,
+                'top_p': self.default_config['top_p'],
+                'top_k': self.default_config['top_k'],
+            }
+        return genai.types.GenerationConfig(
+            temperature=temperature,
+            max_output_tokens=max_tokens,
+            top_p=self.default_config['top_p'],
+            top_k=self.default_config['top_k'],
+        )
+    
     def generate_educational_content(
         self,
         topic: str,
         difficulty: str = "intermediate",
-        content_type: str = "explanation"
+        content_type: str = "explanation",
+        agent: str = "gemini",
+        budget: Optional[TokenBudget] = None
     ) -> str:
         """
         Generate educational content optimized for learning.
@@ -96,11 +385,46 @@ class GeminiClient:
         Args:
             topic: Subject topic to generate content for
             difficulty: Difficulty level (elementary/intermediate/advanced)
-            content_type: Type of content (explanation/summary/practice/quiz)
+            content_type: Type of content (see _educational_prompt)
+            agent: Name the token usage is recorded under
+            budget: Session token budget
         
         Returns:
             Generated educational content
         """
+        prompt = self._educational_prompt(topic, difficulty, content_type)
+        return self.generate_text(prompt, temperature=0.7, max_tokens=2048, agent=agent, budget=budget)
+    
+    def stream_educational_content(
+        self,
+        topic: str,
+        difficulty: str = "intermediate",
+        content_type: str = "explanation",
+        agent: str = "gemini",
+        budget: Optional[TokenBudget] = None
+    ) -> Iterator[str]:
+        """Streaming variant of generate_educational_content"""
+        prompt = self._educational_prompt(topic, difficulty, content_type)
+        return self.generate_text_stream(prompt, temperature=0.7, max_tokens=2048, agent=agent, budget=budget)
+    
+    def _educational_prompt(
+        self,
+        topic: str,
+        difficulty: str = "intermediate",
+        content_type: str = "explanation"
+    ) -> str:
+        """
+        Build the prompt for educational content.
+        
+        Args:
+            topic: Subject topic to generate content for
+            difficulty: Difficulty level (elementary/intermediate/advanced)
+            content_type: Type of content (explanation/summary/introduction/examples/
+                key_points/common_mistakes/practice/quiz)
+        
+        Returns:
+            Prompt text
+        """
         # Build specialized prompt based on content type
         prompts = {
             'explanation': f"""
@@ -127,6 +451,41 @@ Requirements:
 - Easy to understand
 
 Summary:
+""",
+            'introduction': f"""
+Write a short, welcoming introduction to {topic} for a {difficulty} level student.
+
+Requirements:
+- One sentence on what {topic} is
+- 3 bullet points on what the student will learn
+- An encouraging closing sentence
+- Under 120 words
+
+Introduction:
+""",
+            'examples': f"""
+Give 2 worked examples of {topic} for a {difficulty} level student.
+
+For each example:
+1. A short title
+2. The situation or problem
+3. Step-by-step reasoning
+
+Examples:
+""",
+            'key_points': f"""
+List the 4-5 most important key points about {topic} for a {difficulty} level student.
+
+Write one point per line, each starting with "- ".
+
+Key points:
+""",
+            'common_mistakes': f"""
+List 4 common mistakes students make when learning {topic} at {difficulty} level.
+
+Write one mistake per line, each starting with "- ", with a brief tip to avoid it.
+
+Common mistakes:
 """,
             'practice': f"""
 Generate 5 practice problems for {topic} at {difficulty} level.
@@ -150,13 +509,14 @@ Quiz:
 """
         }
         
-        prompt = prompts.get(content_type, prompts['explanation'])
-        return self.generate_text(prompt, temperature=0.7, max_tokens=2048)
+        return prompts.get(content_type, prompts['explanation'])
     
     def generate_health_information(
         self,
         symptoms: str,
-        context: str = ""
+        context: str = "",
+        agent: str = "gemini",
+        budget: Optional[TokenBudget] = None
     ) -> str:
         """
         Generate health information (educational purposes only).
@@ -164,11 +524,29 @@ Quiz:
         Args:
             symptoms: Symptom description
             context: Additional context
+            agent: Name the token usage is recorded under
+            budget: Session token budget
         
         Returns:
             Generated health information with disclaimer
         """
-        prompt = f"""
+        prompt = self._health_prompt(symptoms, context)
+        return self.generate_text(prompt, temperature=0.5, max_tokens=1500, agent=agent, budget=budget)
+    
+    def stream_health_information(
+        self,
+        symptoms: str,
+        context: str = "",
+        agent: str = "gemini",
+        budget: Optional[TokenBudget] = None
+    ) -> Iterator[str]:
+        """Streaming variant of generate_health_information"""
+        prompt = self._health_prompt(symptoms, context)
+        return self.generate_text_stream(prompt, temperature=0.5, max_tokens=1500, agent=agent, budget=budget)
+    
+    def _health_prompt(self, symptoms: str, context: str = "") -> str:
+        """Build the prompt for educational health information"""
+        return f"""
 Based on these symptoms: {symptoms}
 {f"Context: {context}" if context else ""}
 
@@ -183,16 +561,150 @@ Always consult a qualified healthcare professional for medical advice.
 
 Information:
 """
-        return self.generate_text(prompt, temperature=0.5, max_tokens=1500)
+
+
+def _model_for_key(model_name: str, api_key: str) -> Any:
+    """
+    A GenerativeModel whose requests use api_key.
+    
+    genai.configure() is process-global (the last key configured would serve
+    every model), so each model gets its own generative service clients,
+    which GenerativeModel uses instead of the global default when set.
+    
+    _client/_async_client are SDK internals of google-generativeai 0.3.x
+    (pinned in requirements.txt): GenerativeModel.__init__ sets them to None
+    and generate_content() falls back to the default client only while they
+    are None. Recheck this on an SDK upgrade. If they are missing, the key is
+    configured globally instead, which is only correct with a single key.
+    """
+    model = genai.GenerativeModel(model_name)
+    if (glm is not None and hasattr(model, '_client') and hasattr(model, '_async_client')
+            and hasattr(glm, 'GenerativeServiceClient') and hasattr(glm, 'GenerativeServiceAsyncClient')):
+        client_options = {'api_key': api_key}
+        model._client = glm.GenerativeServiceClient(client_options=client_options)
+        model._async_client = glm.GenerativeServiceAsyncClient(client_options=client_options)
+        return model
+    
+    print("Warning: google-generativeai does not expose per-model clients; "
+          "configuring the API key globally (keys of other clients are overridden)")
+    genai.configure(api_key=api_key)
+    return model
+
+
+class GeminiClientPool:
+    """
+    Process-wide registry sharing one configured GeminiClient per API key.
+    
+    Building a client opens its own connections to the API, so clients are
+    created under a lock and then reused by every agent and session holding
+    the same key. Clients not checked out for idle_ttl seconds are dropped
+    from the registry and their batcher is closed, stopping its threads
+    (agents already holding one keep working, without batching).
+    
+    Pooled clients micro-batch generate_text calls (see
+    GeminiClient.enable_batching), so prompts from concurrent sessions share
+    one rate-limited dispatcher per key. Configure with GEMINI_BATCH_WINDOW_MS
+    (0 disables batching) and GEMINI_REQUESTS_PER_MINUTE (0 for no limit).
+    Each client sends its requests with its own key, so several keys spread
+    load (and quota) across them.
+    """
+    
+    def __init__(
+        self,
+        idle_ttl: float = 3600.0,
+        batch_window: Optional[float] = None,
+        requests_per_minute: Optional[float] = None
+    ):
+        self.idle_ttl = idle_ttl
+        if batch_window is None:
+            batch_window = float(os.getenv('GEMINI_BATCH_WINDOW_MS', '20')) / 1000
+        if requests_per_minute is None:
+            requests_per_minute = float(os.getenv('GEMINI_REQUESTS_PER_MINUTE', '60'))
+        self.batch_window = batch_window
+        self.requests_per_minute = requests_per_minute or None
+        self._clients: Dict[str, Tuple[GeminiClient, float]] = {}
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+    
+    def get(self, api_key: Optional[str] = None) -> GeminiClient:
+        """
+        Get the shared client for an API key, creating it on first use.
+        
+        Raises:
+            ValueError: No API key given or found in the environment
+        """
+        api_key = api_key or os.getenv('GEMINI_API_KEY')
+        if not api_key and fake_backend_enabled():
+            api_key = 'fake'
+        if not api_key:
+            raise ValueError(
+                "GEMINI_API_KEY not found. "
+                "Please provide API key or set GEMINI_API_KEY environment variable."
+            )
+        
+        now = time.time()
+        with self._lock:
+            self._evict_idle(now)
+            
+            entry = self._clients.get(api_key)
+            if entry is not None:
+                client = entry[0]
+                self.reused += 1
+            else:
+                client = GeminiClient(api_key)
+                if self.batch_window > 0:
+                    client.enable_batching(self.batch_window, self.requests_per_minute)
+                self.created += 1
+            
+            self._clients[api_key] = (client, now)
+            return client
+    
+    def evict_idle(self):
+        """Drop clients that have not been checked out for idle_ttl seconds"""
+        with self._lock:
+            self._evict_idle(time.time())
+    
+    def clear(self):
+        """Drop every client"""
+        with self._lock:
+            for client, _ in self._clients.values():
+                self._close(client)
+            self._clients.clear()
+    
+    def stats(self) -> Dict:
+        """Pool size and creation/reuse counters"""
+        return {
+            'clients': len(self._clients),
+            'created': self.created,
+            'reused': self.reused
+        }
+    
+    def _evict_idle(self, now: float):
+        """Drop idle clients (lock held)"""
+        expired = [key for key, (_, last_used) in self._clients.items()
+                   if now - last_used > self.idle_ttl]
+        for key in expired:
+            self._close(self._clients.pop(key)[0])
+    
+    @staticmethod
+    def _close(client: GeminiClient):
+        """Stop a dropped client's batcher threads; queued requests are still sent"""
+        if client.batcher is not None:
+            client.batcher.close(wait=False)
+
+
+# Shared by all agents and Streamlit sessions in this process
+client_pool = GeminiClientPool()
 
 
 def get_gemini_client(api_key: Optional[str] = None) -> Optional[GeminiClient]:
     """
-    Factory function to get Gemini client instance.
+    Factory function to get the shared Gemini client for an API key.
     Returns None if API key not available.
     """
     try:
-        return GeminiClient(api_key)
+        return client_pool.get(api_key)
     except ValueError as e:
         print(f"Gemini client initialization failed: {e}")
         return None
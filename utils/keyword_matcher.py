@@ -0,0 +1,298 @@
+"""
+Keyword Matcher
+Compiled multi-pattern phrase matching over normalized query tokens
+"""
+
+import itertools
+import re
+import string
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Tokens keep the punctuation that is meaningful in technical terms
+# (c++, c#, node.js, ci/cd, scikit-learn) but drop sentence punctuation.
+_TOKEN_PATTERN = re.compile(r"\.?[a-z0-9]+(?:[.\-/][a-z0-9]+)*[+#]*")
+
+# Words ending in "s" that are not plurals and must not be folded
+_NON_PLURAL_SUFFIXES = ("ss", "us", "is", "os", "as")
+
+# Terminal marker inside trie nodes
+_END = None
+
+# Negative contractions, written without the apostrophe, and their expansions
+CONTRACTIONS = {
+    "cant": "can not", "cannot": "can not", "wont": "will not", "dont": "do not",
+    "doesnt": "does not", "didnt": "did not", "isnt": "is not", "arent": "are not",
+    "wasnt": "was not", "werent": "were not", "hasnt": "has not", "havent": "have not",
+    "hadnt": "had not", "couldnt": "could not", "shouldnt": "should not",
+    "wouldnt": "would not", "mustnt": "must not", "neednt": "need not",
+}
+
+# Contracted forms of each expansion: ("can", "not") -> [("cant",), ("cannot",)]
+_CONTRACTED_FORMS = {}
+for _short, _expanded in CONTRACTIONS.items():
+    _CONTRACTED_FORMS.setdefault(tuple(_expanded.split()), []).append((_short,))
+
+# Contractions a bare "not" may stand for ("he isnt breathing"): the forms of "to be"
+_BE_NOT_FORMS = [("isnt",), ("arent",), ("wasnt",), ("werent",)]
+
+# Prose normalization in one C-level pass: apostrophes are dropped
+# ("can't" -> "cant"), every other punctuation mark separates words
+_PROSE_TABLE = str.maketrans(
+    {**{ch: " " for ch in string.punctuation}, "'": None, "\u2019": None, "\u2018": None}
+)
+
+
+def singularize(token: str) -> str:
+    """Fold simple English plurals so 'cells' matches 'cell'"""
+    if len(token) <= 3 or not token.endswith("s") or not token.isalpha():
+        return token
+    if token.endswith(_NON_PLURAL_SUFFIXES):
+        return token
+    if token.endswith("ies") and len(token) > 4:
+        return token[:-3] + "y"
+    if token.endswith(("ches", "shes", "xes", "sses")):
+        return token[:-2]
+    return token[:-1]
+
+
+def pluralize(word: str) -> str:
+    """Regular English plural of a singular noun"""
+    if word.endswith("y") and len(word) > 2 and word[-2] not in "aeiou":
+        return word[:-1] + "ies"
+    if word.endswith(("s", "x", "z", "ch", "sh")):
+        return word + "es"
+    return word + "s"
+
+
+def inflect(word: str) -> Tuple[str, ...]:
+    """Regular past tense and -ing forms of a verb ("overdose" -> "overdosed", "overdosing")"""
+    if word.endswith(("ed", "ing")):
+        return ()
+    if word.endswith("ie"):
+        return (word + "d", word[:-2] + "ying")
+    if word.endswith("e"):
+        return (word + "d", word[:-1] + "ing")
+    if word.endswith("y") and word[-2] not in "aeiou":
+        return (word[:-1] + "ied", word + "ing")
+    return (word + "ed", word + "ing")
+
+
+def prose_words(text: str) -> List[str]:
+    """Lowercase words of free text, with punctuation and apostrophes normalized"""
+    return text.lower().translate(_PROSE_TABLE).split()
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, split into word tokens and fold plurals"""
+    return [singularize(token) for token in _TOKEN_PATTERN.findall(text.lower())]
+
+
+class KeywordMatcher:
+    """
+    Token-indexed trie for matching many keyword phrases in a single pass.
+
+    Phrases are tokenized with the same normalization as queries, so matching
+    is word-boundary aware ('cell' does not match 'excellent', 'c' does not
+    match every word containing the letter). Lookup cost depends on the query
+    length and the longest phrase, not on how many phrases are registered.
+    """
+
+    def __init__(self, phrases: Optional[Iterable[Tuple[str, str, float]]] = None):
+        self._root = {}
+        self._size = 0
+        for phrase, label, weight in phrases or ():
+            self.add(phrase, label, weight)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, phrase: str, label: str, weight: Optional[float] = None, verb: bool = False):
+        """
+        Register a phrase for a label.
+
+        Args:
+            phrase: Keyword or multi-word phrase
+            label: Category the phrase votes for
+            weight: Score contributed per hit (defaults to the phrase's token count,
+                so longer, more specific phrases count for more)
+            verb: The phrase starts with a verb, whose -ed/-ing forms also match
+                ("solve" matches "solved" and "solving")
+        """
+        tokens = tokenize(phrase)
+        if not tokens:
+            return
+
+        heads = (tokens[0],) + (inflect(tokens[0]) if verb and tokens[0].isalpha() else ())
+        added = False
+        for head in heads:
+            node = self._root.setdefault(head, {})
+            for token in tokens[1:]:
+                node = node.setdefault(token, {})
+
+            payload = node.setdefault(_END, {})
+            added = added or label not in payload
+            payload[label] = float(weight if weight is not None else len(tokens))
+        if added:
+            self._size += 1
+
+    def find_all(self, text: str) -> List[Tuple[str, str, int, float]]:
+        """
+        Find every registered phrase occurring in the text.
+
+        Returns:
+            List of (label, phrase, token_position, weight) tuples in query order
+        """
+        return self.find_all_tokens(tokenize(text))
+
+    def find_all_tokens(self, tokens: List[str]) -> List[Tuple[str, str, int, float]]:
+        """Same as find_all, for a query that has already been tokenized"""
+        hits = []
+        root = self._root
+        count = len(tokens)
+
+        for start in range(count):
+            node = root.get(tokens[start])
+            end = start
+            while node is not None:
+                end += 1
+                payload = node.get(_END)
+                if payload:
+                    phrase = " ".join(tokens[start:end])
+                    for label, weight in payload.items():
+                        hits.append((label, phrase, start, weight))
+                if end >= count:
+                    break
+                node = node.get(tokens[end])
+
+        return hits
+
+    def score(self, text: str) -> Dict[str, float]:
+        """Aggregate hit weights per label for the text"""
+        return self.score_tokens(tokenize(text))
+
+    def score_tokens(self, tokens: List[str]) -> Dict[str, float]:
+        """Aggregate hit weights per label for pre-tokenized text"""
+        scores = {}
+        for label, _, _, weight in self.find_all_tokens(tokens):
+            scores[label] = scores.get(label, 0.0) + weight
+        return scores
+
+
+class ProseMatcher:
+    """
+    Word-boundary phrase matcher for free-text prose (e.g. symptom descriptions)
+    with a tight latency budget.
+
+    Normalization is moved to build time: every registered phrase is expanded
+    into its surface variants (singular/plural of each word; "can't", "cant",
+    "cannot" and "can not"; for phrases added with verb=True, the -ed/-ing
+    forms of the leading verb, as in "stroked out"), so matching a query only needs one C-level
+    normalization pass (prose_words) and one dict probe per word.
+    """
+
+    def __init__(self, phrases: Optional[Iterable[Tuple[str, str]]] = None):
+        self._root = {}
+        self._size = 0
+        for phrase, label in phrases or ():
+            self.add(phrase, label)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, phrase: str, label: str, verb: bool = False):
+        """
+        Register a phrase (and all its variants) for a label. verb marks a
+        phrase that starts with a verb ("overdose", "stroke out"); only those
+        match inflected forms, so the noun "stroke" never matches "stroking".
+        """
+        canonical = " ".join(CONTRACTIONS.get(word, word) for word in prose_words(phrase))
+        if not canonical:
+            return
+
+        self._size += 1
+        for variant in self._variants(canonical.split(), verb):
+            node = self._root
+            for word in variant:
+                node = node.setdefault(word, {})
+            node.setdefault(_END, {})[label] = canonical
+
+    def find_all(self, text: str) -> List[Tuple[str, str, int]]:
+        """
+        Find every registered phrase in the text.
+
+        Returns:
+            List of (label, canonical_phrase, word_position) tuples in text order
+        """
+        words = prose_words(text)
+        hits = []
+        root_get = self._root.get
+        count = len(words)
+
+        for start, word in enumerate(words):
+            node = root_get(word)
+            end = start
+            while node is not None:
+                end += 1
+                payload = node.get(_END)
+                if payload:
+                    for label, phrase in payload.items():
+                        hits.append((label, phrase, start))
+                if end >= count:
+                    break
+                node = node.get(words[end])
+
+        return hits
+
+    def labels(self, text: str) -> Set[str]:
+        """Labels with at least one phrase in the text"""
+        return self.labels_in_words(prose_words(text))
+
+    def labels_in_words(self, words: List[str]) -> Set[str]:
+        """Same as labels, for text already split with prose_words"""
+        found = set()
+        root_get = self._root.get
+        count = len(words)
+
+        for start, word in enumerate(words):
+            node = root_get(word)
+            end = start
+            while node is not None:
+                end += 1
+                payload = node.get(_END)
+                if payload:
+                    found.update(payload)
+                if end >= count:
+                    break
+                node = node.get(words[end])
+
+        return found
+
+    @staticmethod
+    def _variants(words: List[str], verb: bool = False) -> Iterable[Tuple[str, ...]]:
+        """Surface forms of a canonical (contraction-expanded) phrase"""
+        slots = []
+        i = 0
+        while i < len(words):
+            # "<aux> not" may also be written contracted ("can not" -> "cant")
+            pair = tuple(words[i:i + 2])
+            if len(pair) == 2 and pair in _CONTRACTED_FORMS:
+                slots.append([pair] + _CONTRACTED_FORMS[pair])
+                i += 2
+                continue
+            word = words[i]
+            if word == "not":
+                # A bare "not" also matches "to be" contractions ("isnt breathing")
+                slots.append([("not",)] + _BE_NOT_FORMS)
+                i += 1
+                continue
+            forms = {word}
+            if word.isalpha() and len(word) > 2:
+                singular = singularize(word)
+                forms.update((singular, pluralize(singular)))
+                if verb and i == 0:
+                    forms.update(inflect(word))
+            slots.append([(form,) for form in sorted(forms)])
+            i += 1
+
+        for combination in itertools.product(*slots):
+            yield tuple(word for part in combination for word in part)
@@ -0,0 +1,187 @@
+"""
+LLM Micro-Batcher
+Coalesces concurrent prompts into short batches and dispatches them as a
+rate-limited, pipelined burst.
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from utils.observability import metrics
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, bursts up to `capacity`
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, blocking until available; returns seconds waited"""
+        waited = 0.0
+        while True:
+            wait = self._take()
+            if not wait:
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+    async def acquire_async(self) -> float:
+        """acquire() for coroutines: waits without blocking the event loop"""
+        waited = 0.0
+        while True:
+            wait = self._take()
+            if not wait:
+                return waited
+            await asyncio.sleep(wait)
+            waited += wait
+
+    def _take(self) -> float:
+        """Take one token if available (0.0), else the seconds until one is"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+
+class MicroBatcher:
+    """
+    Micro-batching scheduler in front of a blocking request function.
+
+    Callers submit() a request and get a Future. A dispatcher thread collects
+    requests that arrive within `window` seconds (up to max_batch), merges
+    identical requests into one call, and sends the batch as a pipelined
+    burst on a worker pool, pacing calls with a token bucket so the burst
+    stays within the requests-per-minute quota. Each result (or exception)
+    is routed back to every caller that asked for it.
+
+    Metrics: llm_batch_size, llm_batch_queue_delay (submit to dispatch,
+    including rate-limit waits) and llm_batch_rate_limit_wait.
+    """
+
+    def __init__(
+        self,
+        send: Callable[..., Any],
+        window: float = 0.02,
+        max_batch: int = 16,
+        max_workers: int = 8,
+        requests_per_minute: Optional[float] = 60,
+        burst: Optional[int] = None
+    ):
+        """
+        Args:
+            send: Blocking function performing one request, called with the
+                submitted arguments
+            window: Seconds to wait for more requests after the first arrives
+            max_batch: Dispatch early once this many requests are queued
+            max_workers: Requests in flight at once
+            requests_per_minute: Quota for send() calls (None for no limit)
+            burst: Calls allowed back-to-back before pacing (defaults to max_batch)
+        """
+        self.send = send
+        self.window = window
+        self.max_batch = max_batch
+        self.bucket = None
+        if requests_per_minute:
+            self.bucket = TokenBucket(requests_per_minute / 60.0, burst or max_batch)
+
+        self._queue: "queue.Queue[Optional[Tuple[tuple, float, Future]]]" = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-batch")
+        self._closed = False
+        self._dispatcher = threading.Thread(target=self._run, name="llm-batch-dispatcher", daemon=True)
+        self._dispatcher.start()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def submit(self, *args: Any) -> Future:
+        """Queue a request; the returned Future resolves to send(*args)"""
+        if self._closed:
+            raise RuntimeError("MicroBatcher is closed")
+        future = Future()
+        self._queue.put((args, time.monotonic(), future))
+        return future
+
+    def close(self, wait: bool = True):
+        """Stop accepting requests; queued requests are still sent"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        if wait:
+            self._dispatcher.join()
+        self._executor.shutdown(wait=wait)
+
+    def _run(self):
+        """Dispatcher loop: collect a batch, then send it"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            batch = [item]
+            deadline = time.monotonic() + self.window
+            stop = False
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._dispatch(batch)
+            if stop:
+                return
+
+    def _dispatch(self, batch: List[Tuple[tuple, float, Future]]):
+        """Send each distinct request once, within the rate limit"""
+        groups: Dict[tuple, List[Tuple[float, Future]]] = {}
+        for args, submitted_at, future in batch:
+            if future.set_running_or_notify_cancel():
+                groups.setdefault(args, []).append((submitted_at, future))
+
+        metrics.record_metric("llm_batch_size", len(batch), {"distinct": len(groups)})
+
+        for args, waiters in groups.items():
+            if self.bucket is not None:
+                waited = self.bucket.acquire()
+                if waited:
+                    metrics.record_metric("llm_batch_rate_limit_wait", waited)
+
+            now = time.monotonic()
+            for submitted_at, _ in waiters:
+                metrics.record_metric("llm_batch_queue_delay", now - submitted_at)
+
+            self._executor.submit(self._send_group, args, [future for _, future in waiters])
+
+    def _send_group(self, args: tuple, futures: List[Future]):
+        """Run one request and resolve every waiting future"""
+        try:
+            result = self.send(*args)
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+        else:
+            for future in futures:
+                future.set_result(result)
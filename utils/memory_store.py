@@ -0,0 +1,200 @@
+"""
+Memory Storage
+Storage backends for MemoryBank
+"""
+
+import bisect
+import heapq
+import os
+import zlib
+from collections import defaultdict
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+from utils.serializer import Serializer, get_serializer, load
+
+# Length of the topic substrings indexed for search
+TRIGRAM = 3
+
+# Searches with more than limit candidates first walk the popularity order,
+# for at most this many entries per candidate, before ranking every match
+WALK_STEPS_PER_CANDIDATE = 8
+
+
+def trigrams(text: str) -> Set[str]:
+    """The distinct TRIGRAM-character substrings of text"""
+    return {text[i:i + TRIGRAM] for i in range(len(text) - TRIGRAM + 1)}
+
+
+def _remove_sorted(items: List, item):
+    """Remove item from a sorted list, if present"""
+    i = bisect.bisect_left(items, item)
+    if i < len(items) and items[i] == item:
+        del items[i]
+
+
+class MemoryStore:
+    """
+    Storage interface for MemoryBank.
+
+    Memories are dicts with id, topic, insights, metadata, timestamp and
+    access_count. Queries return memories ordered as MemoryBank documents.
+    """
+
+    def get(self, memory_id: str) -> Optional[Dict]:
+        """One memory, or None"""
+        raise NotImplementedError
+
+    def save(self, memory: Dict):
+        """Insert or replace a memory"""
+        raise NotImplementedError
+
+    def save_many(self, memories: Iterable[Dict]):
+        """Insert or replace many memories"""
+        for memory in memories:
+            self.save(memory)
+
+    def save_access_counts(self, memories: Iterable[Dict]):
+        """Persist the access_count of stored memories (whose content is unchanged)"""
+        self.save_many(memories)
+
+    def search(self, query: str, limit: int) -> List[Dict]:
+        """Memories whose topic contains query (case-insensitive), most accessed then newest first"""
+        raise NotImplementedError
+
+    def recent(self, limit: int) -> List[Dict]:
+        """Newest memories first"""
+        raise NotImplementedError
+
+    def popular(self, limit: int) -> List[Dict]:
+        """Most accessed memories first"""
+        raise NotImplementedError
+
+    def all(self) -> Iterator[Dict]:
+        """Every stored memory"""
+        raise NotImplementedError
+
+    def close(self):
+        """Flush and release resources"""
+
+
+class JsonMemoryStore(MemoryStore):
+    """
+    One JSON file per memory (in the STORAGE_FORMAT serialization), all
+    held in memory.
+
+    Queries use indexes maintained on every save instead of scanning:
+    - a character trigram index over lowercased topics for search (queries
+      shorter than a trigram scan the topics)
+    - sorted (timestamp, id) and (access_count, timestamp, id) lists, so
+      recent/popular read the last `limit` entries
+
+    Orders reflect the access_count of the last save/save_access_counts.
+    """
+
+    def __init__(self, storage_path: str = "memory_bank", serializer: Optional[Serializer] = None):
+        self.storage_path = storage_path
+        self.serializer = serializer or get_serializer()
+        self.memories = {}
+        # id -> lowercased topic, trigram -> ids, id -> (access_count, timestamp) as indexed
+        self._topics = {}
+        self._trigrams = defaultdict(set)
+        self._keys = {}
+        self._by_time = []
+        self._by_access = []
+
+        os.makedirs(storage_path, exist_ok=True)
+        self._load_memories()
+
+    def get(self, memory_id: str) -> Optional[Dict]:
+        return self.memories.get(memory_id)
+
+    def save(self, memory: Dict):
+        self._index(memory)
+        filepath = os.path.join(self.storage_path, f"{memory['id']}.json")
+        self.serializer.dump(memory, filepath)
+
+    def search(self, query: str, limit: int) -> List[Dict]:
+        if limit <= 0:
+            return []
+        query_lower = query.lower()
+        if len(query_lower) < TRIGRAM:
+            postings = [self._topics]
+        else:
+            postings = sorted((self._trigrams.get(gram, set()) for gram in trigrams(query_lower)), key=len)
+
+        if len(postings[0]) > limit:
+            # The first matches in popularity order are the answer, and come
+            # early when matches are common; the substring check does the filtering
+            results = []
+            for key in islice(reversed(self._by_access), len(postings[0]) * WALK_STEPS_PER_CANDIDATE):
+                memory_id = key[-1]
+                if memory_id in postings[0] and query_lower in self._topics[memory_id]:
+                    results.append(self.memories[memory_id])
+                    if len(results) == limit:
+                        return results
+
+        candidates = postings[0].intersection(*postings[1:]) if len(postings) > 1 else postings[0]
+        results = [self.memories[memory_id] for memory_id in candidates
+                   if query_lower in self._topics[memory_id]]
+        # Sort by access count and recency
+        return heapq.nlargest(limit, results, key=lambda x: (x['access_count'], x['timestamp']))
+
+    def recent(self, limit: int) -> List[Dict]:
+        return [self.memories[memory_id] for _, memory_id in reversed(self._by_time[-limit:])] if limit > 0 else []
+
+    def popular(self, limit: int) -> List[Dict]:
+        return [self.memories[key[-1]] for key in reversed(self._by_access[-limit:])] if limit > 0 else []
+
+    def all(self) -> Iterator[Dict]:
+        return iter(list(self.memories.values()))
+
+    def _index(self, memory: Dict):
+        """Add or re-index one memory"""
+        memory_id = memory['id']
+        topic = memory['topic'].lower()
+        old_topic = self._topics.get(memory_id)
+        if old_topic != topic:
+            if old_topic is not None:
+                for gram in trigrams(old_topic):
+                    self._trigrams[gram].discard(memory_id)
+            for gram in trigrams(topic):
+                self._trigrams[gram].add(memory_id)
+            self._topics[memory_id] = topic
+
+        old_key = self._keys.get(memory_id)
+        if old_key is not None:
+            _remove_sorted(self._by_time, (old_key[1], memory_id))
+            _remove_sorted(self._by_access, old_key + (memory_id,))
+        key = (memory.get('access_count', 0), memory.get('timestamp') or '')
+        bisect.insort(self._by_time, (key[1], memory_id))
+        bisect.insort(self._by_access, key + (memory_id,))
+        self._keys[memory_id] = key
+        self.memories[memory_id] = memory
+
+    def _load_memories(self):
+        """Load all memories from disk and build the indexes"""
+        for filename in os.listdir(self.storage_path):
+            if filename.endswith('.json'):
+                filepath = os.path.join(self.storage_path, filename)
+                try:
+                    memory = load(filepath)
+                    self.memories[memory['id']] = memory
+                except (OSError, ValueError, KeyError, TypeError, zlib.error):
+                    pass
+
+        for memory_id, memory in self.memories.items():
+            topic = self._topics[memory_id] = str(memory.get('topic', '')).lower()
+            for gram in trigrams(topic):
+                self._trigrams[gram].add(memory_id)
+            self._keys[memory_id] = (memory.get('access_count', 0), memory.get('timestamp') or '')
+        self._by_time = sorted((key[1], memory_id) for memory_id, key in self._keys.items())
+        self._by_access = sorted(key + (memory_id,) for memory_id, key in self._keys.items())
+
+
+def memory_store_from_env(storage_path: str = "memory_bank") -> MemoryStore:
+    """The MemoryStore selected by STORAGE_BACKEND (json or sqlite)"""
+    if os.getenv('STORAGE_BACKEND', 'json').lower() == 'sqlite':
+        from utils.sqlite_store import SqliteMemoryStore
+        return SqliteMemoryStore()
+    return JsonMemoryStore(storage_path)
@@ -0,0 +1,90 @@
+"""
+Storage Migration
+Copies sessions and memories from the JSON directories into the SQLite
+storage backend
+
+Usage:
+    python -m utils.migrate_storage --sessions sessions --memories memory_bank --db omnicare.db
+
+Existing sessions and memories with the same ids are replaced (a session's
+history and context rows included), so the migration can be re-run. The
+JSON directories are only read.
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.memory_store import JsonMemoryStore
+from utils.session_store import JournalSessionStore
+from utils.sqlite_store import SqliteMemoryStore, SqliteSessionStore, get_database
+
+BATCH = 500
+
+
+def snapshot_ids(source_path: str) -> List[str]:
+    """
+    Ids of the sessions in a JSON session directory, from the snapshot file
+    names (unlike JournalSessionStore.index(), never writes index.jsonl)
+    """
+    return sorted(filename[:-len('.json')] for filename in os.listdir(source_path)
+                  if filename.endswith('.json'))
+
+
+def migrate_sessions(source_path: str, target: SqliteSessionStore) -> int:
+    """Copy every session (snapshot + journal) into target; returns the count"""
+    source = JournalSessionStore(source_path)
+    migrated = 0
+    batch = []
+    for session_id in snapshot_ids(source_path):
+        session = source.load(session_id)
+        if session is None or session.get('id') != session_id:
+            print(f"Skipping unreadable session {session_id}")
+            continue
+        batch.append(session)
+        if len(batch) >= BATCH:
+            target.import_sessions(batch)
+            migrated += len(batch)
+            batch = []
+    if batch:
+        target.import_sessions(batch)
+        migrated += len(batch)
+    return migrated
+
+
+def migrate_memories(source_path: str, target: SqliteMemoryStore) -> int:
+    """Copy every memory into target; returns the count"""
+    memories = list(JsonMemoryStore(source_path).all())
+    for start in range(0, len(memories), BATCH):
+        target.save_many(memories[start:start + BATCH])
+    return len(memories)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", default="sessions", help="session directory ('' to skip)")
+    parser.add_argument("--memories", default="memory_bank", help="memory bank directory ('' to skip)")
+    parser.add_argument("--db", default=os.getenv('STORAGE_DB_PATH', 'omnicare.db'))
+    args = parser.parse_args()
+
+    database = get_database(args.db)
+    start = time.perf_counter()
+
+    if args.sessions and os.path.isdir(args.sessions):
+        count = migrate_sessions(args.sessions, SqliteSessionStore(database))
+        print(f"Migrated {count} sessions from {args.sessions}/")
+    if args.memories and os.path.isdir(args.memories):
+        count = migrate_memories(args.memories, SqliteMemoryStore(database))
+        print(f"Migrated {count} memories from {args.memories}/")
+
+    database.close()
+    print(f"Done in {time.perf_counter() - start:.1f}s -> {args.db}")
+    print("Set STORAGE_BACKEND=sqlite (and STORAGE_DB_PATH) to use it.")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,7 @@ from datetime import datetime
 from typing import Dict, List, Optional
 import os
 from functools import wraps
+from utils.serializer import get_serializer, serializer_for_path
 
 class AgentLogger:
     """
@@ -167,8 +168,7 @@ class AgentTracer:
             # Ensure directory exists
             os.makedirs(self.trace_dir, exist_ok=True)
             filename = os.path.join(self.trace_dir, f"{trace['trace_id']}.json")
-            with open(filename, 'w') as f:
-                json.dump(trace, f, indent=2)
+            get_serializer().dump(trace, filename)
         except Exception as e:
             # Log error but don't crash the app
             print(f"Warning: Could not save trace file: {e}")
@@ -232,6 +232,31 @@ class MetricsCollector:
             'timestamp': datetime.now().isoformat()
         })
     
+    def record_gauge(self, gauge_name: str, value: float):
+        """Record the current value of a gauge (e.g. memory use); only the latest is kept"""
+        self.metrics.setdefault('gauges', {})[gauge_name] = value
+    
+    def record_cache_event(self, cache_name: str, hit: bool):
+        """Record a cache lookup as a hit or a miss"""
+        cache_stats = self.metrics.setdefault('cache_stats', {})
+        if cache_name not in cache_stats:
+            cache_stats[cache_name] = {'hits': 0, 'misses': 0}
+        
+        if hit:
+            cache_stats[cache_name]['hits'] += 1
+        else:
+            cache_stats[cache_name]['misses'] += 1
+    
+    def record_token_usage(self, agent_name: str, tokens_in: int, tokens_out: int):
+        """Record LLM tokens sent and received on behalf of an agent"""
+        token_usage = self.metrics.setdefault('token_usage', {})
+        if agent_name not in token_usage:
+            token_usage[agent_name] = {'requests': 0, 'tokens_in': 0, 'tokens_out': 0}
+        
+        token_usage[agent_name]['requests'] += 1
+        token_usage[agent_name]['tokens_in'] += tokens_in
+        token_usage[agent_name]['tokens_out'] += tokens_out
+    
     def record_error(self, error_type: str, error_message: str):
         """Record error"""
         self.metrics['errors'].append({
@@ -250,19 +275,39 @@ class MetricsCollector:
         success_rate = (self.metrics['success_rate']['success'] / total_attempts * 100) \
             if total_attempts > 0 else 0
         
+        cache_summary = {}
+        for cache_name, counts in self.metrics.get('cache_stats', {}).items():
+            lookups = counts['hits'] + counts['misses']
+            cache_summary[cache_name] = {
+                'hits': counts['hits'],
+                'misses': counts['misses'],
+                'hit_ratio': (counts['hits'] / lookups * 100) if lookups > 0 else 0
+            }
+        
         return {
             'total_agent_calls': total_calls,
             'avg_response_time': avg_response_time,
             'success_rate': success_rate,
             'total_errors': len(self.metrics['errors']),
             'agent_breakdown': self.metrics['agent_calls'],
-            'tool_usage': self.metrics['tool_calls']
+            'tool_usage': self.metrics['tool_calls'],
+            'cache_stats': cache_summary,
+            'token_usage': self.metrics.get('token_usage', {}),
+            'gauges': self.metrics.get('gauges', {})
         }
     
     def export_metrics(self, filepath: str):
-        """Export metrics to JSON file"""
-        with open(filepath, 'w') as f:
-            json.dump(self.metrics, f, indent=2)
+        """Export metrics to JSON file (compressed for .gz/.zz paths)"""
+        serializer_for_path(filepath).dump(self.metrics, filepath)
+
+
+def process_rss() -> Optional[int]:
+    """Resident set size of this process in bytes (from /proc, so None outside Linux)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
 
 
 def trace_agent_execution(agent_name: str):
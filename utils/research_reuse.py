@@ -0,0 +1,126 @@
+"""
+Research Reuse
+Serves a repeated research request from an earlier result for the same
+topic and settings instead of re-running the agent pipeline
+"""
+
+import os
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+# Settings that change the content of a result (the others only change its display)
+CONTENT_SETTINGS = ('max_results', 'summary_length', 'deep_analysis', 'generate_citations', 'audio_enabled')
+
+# Fields a history entry needs to be served again
+REQUIRED_FIELDS = ('search_results', 'summary', 'report')
+
+
+def normalize_topic(topic: str) -> str:
+    return ' '.join(topic.lower().split())
+
+
+class ResearchReuse:
+    """
+    Reuse policy for the research pipeline.
+
+    find() returns the newest earlier result for the same topic, research
+    type and CONTENT_SETTINGS that is at most max_age seconds old
+    (RESEARCH_REUSE_MAX_AGE_HOURS, 0 disables reuse), looking in:
+    1. the current session's research history
+    2. the session recorded in the topic's MemoryBank memory, if that
+       memory is for the same topic (not a similar one, see
+       MemoryBank.retrieve_memory)
+
+    Results older than refresh_after seconds (RESEARCH_REFRESH_AFTER_HOURS,
+    0 disables) are still served, and refresh() can recompute them in a
+    background thread, at most one per topic at a time.
+    """
+
+    def __init__(self, session_service, memory_bank,
+                 max_age: Optional[float] = None, refresh_after: Optional[float] = None):
+        if max_age is None:
+            max_age = float(os.getenv('RESEARCH_REUSE_MAX_AGE_HOURS', '24')) * 3600
+        if refresh_after is None:
+            refresh_after = float(os.getenv('RESEARCH_REFRESH_AFTER_HOURS', '6')) * 3600
+
+        self.session_service = session_service
+        self.memory_bank = memory_bank
+        self.max_age = max_age
+        self.refresh_after = refresh_after
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def find(self, topic: str, research_type: str, settings: Dict,
+             session_id: Optional[str] = None, memory: Optional[Dict] = None) -> Optional[Dict]:
+        """
+        A reusable earlier result (a copy of its history entry, with 'reused'
+        set), or None. memory is the topic's MemoryBank memory when the
+        caller has already retrieved it.
+        """
+        if self.max_age <= 0:
+            return None
+
+        if session_id:
+            found = self._match(session_id, topic, research_type, settings)
+            if found:
+                return found
+
+        if memory is None:
+            memory = self.memory_bank.retrieve_memory(topic)
+        if not memory or normalize_topic(memory.get('topic', '')) != normalize_topic(topic):
+            return None
+        source_session = memory.get('metadata', {}).get('session_id')
+        if source_session and source_session != session_id:
+            return self._match(source_session, topic, research_type, settings)
+        return None
+
+    def needs_refresh(self, research: Dict) -> bool:
+        """Whether a reused result is old enough to recompute in the background"""
+        age = research.get('reused', {}).get('age_seconds', 0)
+        return 0 < self.refresh_after <= age
+
+    def refresh(self, topic: str, pipeline: Callable[[], Dict], on_done: Callable[[Dict], None]) -> bool:
+        """
+        Run pipeline() in a daemon thread and pass its result to on_done();
+        False if a refresh of this topic is already running
+        """
+        key = normalize_topic(topic)
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                on_done(pipeline())
+            except Exception as e:
+                print(f"Warning: Background research refresh failed for '{topic}': {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, name=f"research-refresh-{key[:32]}", daemon=True).start()
+        return True
+
+    def _match(self, session_id: str, topic: str, research_type: str, settings: Dict) -> Optional[Dict]:
+        """Newest fresh entry of the session's history for topic, type and settings"""
+        wanted = normalize_topic(topic)
+        now = datetime.now()
+        for entry in reversed(self.session_service.get_session_history(session_id)):
+            if not isinstance(entry, dict) or any(field not in entry for field in REQUIRED_FIELDS):
+                continue
+            if normalize_topic(entry.get('topic', '')) != wanted or entry.get('type') != research_type:
+                continue
+            entry_settings = entry.get('settings') or {}
+            if any(entry_settings.get(name) != settings.get(name) for name in CONTENT_SETTINGS):
+                continue
+            try:
+                age = (now - datetime.fromisoformat(entry['timestamp'])).total_seconds()
+            except (KeyError, TypeError, ValueError):
+                continue
+            if age > self.max_age:
+                # History is in time order: every older entry is stale too
+                return None
+            return dict(entry, reused={'timestamp': entry['timestamp'], 'age_seconds': age, 'session_id': session_id})
+        return None
@@ -0,0 +1,276 @@
+"""
+Response Cache
+In-memory LRU and on-disk tiers with TTLs for expensive, deterministic responses
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# Returned by get() on a miss, so that cached falsy values stay distinguishable
+MISSING = object()
+
+
+def make_cache_key(*parts: Any) -> str:
+    """Stable SHA-256 key over the JSON encoding of the given parts"""
+    payload = json.dumps(parts, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class LRUCache:
+    """
+    Thread-safe in-memory LRU cache with optional per-entry TTL
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Any:
+        """Get a value, or MISSING if absent or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                self.misses += 1
+                return MISSING
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, expires_at: Optional[float] = None):
+        """
+        Store a value, evicting the least recently used entries if full.
+        expires_at (a time.time() timestamp) overrides the TTL, e.g. to keep
+        the expiry of an entry copied from another tier.
+        """
+        if expires_at is None:
+            ttl = self.ttl if ttl is None else ttl
+            expires_at = time.time() + ttl if ttl else None
+
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        """Remove a single entry"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Remove every entry"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and current size"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0
+        }
+
+
+class DiskCache:
+    """
+    Size-bounded on-disk cache, one JSON file per entry.
+
+    Entries carry their own expiry time. When the directory grows past
+    max_bytes, the least recently used files (by modification time, which
+    is refreshed on every hit) are removed.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 50 * 1024 * 1024, ttl: Optional[float] = None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._total_bytes = sum(
+                entry.stat().st_size for entry in os.scandir(cache_dir)
+                if entry.name.endswith('.json')
+            )
+        except OSError as e:
+            print(f"Warning: Could not access cache directory: {e}")
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Any:
+        """Get a value, or MISSING if absent, expired or unreadable"""
+        entry = self.get_entry(key)
+        return entry if entry is MISSING else entry[0]
+
+    def get_entry(self, key: str) -> Any:
+        """(value, expires_at or None), or MISSING if absent, expired or unreadable"""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return MISSING
+
+        expires_at = entry.get('expires_at')
+        if expires_at is not None and expires_at <= time.time():
+            self.delete(key)
+            return MISSING
+
+        try:
+            # Refresh recency for LRU eviction
+            os.utime(path, None)
+        except OSError:
+            pass
+        return entry.get('value'), expires_at
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """Store a value atomically, then enforce the size bound"""
+        ttl = self.ttl if ttl is None else ttl
+        entry = {
+            'expires_at': time.time() + ttl if ttl else None,
+            'value': value
+        }
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+
+        try:
+            data = json.dumps(entry).encode('utf-8')
+            with self._lock:
+                old_size = os.path.getsize(path) if os.path.exists(path) else 0
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+                self._total_bytes += len(data) - old_size
+                if self._total_bytes > self.max_bytes:
+                    self._evict()
+        except OSError as e:
+            print(f"Warning: Could not write cache entry: {e}")
+
+    def delete(self, key: str):
+        """Remove a single entry"""
+        path = self._path(key)
+        with self._lock:
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+                self._total_bytes -= size
+            except OSError:
+                pass
+
+    def clear(self):
+        """Remove every entry"""
+        with self._lock:
+            try:
+                entries = list(os.scandir(self.cache_dir))
+            except OSError:
+                entries = []
+            for entry in entries:
+                if entry.name.endswith('.json'):
+                    try:
+                        os.remove(entry.path)
+                    except OSError:
+                        pass
+            self._total_bytes = 0
+
+    def _evict(self):
+        """Drop least recently used files until under 90% of max_bytes (lock held)"""
+        files = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.json'):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        files.sort()
+        target = int(self.max_bytes * 0.9)
+        for _, size, path in files:
+            if self._total_bytes <= target:
+                break
+            try:
+                os.remove(path)
+                self._total_bytes -= size
+            except OSError:
+                pass
+
+
+class ResponseCache:
+    """
+    Two-tier response cache: in-memory LRU in front of an optional disk tier.
+
+    Disk hits are promoted into memory, keeping their disk expiry. Both
+    tiers share the same TTL.
+    """
+
+    def __init__(self,
+                 max_entries: int = 256,
+                 ttl: Optional[float] = 24 * 3600,
+                 cache_dir: Optional[str] = "llm_cache",
+                 max_disk_bytes: int = 50 * 1024 * 1024):
+        self.memory = LRUCache(max_entries=max_entries, ttl=ttl)
+        self.disk = DiskCache(cache_dir, max_bytes=max_disk_bytes, ttl=ttl) if cache_dir else None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Any:
+        """Get a value from memory, then disk; MISSING if neither has it"""
+        value = self.memory.get(key)
+        if value is MISSING and self.disk is not None:
+            entry = self.disk.get_entry(key)
+            if entry is not MISSING:
+                value, expires_at = entry
+                self.memory.set(key, value, expires_at=expires_at)
+
+        if value is MISSING:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """Store a value in both tiers"""
+        self.memory.set(key, value, ttl)
+        if self.disk is not None:
+            self.disk.set(key, value, ttl)
+
+    def delete(self, key: str):
+        """Remove an entry from both tiers"""
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def clear(self):
+        """Remove every entry from both tiers"""
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> Dict:
+        """Overall hit/miss counters and memory tier size"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.memory),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0
+        }
@@ -0,0 +1,106 @@
+"""
+Serialization
+Compact, optionally compressed JSON for persisted sessions, memories,
+traces and exports
+"""
+
+import gzip
+import json
+import os
+import zlib
+from typing import Optional
+
+try:
+    import orjson
+except ImportError:  # optional: faster encoding and decoding
+    orjson = None
+
+FORMATS = ('json', 'pretty', 'zlib', 'gzip')
+
+# Leading bytes of compressed payloads; anything else is read as JSON
+GZIP_MAGIC = b'\x1f\x8b'
+ZLIB_HEADERS = (b'\x78\x01', b'\x78\x5e', b'\x78\x9c', b'\x78\xda')
+
+
+def to_json(value) -> bytes:
+    """Compact JSON (orjson when installed)"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # e.g. integers beyond 64 bits; the stdlib encoder handles them
+            pass
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def loads(data: bytes):
+    """Decode a payload written in any FORMATS (detected from its first bytes)"""
+    if data[:2] == GZIP_MAGIC:
+        data = gzip.decompress(data)
+    elif data[:2] in ZLIB_HEADERS:
+        data = zlib.decompress(data)
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # e.g. NaN written by the stdlib encoder
+            pass
+    return json.loads(data)
+
+
+def load(path: str):
+    """Read a file written by any serializer (or by earlier json.dump calls)"""
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+
+class Serializer:
+    """
+    Encodes values to bytes in one of FORMATS:
+    - json: compact JSON, no indentation (default)
+    - pretty: indent=2, the previous format, for files read by people
+    - zlib / gzip: compact JSON, compressed
+
+    File names keep their .json extension whatever the format; readers
+    detect compression from the content, so formats can be mixed in one
+    directory and changed at any time.
+    """
+
+    def __init__(self, fmt: str = 'json', level: int = 6):
+        if fmt not in FORMATS:
+            raise ValueError(f"format must be one of {FORMATS}")
+        self.format = fmt
+        self.level = level
+
+    def dumps(self, value) -> bytes:
+        if self.format == 'pretty':
+            return json.dumps(value, indent=2).encode('utf-8')
+        data = to_json(value)
+        if self.format == 'zlib':
+            return zlib.compress(data, self.level)
+        if self.format == 'gzip':
+            # mtime=0 keeps equal values byte-identical
+            return gzip.compress(data, self.level, mtime=0)
+        return data
+
+    def dump(self, value, path: str):
+        """Write value to path"""
+        with open(path, 'wb') as f:
+            f.write(self.dumps(value))
+
+    loads = staticmethod(loads)
+    load = staticmethod(load)
+
+
+def get_serializer(fmt: Optional[str] = None) -> Serializer:
+    """The Serializer for fmt, or for STORAGE_FORMAT (default json)"""
+    return Serializer((fmt or os.getenv('STORAGE_FORMAT', 'json')).lower())
+
+
+def serializer_for_path(path: str) -> Serializer:
+    """Serializer for an export file: gzip for .gz, zlib for .zz, compact JSON otherwise"""
+    if path.endswith('.gz'):
+        return Serializer('gzip')
+    if path.endswith('.zz'):
+        return Serializer('zlib')
+    return Serializer('json')
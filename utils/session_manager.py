@@ -3,27 +3,96 @@ Session and Memory Management for Research Assistant
 Implements state management and long-term memory for research history
 """
 
+import atexit
 import json
 import os
+import threading
+import time
+import weakref
+from collections import Counter, OrderedDict
 from datetime import datetime
 from typing import List, Dict, Optional
 import hashlib
+from utils.token_budget import CHARS_PER_TOKEN
+from utils.context_compactor import ContextCompactor
+from utils.session_store import SessionStore, apply_op, session_store_from_env
+from utils.memory_store import MemoryStore, memory_store_from_env
+from utils.embeddings import VectorIndex, embed, index_from_env, numbers
+from utils.serializer import to_json
+
+# Context items stored per session (compacted into a token budget when read)
+MAX_CONTEXT_ITEMS = int(os.getenv('CONTEXT_MAX_ITEMS', '100'))
+
+MB = 1024 * 1024
+
+# Extra nearest topics a similarity lookup fetches, in case some have other numbers
+SIMILAR_CANDIDATES = 8
+
+
+def _size(value) -> int:
+    """Approximate memory footprint of a session value: its serialized JSON size"""
+    try:
+        return len(to_json(value))
+    except (TypeError, ValueError):
+        return 0
+
 
 class SessionService:
     """
     In-Memory Session Service for managing research sessions and state
+    
+    Sessions are persisted through a SessionStore (by default a snapshot
+    plus append-only journal per session, or SQLite with
+    STORAGE_BACKEND=sqlite), so each mutation writes only the change.
+    
+    Nothing is read at startup: a session's body is loaded on first access
+    and kept in a bounded LRU. A session is evicted when it is the least
+    recently used one and
+    - more than max_loaded sessions are loaded (SESSION_CACHE_SIZE)
+    - it has been idle for idle_ttl seconds (SESSION_IDLE_TTL_SECONDS)
+    - its user's loaded sessions exceed user_max_bytes (SESSION_USER_MEMORY_MB)
+    - all loaded sessions exceed max_bytes (SESSION_MEMORY_MB)
+    Sizes are approximate (serialized JSON); 0 disables a limit. The session
+    being accessed is never evicted. Every change is already persisted, so
+    eviction never loses data: the store is told to spill the session
+    (SessionStore.evict, e.g. fold its journal into a snapshot) and it is
+    reloaded on next access. Without a store nothing is evicted.
     """
     
-    def __init__(self, storage_path: str = "sessions"):
+    def __init__(self,
+                 storage_path: str = "sessions",
+                 store: Optional[SessionStore] = None,
+                 max_loaded: Optional[int] = None,
+                 idle_ttl: Optional[float] = None,
+                 max_bytes: Optional[int] = None,
+                 user_max_bytes: Optional[int] = None):
+        if idle_ttl is None:
+            idle_ttl = float(os.getenv('SESSION_IDLE_TTL_SECONDS', '1800'))
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv('SESSION_MEMORY_MB', '256')) * MB)
+        if user_max_bytes is None:
+            user_max_bytes = int(float(os.getenv('SESSION_USER_MEMORY_MB', '64')) * MB)
+        
         self.storage_path = storage_path
         self.current_session = None
-        self.sessions = {}
+        self.sessions = OrderedDict()
+        self.max_loaded = max_loaded or int(os.getenv('SESSION_CACHE_SIZE', '64'))
+        self.idle_ttl = idle_ttl
+        self.max_bytes = max_bytes
+        self.user_max_bytes = user_max_bytes
+        self.store = store
+        self._compactors = {}
+        # Per loaded session: approximate size and last access (monotonic)
+        self._sizes = {}
+        self._accessed = {}
+        self._user_bytes = Counter()
+        self.loaded_bytes = 0
+        self.evictions = Counter()
+        self._lock = threading.Lock()
         
         try:
-            # Create storage directory if it doesn't exist
-            os.makedirs(storage_path, exist_ok=True)
-            # Load existing sessions
-            self._load_sessions()
+            if self.store is None:
+                self.store = session_store_from_env(storage_path)
         except Exception as e:
             # If file operations fail, continue with in-memory only
             print(f"Warning: Could not access session storage: {e}")
@@ -40,100 +109,298 @@ class SessionService:
             'context': []
         }
         
-        self.sessions[session_id] = session
+        self._cache(session)
         self.current_session = session_id
-        self._save_session(session_id)
+        if self.store is not None:
+            self.store.create(session)
         
         return session_id
     
     def get_session(self, session_id: str) -> Optional[Dict]:
         """Get session by ID"""
-        return self.sessions.get(session_id)
+        return self._get(session_id)
     
     def update_session_state(self, session_id: str, key: str, value: any):
         """Update session state"""
-        if session_id in self.sessions:
-            self.sessions[session_id]['state'][key] = value
-            self._save_session(session_id)
+        self._apply(session_id, {'op': 'state', 'key': key, 'value': value})
     
     def add_to_history(self, session_id: str, research_data: Dict):
         """Add research to session history"""
-        if session_id in self.sessions:
-            self.sessions[session_id]['research_history'].append(research_data)
-            self._save_session(session_id)
+        self._apply(session_id, {'op': 'history', 'item': research_data})
     
     def get_session_history(self, session_id: str) -> List[Dict]:
         """Get research history for a session"""
-        session = self.sessions.get(session_id)
+        session = self._get(session_id)
         return session['research_history'] if session else []
     
+    def get_history_entry(self, session_id: str, topic: str, timestamp: str) -> Optional[Dict]:
+        """The research of a session with this topic and timestamp (newest first), or None"""
+        for research in reversed(self.get_session_history(session_id)):
+            if research.get('timestamp') == timestamp and research.get('topic') == topic:
+                return research
+        return None
+    
     def add_context(self, session_id: str, context_item: str):
         """Add context to session for context engineering"""
-        if session_id in self.sessions:
-            self.sessions[session_id]['context'].append({
+        # Storage keeps the last MAX_CONTEXT_ITEMS items; the session's
+        # compactor (if built) folds the new item into its summary
+        self._apply(session_id, {
+            'op': 'context',
+            'item': {
                 'content': context_item,
                 'timestamp': datetime.now().isoformat()
-            })
-            
-            # Context compaction: Keep only last 10 items
-            if len(self.sessions[session_id]['context']) > 10:
-                self.sessions[session_id]['context'] = \
-                    self.sessions[session_id]['context'][-10:]
-            
-            self._save_session(session_id)
+            },
+            'keep': MAX_CONTEXT_ITEMS
+        })
+        with self._lock:
+            compactor = self._compactors.get(session_id)
+        if compactor is not None:
+            compactor.add(context_item)
     
     def get_session_context(self, session_id: str) -> List[Dict]:
-        """Get compressed context for session"""
-        session = self.sessions.get(session_id)
+        """Get the stored context items of a session"""
+        session = self._get(session_id)
         return session['context'] if session else []
     
+    def get_compact_context(self, session_id: str, query: str = "", max_tokens: Optional[int] = None) -> str:
+        """
+        Session context compacted to max_tokens (CONTEXT_MAX_TOKENS): recent
+        items and a summary of older ones, most relevant to query first
+        (see ContextCompactor)
+        """
+        if max_tokens is None:
+            max_tokens = int(os.getenv('CONTEXT_MAX_TOKENS', '500'))
+        session = self._get(session_id)
+        if session is None:
+            return ""
+        with self._lock:
+            compactor = self._compactors.get(session_id)
+            if compactor is None:
+                # Built once per loaded session, then updated by add_context
+                compactor = self._compactors[session_id] = ContextCompactor()
+                compactor.extend([item['content'] for item in session['context']])
+        return compactor.build(query, max_tokens)
+    
+    def list_sessions(self, user_id: Optional[str] = None) -> List[Dict]:
+        """Stored sessions' metadata (id, user_id, created_at), newest first, without loading them"""
+        if self.store is not None:
+            return self.store.list_sessions(user_id)
+        
+        entries = [{'id': sid, 'user_id': s['user_id'], 'created_at': s['created_at']}
+                   for sid, s in self.sessions.items() if user_id is None or s['user_id'] == user_id]
+        entries.sort(key=lambda entry: entry['created_at'], reverse=True)
+        return entries
+    
     def _generate_session_id(self) -> str:
         """Generate unique session ID"""
         timestamp = datetime.now().isoformat()
         hash_input = f"{timestamp}_{os.urandom(8).hex()}"
         return hashlib.md5(hash_input.encode()).hexdigest()[:16]
     
-    def _save_session(self, session_id: str):
-        """Save session to disk"""
-        try:
+    def memory_stats(self) -> Dict:
+        """Loaded sessions, their approximate size against the quota, and evictions by reason"""
+        with self._lock:
+            return {
+                'sessions_loaded': len(self.sessions),
+                'bytes': self.loaded_bytes,
+                'max_bytes': self.max_bytes,
+                'pressure': self.loaded_bytes / self.max_bytes if self.max_bytes else 0.0,
+                'evictions': dict(self.evictions)
+            }
+    
+    def _apply(self, session_id: str, entry: Dict):
+        """
+        Apply a mutation to the in-memory session and persist just that change.
+        
+        Runs under the service lock, so mutations from other threads (e.g. a
+        background research refresh) are applied and journaled in one order,
+        and only to the session that is loaded: if another thread evicted it
+        since the lookup, it is looked up (reloaded) again.
+        """
+        delta = _size(entry.get('item', entry.get('value')))
+        evicted = []
+        while True:
+            session = self._get(session_id)
+            if session is None:
+                return
+            with self._lock:
+                if self.sessions.get(session_id) is not session:
+                    # Evicted since the lookup: apply to the reloaded copy instead
+                    continue
+                if entry['op'] == 'context' and entry.get('keep'):
+                    overflow = len(session['context']) + 1 - entry['keep']
+                    delta -= sum(_size(item) for item in session['context'][:max(0, overflow)])
+                
+                apply_op(session, entry)
+                if self.store is not None:
+                    # Store errors are logged there; the in-memory session still works
+                    self.store.append(session, entry)
+                
+                self._account(session, delta)
+                evicted = self._evict(session_id)
+            break
+        self._spill(evicted)
+    
+    def _get(self, session_id: str) -> Optional[Dict]:
+        """Session from the LRU, loading it from storage on a miss"""
+        evicted = []
+        with self._lock:
             session = self.sessions.get(session_id)
-            if session:
-                # Ensure directory exists
-                os.makedirs(self.storage_path, exist_ok=True)
-                filepath = os.path.join(self.storage_path, f"{session_id}.json")
-                with open(filepath, 'w') as f:
-                    json.dump(session, f, indent=2)
-        except Exception as e:
-            # Log error but continue (in-memory session still works)
-            print(f"Warning: Could not save session file: {e}")
+            if session is not None:
+                self.sessions.move_to_end(session_id)
+                self._accessed[session_id] = time.monotonic()
+                evicted = self._evict(session_id)
+        if session is not None:
+            self._spill(evicted)
+            return session
+        
+        if self.store is None:
+            return None
+        session = self.store.load(session_id)
+        return self._cache(session) if session is not None else None
+    
+    def _cache(self, session: Dict) -> Dict:
+        """Add a session to the LRU (keeping a copy loaded concurrently), evicting as needed"""
+        size = _size(session)
+        with self._lock:
+            session_id = session['id']
+            if session_id not in self.sessions:
+                self.sessions[session_id] = session
+                self._sizes[session_id] = 0
+                self._account(session, size)
+            session = self.sessions[session_id]
+            self.sessions.move_to_end(session_id)
+            self._accessed[session_id] = time.monotonic()
+            evicted = self._evict(session_id)
+        self._spill(evicted)
+        return session
+    
+    def _account(self, session: Dict, delta: int):
+        """Add delta bytes to a loaded session (lock held)"""
+        self._sizes[session['id']] += delta
+        self._user_bytes[session['user_id']] += delta
+        self.loaded_bytes += delta
     
-    def _load_sessions(self):
-        """Load all sessions from disk"""
-        if not os.path.exists(self.storage_path):
-            return
+    def _evict(self, keep: str) -> List[Dict]:
+        """Drop sessions (never keep) until within the limits; returns them for _spill (lock held)"""
+        if self.store is None:
+            # Nothing to reload them from
+            return []
         
-        for filename in os.listdir(self.storage_path):
-            if filename.endswith('.json'):
-                filepath = os.path.join(self.storage_path, filename)
-                try:
-                    with open(filepath, 'r') as f:
-                        session = json.load(f)
-                        self.sessions[session['id']] = session
-                except:
-                    pass
+        evicted = []
+        
+        def drop(session_id: str, reason: str):
+            session = self.sessions.pop(session_id)
+            self._account(session, -self._sizes[session_id])
+            del self._sizes[session_id]
+            if not self._user_bytes[session['user_id']]:
+                del self._user_bytes[session['user_id']]
+            del self._accessed[session_id]
+            self._compactors.pop(session_id, None)
+            self.evictions[reason] += 1
+            evicted.append(session)
+        
+        def oldest(user_id: Optional[str] = None) -> Optional[str]:
+            return next((sid for sid, s in self.sessions.items()
+                         if sid != keep and (user_id is None or s['user_id'] == user_id)), None)
+        
+        # The LRU is in access order, so idle sessions are at its front
+        if self.idle_ttl > 0:
+            expired = time.monotonic() - self.idle_ttl
+            while True:
+                session_id = oldest()
+                if session_id is None or self._accessed[session_id] > expired:
+                    break
+                drop(session_id, 'idle')
+        
+        while len(self.sessions) > self.max_loaded and oldest() is not None:
+            drop(oldest(), 'count')
+        
+        # Only the accessed session grew, so only its user can be over quota
+        user_id = self.sessions[keep]['user_id'] if keep in self.sessions else None
+        while self.user_max_bytes and self._user_bytes.get(user_id, 0) > self.user_max_bytes:
+            session_id = oldest(user_id)
+            if session_id is None:
+                break
+            drop(session_id, 'user_quota')
+        
+        while self.max_bytes and self.loaded_bytes > self.max_bytes and oldest() is not None:
+            drop(oldest(), 'memory_quota')
+        return evicted
+    
+    def _spill(self, evicted: List[Dict]):
+        """Let the store persist what it keeps only in memory for evicted sessions"""
+        for session in evicted:
+            self.store.evict(session)
+
+
+# Live MemoryBanks, flushed at exit. Weak, so a dropped bank (and its
+# embedding index) can be freed; a pending flush timer keeps one alive.
+_MEMORY_BANKS = weakref.WeakSet()
+
+
+def _flush_memory_banks():
+    for bank in list(_MEMORY_BANKS):
+        bank.flush()
+
+
+atexit.register(_flush_memory_banks)
 
 
 class MemoryBank:
     """
     Long-term memory storage for research insights and patterns
+    
+    Memories live in a MemoryStore: one JSON file per memory by default, or
+    SQLite with STORAGE_BACKEND=sqlite.
+    
+    store_memory() writes through. The access_count increments of
+    retrieve_memory() are buffered instead: memories are marked dirty and
+    their counters written in one batch once flush_every memories are
+    dirty (MEMORY_FLUSH_EVERY, by the retrieval that dirties the last one),
+    flush_interval seconds after the first increment
+    (MEMORY_FLUSH_INTERVAL_MS, by a timer thread), on flush()/close() and
+    at exit. A crash can therefore lose at most the increments of the
+    last flush_interval seconds (of fewer than flush_every memories) -
+    never memory content.
+    Reads through the bank see buffered counts; search and popularity
+    ordering (indexed by both stores) use the last flushed counts.
+    
+    Memories are keyed by their exact topic. When a topic has no memory,
+    retrieve_memory() falls back to the most similar stored topic with a
+    similarity of at least similarity_threshold (MEMORY_SIMILARITY_THRESHOLD,
+    0 disables) and the same numbers, using local character n-gram
+    embeddings indexed on first use (see utils/embeddings.py), so "chat gpt"
+    finds "ChatGPT" but "python 2" never finds "python 3".
     """
     
-    def __init__(self, storage_path: str = "memory_bank"):
-        self.storage_path = storage_path
-        self.memories = {}
+    def __init__(self,
+                 storage_path: str = "memory_bank",
+                 store: Optional[MemoryStore] = None,
+                 flush_every: Optional[int] = None,
+                 flush_interval: Optional[float] = None,
+                 similarity_threshold: Optional[float] = None):
+        if similarity_threshold is None:
+            similarity_threshold = float(os.getenv('MEMORY_SIMILARITY_THRESHOLD', '0.9'))
+        if flush_every is None:
+            flush_every = int(os.getenv('MEMORY_FLUSH_EVERY', '32'))
+        if flush_interval is None:
+            flush_interval = float(os.getenv('MEMORY_FLUSH_INTERVAL_MS', '5000')) / 1000
         
-        os.makedirs(storage_path, exist_ok=True)
-        self._load_memories()
+        self.storage_path = storage_path
+        self.store = store or memory_store_from_env(storage_path)
+        self.flush_every = max(1, flush_every)
+        self.flush_interval = flush_interval
+        # Memories with unsaved access_count increments, and those being written, by id
+        self._dirty = {}
+        self._flushing = {}
+        self._timer = None
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self.similarity_threshold = similarity_threshold
+        # Topic embeddings by memory id, built on first similarity lookup
+        self._similar = None
+        _MEMORY_BANKS.add(self)
     
     def store_memory(self, topic: str, insights: Dict, metadata: Dict = None):
         """Store long-term memory of research insights"""
@@ -148,97 +415,148 @@ class MemoryBank:
             'access_count': 0
         }
         
-        # Update existing or create new
-        if memory_id in self.memories:
-            memory['access_count'] = self.memories[memory_id]['access_count'] + 1
-        
-        self.memories[memory_id] = memory
-        self._save_memory(memory_id)
+        # After any in-flight flush, so it can't overwrite this write with the old memory
+        with self._flush_lock, self._lock:
+            # Update existing or create new; this write includes any buffered count
+            existing = self._dirty.pop(memory_id, None) or self._get(memory_id)
+            if existing:
+                memory['access_count'] = existing['access_count'] + 1
+            
+            self.store.save(memory)
+            if self._similar is not None:
+                self._similar.add(memory_id, embed(topic))
     
     def retrieve_memory(self, topic: str) -> Optional[Dict]:
         """Retrieve memory by topic"""
         memory_id = hashlib.md5(topic.encode()).hexdigest()[:16]
         
-        if memory_id in self.memories:
-            self.memories[memory_id]['access_count'] += 1
-            self._save_memory(memory_id)
-            return self.memories[memory_id]
+        with self._lock:
+            memory = self._dirty.get(memory_id) or self._get(memory_id)
+            if memory is None and self.similarity_threshold > 0:
+                nearest = self._similar_memories(topic, 1, self.similarity_threshold)
+                if nearest:
+                    memory = nearest[0][0]
+            if memory is None:
+                return None
+            memory['access_count'] += 1
+            flush_due = self._mark_dirty(memory)
         
-        return None
+        if flush_due:
+            self.flush()
+        return memory
+    
+    def find_similar(self, topic: str, limit: int = 5, min_similarity: Optional[float] = None) -> List[Dict]:
+        """Memories with topics similar to topic, most similar first, each with its 'similarity'"""
+        if min_similarity is None:
+            min_similarity = self.similarity_threshold
+        with self._lock:
+            found = self._similar_memories(topic, limit, min_similarity)
+        return [dict(memory, similarity=round(score, 3)) for memory, score in found]
     
     def search_memories(self, query: str, limit: int = 5) -> List[Dict]:
-        """Search memories by query string"""
-        results = []
-        query_lower = query.lower()
-        
-        for memory in self.memories.values():
-            topic_lower = memory['topic'].lower()
-            if query_lower in topic_lower:
-                results.append(memory)
-        
-        # Sort by access count and recency
-        results.sort(key=lambda x: (x['access_count'], x['timestamp']), reverse=True)
-        
-        return results[:limit]
+        """Search memories by query string (sorted by access count and recency)"""
+        return self._with_buffered_counts(self.store.search(query, limit))
     
     def get_recent_memories(self, limit: int = 10) -> List[Dict]:
         """Get most recent memories"""
-        sorted_memories = sorted(
-            self.memories.values(),
-            key=lambda x: x['timestamp'],
-            reverse=True
-        )
-        return sorted_memories[:limit]
+        return self._with_buffered_counts(self.store.recent(limit))
     
     def get_popular_topics(self, limit: int = 5) -> List[Dict]:
         """Get most accessed topics"""
-        sorted_memories = sorted(
-            self.memories.values(),
-            key=lambda x: x['access_count'],
-            reverse=True
-        )
-        return sorted_memories[:limit]
-    
-    def _save_memory(self, memory_id: str):
-        """Save memory to disk"""
-        memory = self.memories.get(memory_id)
-        if memory:
-            filepath = os.path.join(self.storage_path, f"{memory_id}.json")
-            with open(filepath, 'w') as f:
-                json.dump(memory, f, indent=2)
-    
-    def _load_memories(self):
-        """Load all memories from disk"""
-        if not os.path.exists(self.storage_path):
-            return
-        
-        for filename in os.listdir(self.storage_path):
-            if filename.endswith('.json'):
-                filepath = os.path.join(self.storage_path, filename)
-                try:
-                    with open(filepath, 'r') as f:
-                        memory = json.load(f)
-                        self.memories[memory['id']] = memory
-                except:
-                    pass
-
-
-def compact_context(context_list: List[str], max_length: int = 1000) -> str:
+        return self._with_buffered_counts(self.store.popular(limit))
+    
+    def flush(self):
+        """Write buffered access counts"""
+        with self._flush_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._dirty:
+                    return
+                self._flushing, self._dirty = self._dirty, {}
+            
+            try:
+                # Outside the lock, so retrievals don't wait for the disk
+                self.store.save_access_counts(list(self._flushing.values()))
+            except Exception as e:
+                print(f"Warning: Could not save memory access counts: {e}")
+                with self._lock:
+                    # Keep them buffered for the next flush
+                    for memory_id, memory in self._flushing.items():
+                        self._dirty.setdefault(memory_id, memory)
+            with self._lock:
+                self._flushing = {}
+    
+    def close(self):
+        """Flush buffered counts and the store"""
+        self.flush()
+        self.store.close()
+    
+    def _similarity_index(self) -> VectorIndex:
+        """The topic embedding index, built from the store on first use (lock held)"""
+        if self._similar is None:
+            index = index_from_env()
+            for memory in self.store.all():
+                index.add(memory['id'], embed(memory['topic']))
+            self._similar = index
+        return self._similar
+    
+    def _similar_memories(self, topic: str, limit: int, min_similarity: float) -> List[tuple]:
+        """Up to limit (memory, similarity) pairs with the same numbers as topic (lock held)"""
+        wanted = numbers(topic)
+        found = []
+        for memory_id, score in self._similarity_index().search(
+                embed(topic), limit + SIMILAR_CANDIDATES, min_similarity):
+            memory = self._dirty.get(memory_id) or self._get(memory_id)
+            if memory and numbers(memory['topic']) == wanted:
+                found.append((memory, score))
+                if len(found) >= limit:
+                    break
+        return found
+    
+    def _get(self, memory_id: str) -> Optional[Dict]:
+        """A memory, preferring the copy being flushed over the stored one (lock held)"""
+        return self._flushing.get(memory_id) or self.store.get(memory_id)
+    
+    def _mark_dirty(self, memory: Dict) -> bool:
+        """Buffer a memory's new access_count; True when a flush is due (lock held)"""
+        self._dirty[memory['id']] = memory
+        if len(self._dirty) >= self.flush_every:
+            return True
+        if self._timer is None and self.flush_interval > 0:
+            self._timer = threading.Timer(self.flush_interval, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+        return False
+    
+    def _with_buffered_counts(self, memories: List[Dict]) -> List[Dict]:
+        if not self._dirty:
+            return memories
+        with self._lock:
+            return [self._dirty.get(memory['id']) or self._flushing.get(memory['id'], memory)
+                    for memory in memories]
+
+
+def compact_context(context_list: List[str], max_length: int = 1000, max_tokens: Optional[int] = None,
+                    query: str = "") -> str:
     """
     Context compaction: Reduce context size while maintaining key information
+    
+    Context that does not fit in max_tokens (or max_length characters) is
+    compacted by a ContextCompactor: the latest items and the summary
+    sentences most relevant to query are kept, in their original order.
     """
     if not context_list:
         return ""
     
     # Join all context
     full_context = " ".join(context_list)
+    if max_tokens is None:
+        if len(full_context) <= max_length:
+            return full_context
+        max_tokens = max_length // CHARS_PER_TOKEN
     
-    # If within limit, return as-is
-    if len(full_context) <= max_length:
-        return full_context
-    
-    # Simple compaction: Take first and last portions
-    half = max_length // 2
-    compacted = full_context[:half] + " ... " + full_context[-half:]
-    
-    return compacted
+    compactor = ContextCompactor()
+    compactor.extend(context_list)
+    return compactor.build(query, max_tokens)
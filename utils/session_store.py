@@ -0,0 +1,397 @@
+"""
+Session Storage
+Storage backends for SessionService: sessions are persisted as a snapshot
+plus an append-only journal of mutations, so each change costs O(change)
+instead of rewriting the whole session
+"""
+
+import json
+import os
+import threading
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from utils.serializer import Serializer, get_serializer, load, to_json
+from utils.blob_store import BlobStore, FileBlobStore, blobs_enabled, pack_history, unpack_history
+
+# Snapshot key holding the last journal sequence number it includes
+SEQ_KEY = '_journal_seq'
+
+INDEX_FILE = 'index.jsonl'
+
+# Session fields kept in the index
+INDEX_FIELDS = ('user_id', 'created_at')
+
+FSYNC_MODES = ('always', 'snapshot', 'never')
+
+
+def apply_op(session: Dict, entry: Dict):
+    """
+    Apply one journal entry to a session dict in place
+
+    Entries are {"op": "state", "key", "value"}, {"op": "history", "item"}
+    or {"op": "context", "item", "keep"}. SessionService applies every
+    mutation through here, so live sessions and replayed journals agree.
+    """
+    op = entry['op']
+    if op == 'state':
+        session['state'][entry['key']] = entry['value']
+    elif op == 'history':
+        session['research_history'].append(entry['item'])
+    elif op == 'context':
+        session['context'].append(entry['item'])
+        keep = entry.get('keep')
+        if keep and len(session['context']) > keep:
+            session['context'] = session['context'][-keep:]
+    else:
+        raise ValueError(f"Unknown session journal op: {op}")
+
+
+class SessionStore:
+    """
+    Storage interface for SessionService.
+
+    create() persists a new session, append() persists one mutation that
+    has already been applied (with apply_op) to the in-memory session.
+    Sessions are read one at a time with load(); index() lists them
+    without reading their bodies.
+    """
+
+    def load(self, session_id: str) -> Optional[Dict]:
+        """One stored session, or None"""
+        raise NotImplementedError
+
+    def index(self) -> Dict[str, Dict]:
+        """Metadata (user_id, created_at) of every stored session, by id"""
+        raise NotImplementedError
+
+    def list_sessions(self, user_id: Optional[str] = None) -> List[Dict]:
+        """Index entries (optionally of one user), newest first"""
+        entries = [entry for entry in self.index().values()
+                   if user_id is None or entry.get('user_id') == user_id]
+        entries.sort(key=lambda entry: entry.get('created_at') or '', reverse=True)
+        return entries
+
+    def load_all(self) -> Dict[str, Dict]:
+        """Every stored session, by id"""
+        sessions = {}
+        for session_id in self.index():
+            session = self.load(session_id)
+            if session:
+                sessions[session_id] = session
+        return sessions
+
+    def create(self, session: Dict):
+        """Persist a new session"""
+        raise NotImplementedError
+
+    def append(self, session: Dict, entry: Dict):
+        """Persist one mutation of an existing session"""
+        raise NotImplementedError
+
+    def evict(self, session: Dict):
+        """
+        The session was dropped from memory (it is reloaded with load());
+        release anything kept for it. Every change is already persisted.
+        """
+
+    def close(self):
+        """Flush and release resources"""
+
+
+class JournalSessionStore(SessionStore):
+    """
+    One snapshot file ({id}.json) plus one append-only JSONL journal
+    ({id}.journal) per session.
+
+    - Each mutation appends one journal line; after snapshot_every lines the
+      session is compacted: a new snapshot is written to a temp file,
+      fsynced and atomically renamed over the old one, then the journal is
+      truncated.
+    - Journal entries carry a per-session sequence number and snapshots
+      record the last one they include, so a crash between the snapshot
+      rename and the journal truncation never replays an entry twice.
+    - A torn final line (crash mid-append, or an append still in progress)
+      is skipped on load; only the next append() cuts it off the file.
+    - fsync: 'always' syncs every append (no acknowledged change is lost on
+      power failure), 'snapshot' (default) only syncs snapshots (a crash may
+      lose recent appends, never a consistent snapshot), 'never' leaves it
+      to the OS.
+
+    Existing {id}.json files written by earlier versions load as snapshots.
+
+    The large fields of research history entries are kept in a
+    content-addressed blob store (blobs/ by default, see
+    SESSION_BLOB_MIN_BYTES); snapshots and the journal hold references.
+
+    index.jsonl holds one line per session (id, snapshot and journal file,
+    user_id, created_at) so sessions can be listed without reading them; it
+    is rebuilt from the snapshots if missing.
+    """
+
+    def __init__(self,
+                 storage_path: str = "sessions",
+                 snapshot_every: Optional[int] = None,
+                 fsync: Optional[str] = None,
+                 blobs: Optional[BlobStore] = None,
+                 serializer: Optional[Serializer] = None):
+        if snapshot_every is None:
+            snapshot_every = int(os.getenv('SESSION_SNAPSHOT_EVERY', '64'))
+        if fsync is None:
+            fsync = os.getenv('SESSION_FSYNC', 'snapshot')
+        if fsync not in FSYNC_MODES:
+            raise ValueError(f"fsync must be one of {FSYNC_MODES}")
+
+        self.storage_path = storage_path
+        self.snapshot_every = max(1, snapshot_every)
+        self.fsync = fsync
+        if blobs is None and blobs_enabled():
+            blobs = FileBlobStore(os.path.join(storage_path, 'blobs'), fsync=fsync != 'never')
+        self.blobs = blobs
+        self.serializer = serializer or get_serializer()
+        # Per-session last journal sequence number and entries since the last snapshot
+        self._seq = {}
+        self._pending = {}
+        # Per-session length of the valid journal prefix, when load() saw a torn tail
+        self._torn = {}
+        self._index = None
+        self._lock = threading.RLock()
+
+        os.makedirs(storage_path, exist_ok=True)
+
+    def _snapshot_path(self, session_id: str) -> str:
+        return os.path.join(self.storage_path, f"{session_id}.json")
+
+    def _journal_path(self, session_id: str) -> str:
+        return os.path.join(self.storage_path, f"{session_id}.journal")
+
+    def index(self) -> Dict[str, Dict]:
+        """Session metadata from index.jsonl (read once, then kept up to date)"""
+        with self._lock:
+            if self._index is None:
+                self._index = self._read_index()
+            return self._index
+
+    def load(self, session_id: str) -> Optional[Dict]:
+        """Load one session: its snapshot plus any newer journal entries"""
+        try:
+            session = load(self._snapshot_path(session_id))
+        except (OSError, ValueError, zlib.error):
+            return None
+
+        seq = session.pop(SEQ_KEY, 0)
+        pending = 0
+        entries, torn_at = self._read_journal(session_id)
+        for entry in entries:
+            if entry['seq'] <= seq:
+                continue
+            apply_op(session, entry)
+            seq = entry['seq']
+            pending += 1
+        unpack_history(self.blobs, session)
+
+        with self._lock:
+            self._seq[session_id] = seq
+            self._pending[session_id] = pending
+            if torn_at is None:
+                self._torn.pop(session_id, None)
+            else:
+                self._torn[session_id] = torn_at
+        return session
+
+    def create(self, session: Dict):
+        """Write the initial snapshot of a new session"""
+        with self._lock:
+            self._seq[session['id']] = 0
+            self._pending[session['id']] = 0
+            if self._write_snapshot(session, 0):
+                self._index_session(session)
+
+    def append(self, session: Dict, entry: Dict):
+        """Append one mutation to the session's journal, compacting when due"""
+        session_id = session['id']
+        with self._lock:
+            self._repair_journal(session_id)
+            seq = self._seq.get(session_id, 0) + 1
+            try:
+                if entry['op'] == 'history' and self.blobs is not None:
+                    entry = dict(entry, item=self.blobs.pack(entry['item']))
+                line = to_json(dict(entry, seq=seq)) + b'\n'
+                with open(self._journal_path(session_id), 'ab') as f:
+                    f.write(line)
+                    if self.fsync == 'always':
+                        f.flush()
+                        os.fsync(f.fileno())
+            except (OSError, TypeError, ValueError) as e:
+                print(f"Warning: Could not append to session journal: {e}")
+                return
+
+            self._seq[session_id] = seq
+            self._pending[session_id] = self._pending.get(session_id, 0) + 1
+            if self._pending[session_id] >= self.snapshot_every:
+                self.compact(session)
+
+    def evict(self, session: Dict):
+        """Release the blob store's memory of the session's history entries"""
+        if self.blobs is not None:
+            self.blobs.forget(session.get('research_history', []))
+
+    def compact(self, session: Dict):
+        """Fold the journal into a new snapshot and truncate it"""
+        session_id = session['id']
+        with self._lock:
+            if not self._write_snapshot(session, self._seq.get(session_id, 0)):
+                return
+
+            try:
+                # Entries up to seq are in the snapshot; a crash before this
+                # truncation is harmless because replay skips them
+                with open(self._journal_path(session_id), 'w'):
+                    pass
+                self._pending[session_id] = 0
+                self._torn.pop(session_id, None)
+            except OSError as e:
+                print(f"Warning: Could not truncate session journal: {e}")
+
+    def _write_snapshot(self, session: Dict, seq: int) -> bool:
+        """Atomically replace the session's snapshot"""
+        path = self._snapshot_path(session['id'])
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(self.serializer.dumps(dict(pack_history(self.blobs, session), **{SEQ_KEY: seq})))
+                if self.fsync != 'never':
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+            return True
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Warning: Could not save session snapshot: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return False
+
+    def _index_entry(self, session: Dict) -> Dict:
+        session_id = session['id']
+        entry = {
+            'id': session_id,
+            'file': os.path.basename(self._snapshot_path(session_id)),
+            'journal': os.path.basename(self._journal_path(session_id))
+        }
+        entry.update((field, session.get(field)) for field in INDEX_FIELDS)
+        return entry
+
+    def _index_session(self, session: Dict):
+        """Append a new session to the index (lock held)"""
+        entry = self._index_entry(session)
+        path = os.path.join(self.storage_path, INDEX_FILE)
+        if self._index is None and not os.path.exists(path):
+            # No index yet: the rebuild on first index() picks this session up
+            return
+        try:
+            with open(path, 'a') as f:
+                f.write(json.dumps(entry, separators=(',', ':')) + '\n')
+        except OSError as e:
+            print(f"Warning: Could not update session index: {e}")
+        if self._index is not None:
+            self._index[session['id']] = entry
+
+    def _read_index(self) -> Dict[str, Dict]:
+        """Parse index.jsonl, rebuilding it from the snapshots if it is missing"""
+        path = os.path.join(self.storage_path, INDEX_FILE)
+        index = {}
+        try:
+            with open(path, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    index[entry['id']] = entry
+            return index
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Warning: Could not read session index: {e}")
+            return index
+
+        for filename in sorted(os.listdir(self.storage_path)):
+            if not filename.endswith('.json'):
+                continue
+            try:
+                session = load(os.path.join(self.storage_path, filename))
+                index[session['id']] = self._index_entry(session)
+            except (OSError, ValueError, KeyError, TypeError, zlib.error):
+                continue
+
+        try:
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w') as f:
+                for entry in index.values():
+                    f.write(json.dumps(entry, separators=(',', ':')) + '\n')
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Warning: Could not write session index: {e}")
+        return index
+
+    def _read_journal(self, session_id: str) -> Tuple[List[Dict], Optional[int]]:
+        """
+        Journal entries in order, and the byte length of the valid prefix if
+        a torn final line was skipped (None otherwise). The file itself is
+        left alone: the line may be an append still in progress.
+        """
+        path = self._journal_path(session_id)
+        entries = []
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return entries, None
+
+        offset = 0
+        for raw in data.splitlines(keepends=True):
+            try:
+                if not raw.endswith(b'\n'):
+                    raise ValueError("incomplete line")
+                entries.append(json.loads(raw))
+            except ValueError:
+                return entries, offset
+            offset += len(raw)
+        return entries, None
+
+    def _repair_journal(self, session_id: str):
+        """Cut a torn tail seen by load() off the journal before appending (lock held)"""
+        offset = self._torn.pop(session_id, None)
+        if offset is None:
+            return
+        path = self._journal_path(session_id)
+        try:
+            with open(path, 'r+b') as f:
+                f.seek(offset)
+                if self._is_torn(f.read()):
+                    print(f"Warning: Dropping torn session journal tail in {path}")
+                    f.truncate(offset)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _is_torn(tail: bytes) -> bool:
+        """Whether journal bytes end in an incomplete or unreadable line"""
+        for raw in tail.splitlines(keepends=True):
+            if not raw.endswith(b'\n'):
+                return True
+            try:
+                json.loads(raw)
+            except ValueError:
+                return True
+        return False
+
+
+def session_store_from_env(storage_path: str = "sessions") -> SessionStore:
+    """The SessionStore selected by STORAGE_BACKEND (json or sqlite)"""
+    if os.getenv('STORAGE_BACKEND', 'json').lower() == 'sqlite':
+        from utils.sqlite_store import SqliteSessionStore
+        return SqliteSessionStore()
+    return JournalSessionStore(storage_path)
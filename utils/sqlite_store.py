@@ -0,0 +1,476 @@
+"""
+SQLite Storage
+SessionService and MemoryBank storage in one SQLite database (WAL mode),
+selected with STORAGE_BACKEND=sqlite
+"""
+
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from utils.blob_store import BlobStore, blobs_enabled
+from utils.memory_store import MemoryStore
+from utils.session_store import SessionStore
+
+# Session keys with their own columns or tables; anything else goes in `extra`
+_SESSION_COLUMNS = ('id', 'user_id', 'created_at', 'state', 'research_history', 'context')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_user ON sessions(user_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_sessions_created ON sessions(created_at);
+
+CREATE TABLE IF NOT EXISTS session_state (
+    session_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT,
+    PRIMARY KEY (session_id, key)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS session_history (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    timestamp TEXT,
+    item TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_history_session ON session_history(session_id, id);
+CREATE INDEX IF NOT EXISTS idx_history_timestamp ON session_history(timestamp);
+
+CREATE TABLE IF NOT EXISTS session_context (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    item TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_context_session ON session_context(session_id, id);
+
+CREATE TABLE IF NOT EXISTS blobs (
+    key TEXT PRIMARY KEY,
+    data BLOB NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS memories (
+    id TEXT PRIMARY KEY,
+    topic TEXT NOT NULL,
+    topic_lower TEXT NOT NULL,
+    timestamp TEXT,
+    access_count INTEGER NOT NULL DEFAULT 0,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_memories_topic ON memories(topic_lower);
+CREATE INDEX IF NOT EXISTS idx_memories_timestamp ON memories(timestamp);
+CREATE INDEX IF NOT EXISTS idx_memories_access ON memories(access_count, timestamp);
+"""
+
+# Trigram full-text index over memory topics for substring search (needs
+# SQLite 3.34+ with FTS5), kept in sync with `memories` by triggers
+MEMORY_SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts USING fts5(
+    topic_lower, content='memories', content_rowid='rowid', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS memories_fts_insert AFTER INSERT ON memories BEGIN
+    INSERT INTO memories_fts(rowid, topic_lower) VALUES (new.rowid, new.topic_lower);
+END;
+CREATE TRIGGER IF NOT EXISTS memories_fts_delete AFTER DELETE ON memories BEGIN
+    INSERT INTO memories_fts(memories_fts, rowid, topic_lower) VALUES ('delete', old.rowid, old.topic_lower);
+END;
+CREATE TRIGGER IF NOT EXISTS memories_fts_update AFTER UPDATE OF topic_lower ON memories BEGIN
+    INSERT INTO memories_fts(memories_fts, rowid, topic_lower) VALUES ('delete', old.rowid, old.topic_lower);
+    INSERT INTO memories_fts(rowid, topic_lower) VALUES (new.rowid, new.topic_lower);
+END;
+"""
+
+# Shortest search query the trigram index can answer
+MIN_INDEXED_QUERY = 3
+
+# Above this many index matches a query is common enough that walking the
+# popularity index finds `limit` matching topics sooner than sorting every match
+DENSE_MATCHES = 128
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, separators=(',', ':'))
+
+
+class SqliteDatabase:
+    """
+    One shared connection per database file, in WAL mode so readers in
+    other processes never block on the writer.
+
+    Writes are grouped into transactions: a transaction is committed once
+    batch_size writes are pending or commit_interval seconds after its
+    first write (by a timer), and at exit. A crash can therefore lose at
+    most the last commit_interval seconds / batch_size writes; use
+    batch_size=1 for per-write durability. Reads on the connection see
+    pending writes.
+    """
+
+    def __init__(self, path: str, batch_size: Optional[int] = None, commit_interval: Optional[float] = None):
+        if batch_size is None:
+            batch_size = int(os.getenv('STORAGE_BATCH_SIZE', '32'))
+        if commit_interval is None:
+            commit_interval = float(os.getenv('STORAGE_COMMIT_INTERVAL_MS', '200')) / 1000
+
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.commit_interval = commit_interval
+        self._lock = threading.RLock()
+        self._pending = 0
+        self._timer = None
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA busy_timeout=5000")
+        self.conn.executescript(SCHEMA)
+        self.memory_search_indexed = self._create_memory_search()
+        atexit.register(self.close)
+
+    def _create_memory_search(self) -> bool:
+        """Create (and on first use, fill) the memory topic search index; False if unsupported"""
+        try:
+            exists = self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'memories_fts'").fetchone() is not None
+            self.conn.executescript(MEMORY_SEARCH_SCHEMA)
+            if not exists:
+                # Index memories written before the index existed
+                self.conn.execute("INSERT INTO memories_fts(memories_fts) VALUES ('rebuild')")
+            return True
+        except sqlite3.Error as e:
+            print(f"Warning: No trigram search index (FTS5 unavailable), memory search scans every topic: {e}")
+            return False
+
+    def query(self, sql: str, params: Iterable = ()) -> List[tuple]:
+        """Run a read and fetch every row"""
+        with self._lock:
+            return self.conn.execute(sql, tuple(params)).fetchall()
+
+    def write(self, sql: str, params: Iterable = (), many: bool = False):
+        """Run a write inside the current batch transaction"""
+        with self._lock:
+            if not self.conn.in_transaction:
+                self.conn.execute("BEGIN")
+            if many:
+                self.conn.executemany(sql, params)
+            else:
+                self.conn.execute(sql, tuple(params))
+            self._pending += 1
+
+            if self._pending >= self.batch_size:
+                self._commit()
+            elif self._timer is None and self.commit_interval > 0:
+                self._timer = threading.Timer(self.commit_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Commit pending writes"""
+        with self._lock:
+            self._commit()
+
+    def close(self):
+        """Commit pending writes and close the connection"""
+        with self._lock:
+            if self.conn is None:
+                return
+            self._commit()
+            self.conn.close()
+            self.conn = None
+            _DATABASES.pop(os.path.abspath(self.path), None)
+
+    def _commit(self):
+        """Commit the open transaction, if any (lock held)"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self.conn is not None and self.conn.in_transaction:
+            try:
+                self.conn.execute("COMMIT")
+            except sqlite3.Error as e:
+                print(f"Warning: Could not commit storage writes: {e}")
+        self._pending = 0
+
+
+_DATABASES = {}
+_DATABASES_LOCK = threading.Lock()
+
+
+def get_database(path: Optional[str] = None) -> SqliteDatabase:
+    """The process-wide SqliteDatabase for a path (default STORAGE_DB_PATH)"""
+    path = os.path.abspath(path or os.getenv('STORAGE_DB_PATH', 'omnicare.db'))
+    with _DATABASES_LOCK:
+        database = _DATABASES.get(path)
+        if database is None:
+            database = _DATABASES[path] = SqliteDatabase(path)
+        return database
+
+
+class SqliteBlobStore(BlobStore):
+    """Blobs as rows of the blobs table, written in the session's transaction batch"""
+
+    def __init__(self, database: Optional[SqliteDatabase] = None,
+                 compression: Optional[str] = None, min_size: Optional[int] = None):
+        super().__init__(compression, min_size)
+        self.db = database or get_database()
+
+    def has(self, key: str) -> bool:
+        return bool(self.db.query("SELECT 1 FROM blobs WHERE key = ?", (key,)))
+
+    def _read(self, key: str) -> Optional[bytes]:
+        rows = self.db.query("SELECT data FROM blobs WHERE key = ?", (key,))
+        return rows[0][0] if rows else None
+
+    def _write(self, key: str, blob: bytes) -> bool:
+        try:
+            self.db.write("INSERT OR IGNORE INTO blobs (key, data) VALUES (?, ?)", (key, blob))
+            return True
+        except sqlite3.Error as e:
+            print(f"Warning: Could not save blob {key}: {e}")
+            return False
+
+
+class SqliteSessionStore(SessionStore):
+    """
+    Sessions as rows: state keys, history entries and context items each
+    have their own table, so every mutation is one small INSERT/UPSERT.
+    Large history fields are stored once in the blobs table.
+    """
+
+    def __init__(self, database: Optional[SqliteDatabase] = None, blobs: Optional[BlobStore] = None):
+        self.db = database or get_database()
+        if blobs is None and blobs_enabled():
+            blobs = SqliteBlobStore(self.db)
+        self.blobs = blobs
+
+    def load(self, session_id: str) -> Optional[Dict]:
+        rows = self.db.query("SELECT user_id, created_at, extra FROM sessions WHERE id = ?", (session_id,))
+        if not rows:
+            return None
+        user_id, created_at, extra = rows[0]
+
+        session = json.loads(extra) if extra else {}
+        session.update({
+            'id': session_id,
+            'user_id': user_id,
+            'created_at': created_at,
+            'state': {
+                key: json.loads(value) for key, value in self.db.query(
+                    "SELECT key, value FROM session_state WHERE session_id = ?", (session_id,))
+            },
+            'research_history': [
+                self._unpack(item) for (item,) in self.db.query(
+                    "SELECT item FROM session_history WHERE session_id = ? ORDER BY id", (session_id,))
+            ],
+            'context': [
+                json.loads(item) for (item,) in self.db.query(
+                    "SELECT item FROM session_context WHERE session_id = ? ORDER BY id", (session_id,))
+            ]
+        })
+        return session
+
+    def index(self) -> Dict[str, Dict]:
+        return {
+            session_id: {'id': session_id, 'user_id': user_id, 'created_at': created_at}
+            for session_id, user_id, created_at in self.db.query("SELECT id, user_id, created_at FROM sessions")
+        }
+
+    def list_sessions(self, user_id: Optional[str] = None) -> List[Dict]:
+        if user_id is None:
+            rows = self.db.query("SELECT id, user_id, created_at FROM sessions ORDER BY created_at DESC")
+        else:
+            rows = self.db.query(
+                "SELECT id, user_id, created_at FROM sessions WHERE user_id = ? ORDER BY created_at DESC",
+                (user_id,)
+            )
+        return [{'id': session_id, 'user_id': user, 'created_at': created_at}
+                for session_id, user, created_at in rows]
+
+    def create(self, session: Dict):
+        try:
+            self.import_sessions([session])
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            print(f"Warning: Could not save session: {e}")
+
+    def append(self, session: Dict, entry: Dict):
+        session_id = session['id']
+        op = entry['op']
+        try:
+            if op == 'state':
+                self.db.write(
+                    "INSERT OR REPLACE INTO session_state (session_id, key, value) VALUES (?, ?, ?)",
+                    (session_id, entry['key'], _dumps(entry['value']))
+                )
+            elif op == 'history':
+                item = self._pack(entry['item'])
+                timestamp = item.get('timestamp') if isinstance(item, dict) else None
+                self.db.write(
+                    "INSERT INTO session_history (session_id, timestamp, item) VALUES (?, ?, ?)",
+                    (session_id, timestamp, _dumps(item))
+                )
+            elif op == 'context':
+                self.db.write(
+                    "INSERT INTO session_context (session_id, item) VALUES (?, ?)",
+                    (session_id, _dumps(entry['item']))
+                )
+                if entry.get('keep'):
+                    self.db.write(
+                        "DELETE FROM session_context WHERE session_id = ? AND id NOT IN "
+                        "(SELECT id FROM session_context WHERE session_id = ? ORDER BY id DESC LIMIT ?)",
+                        (session_id, session_id, entry['keep'])
+                    )
+            else:
+                raise ValueError(f"Unknown session journal op: {op}")
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            print(f"Warning: Could not save session change: {e}")
+
+    def import_sessions(self, sessions: Iterable[Dict]):
+        """
+        Write whole sessions (e.g. when migrating) in batched transactions,
+        replacing any stored rows of the same sessions
+        """
+        id_rows, session_rows, state_rows, history_rows, context_rows = [], [], [], [], []
+        for session in sessions:
+            session_id = session['id']
+            id_rows.append((session_id,))
+            extra = {key: value for key, value in session.items() if key not in _SESSION_COLUMNS}
+            session_rows.append((session_id, session.get('user_id', 'default'),
+                                 session.get('created_at', ''), _dumps(extra) if extra else None))
+            state_rows.extend((session_id, key, _dumps(value))
+                              for key, value in session.get('state', {}).items())
+            history_rows.extend(
+                (session_id, item.get('timestamp') if isinstance(item, dict) else None, _dumps(item))
+                for item in map(self._pack, session.get('research_history', []))
+            )
+            context_rows.extend((session_id, _dumps(item)) for item in session.get('context', []))
+
+        # Child rows have no natural key: drop the old ones so a re-import never duplicates them
+        for table in ('session_state', 'session_history', 'session_context'):
+            self.db.write(f"DELETE FROM {table} WHERE session_id = ?", id_rows, many=True)
+        self.db.write("INSERT OR REPLACE INTO sessions (id, user_id, created_at, extra) VALUES (?, ?, ?, ?)",
+                      session_rows, many=True)
+        if state_rows:
+            self.db.write("INSERT OR REPLACE INTO session_state (session_id, key, value) VALUES (?, ?, ?)",
+                          state_rows, many=True)
+        if history_rows:
+            self.db.write("INSERT INTO session_history (session_id, timestamp, item) VALUES (?, ?, ?)",
+                          history_rows, many=True)
+        if context_rows:
+            self.db.write("INSERT INTO session_context (session_id, item) VALUES (?, ?)",
+                          context_rows, many=True)
+
+    def evict(self, session: Dict):
+        if self.blobs is not None:
+            self.blobs.forget(session.get('research_history', []))
+
+    def close(self):
+        self.db.flush()
+
+    def _pack(self, item):
+        return self.blobs.pack(item) if self.blobs is not None else item
+
+    def _unpack(self, item: str):
+        item = json.loads(item)
+        return self.blobs.unpack(item) if self.blobs is not None else item
+
+
+class SqliteMemoryStore(MemoryStore):
+    """
+    Memories as rows with indexed topic, timestamp and access_count, so
+    recent/popular queries read only `limit` rows. search() looks topics up
+    in a trigram FTS5 index (memories_fts). Queries matching more than
+    DENSE_MATCHES topics walk the popularity index instead, which reaches
+    `limit` matches early; queries shorter than a trigram, and SQLite builds
+    without FTS5, scan the topics.
+    """
+
+    def __init__(self, database: Optional[SqliteDatabase] = None):
+        self.db = database or get_database()
+
+    def get(self, memory_id: str) -> Optional[Dict]:
+        rows = self.db.query("SELECT body, access_count FROM memories WHERE id = ?", (memory_id,))
+        return self._memory(rows[0]) if rows else None
+
+    def save(self, memory: Dict):
+        self.save_many([memory])
+
+    def save_many(self, memories: Iterable[Dict]):
+        rows = [
+            (memory['id'], memory['topic'], memory['topic'].lower(), memory.get('timestamp'),
+             memory.get('access_count', 0), _dumps(memory))
+            for memory in memories
+        ]
+        # An upsert keeps the row's rowid, which the search index refers to
+        self.db.write(
+            "INSERT INTO memories (id, topic, topic_lower, timestamp, access_count, body) "
+            "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET topic = excluded.topic, "
+            "topic_lower = excluded.topic_lower, timestamp = excluded.timestamp, "
+            "access_count = excluded.access_count, body = excluded.body",
+            rows, many=True
+        )
+
+    def save_access_counts(self, memories: Iterable[Dict]):
+        # The access_count column overrides the body's copy on read
+        self.db.write(
+            "UPDATE memories SET access_count = ? WHERE id = ?",
+            [(memory.get('access_count', 0), memory['id']) for memory in memories], many=True
+        )
+
+    def search(self, query: str, limit: int) -> List[Dict]:
+        query = query.lower()
+        if self.db.memory_search_indexed and len(query) >= MIN_INDEXED_QUERY:
+            # A quoted trigram phrase matches topics containing the query
+            matches = self.db.query(
+                "SELECT rowid FROM memories_fts WHERE memories_fts MATCH ? LIMIT ?",
+                ('"' + query.replace('"', '""') + '"', DENSE_MATCHES + 1)
+            )
+            if len(matches) <= DENSE_MATCHES:
+                if not matches:
+                    return []
+                rows = self.db.query(
+                    f"SELECT body, access_count FROM memories WHERE rowid IN ({','.join('?' * len(matches))}) "
+                    "AND instr(topic_lower, ?) > 0 ORDER BY access_count DESC, timestamp DESC LIMIT ?",
+                    [rowid for (rowid,) in matches] + [query, limit]
+                )
+                return [self._memory(row) for row in rows]
+
+        rows = self.db.query(
+            "SELECT body, access_count FROM memories WHERE instr(topic_lower, ?) > 0 "
+            "ORDER BY access_count DESC, timestamp DESC LIMIT ?",
+            (query, limit)
+        )
+        return [self._memory(row) for row in rows]
+
+    def recent(self, limit: int) -> List[Dict]:
+        rows = self.db.query("SELECT body, access_count FROM memories ORDER BY timestamp DESC LIMIT ?", (limit,))
+        return [self._memory(row) for row in rows]
+
+    def popular(self, limit: int) -> List[Dict]:
+        rows = self.db.query(
+            "SELECT body, access_count FROM memories ORDER BY access_count DESC, timestamp DESC LIMIT ?",
+            (limit,)
+        )
+        return [self._memory(row) for row in rows]
+
+    def all(self) -> Iterator[Dict]:
+        for row in self.db.query("SELECT body, access_count FROM memories"):
+            yield self._memory(row)
+
+    def close(self):
+        self.db.flush()
+
+    @staticmethod
+    def _memory(row) -> Dict:
+        body, access_count = row
+        memory = json.loads(body)
+        memory['access_count'] = access_count
+        return memory